@@ -0,0 +1,290 @@
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import add_days, add_months, get_first_day, getdate, now_datetime, today
+
+from attendance_customization.attendance_customization.tasks.holiday_calendar import invalidate_holiday_list
+from attendance_customization.attendance_customization.tasks.job_run_log import (
+    RUN_LOG_DOCTYPE,
+    QueryCounter,
+    track_job_run,
+)
+from attendance_customization.attendance_customization.tasks.late_strike_engine import COUNTING_MODES
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    WATERMARK_DOCTYPE,
+    invalidate_watermarks,
+    reprocess_penalties_diff,
+    run_late_strike_processor,
+)
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import SUMMARY_DOCTYPE
+from attendance_customization.attendance_customization.tasks.penalty_ledger import LEDGER_DOCTYPE
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy
+
+
+# Every synthetic record is named with this prefix so the data set can be
+# found and removed again without touching real employees.
+PREFIX = "LSBENCH"
+
+HOLIDAY_LIST = f"{PREFIX} Holidays"
+
+INSERT_CHUNK_SIZE = 5000
+
+
+# ─────────────────────────────────────────────────────────────────
+# Benchmark runner
+#
+# Scenarios, run once per counting mode against the synthetic employees only:
+#
+#   reprocess    reprocess_penalties_diff from the first synthetic month —
+#                the body of an Attendance Reprocess Job
+#   full_run     run_late_strike_processor with watermarks dropped — the
+#                body of daily_late_strike_processor on a cold start
+#   incremental  run_late_strike_processor again with watermarks in place —
+#                a typical night
+#
+# Each scenario reports wall time, SQL statements issued, rows written
+# (affected rows of INSERT/UPDATE/DELETE) and peak Python memory. Every
+# scenario runs inside track_job_run like the scheduled job does (run_id
+# "LSBENCH/<mode>/<scenario>", removed again by the cleanup).
+#
+# Every mode starts from a freshly generated data set (same seed), so no
+# mode runs on penalties another mode applied. The scenarios are run twice
+# per mode on fresh data: once timed (with statement counting) and once
+# under tracemalloc, whose tracing would otherwise dominate the timings.
+# ─────────────────────────────────────────────────────────────────
+
+def run_benchmark(employees=200, months=3, late_ratio=0.25, company=None, seed=42,
+                  modes=None, keep_data=False):
+    """Generate synthetic data, run every scenario per mode and return the results.
+
+    Returns {"params": {...}, "results": [{mode, scenario, seconds, queries,
+    rows_written, peak_memory_mb}]}. The saved policy is never modified.
+    """
+    modes      = modes or list(COUNTING_MODES)
+    company    = company or get_default_company()
+    start_date = get_first_day(add_months(today(), -(months - 1)))
+
+    saved   = get_policy()
+    results = []
+
+    def fresh_data():
+        cleanup_synthetic_data()
+        frappe.db.commit()
+        employee_ids = generate_synthetic_data(employees, start_date, late_ratio, company, seed)
+        frappe.db.commit()
+        return employee_ids
+
+    try:
+        for mode in modes:
+            policy = get_benchmark_policy(saved, mode, start_date)
+
+            timed  = _run_scenarios(mode, policy, start_date, fresh_data(), measure_time)
+            memory = _run_scenarios(mode, policy, start_date, fresh_data(), measure_memory)
+
+            for metrics, memory_metrics in zip(timed, memory):
+                metrics.update(memory_metrics)
+                results.append(metrics)
+    finally:
+        frappe.db.rollback()
+        if not keep_data:
+            cleanup_synthetic_data()
+            frappe.db.commit()
+
+    return {
+        "params": {
+            "employees":  employees,
+            "months":     months,
+            "late_ratio": late_ratio,
+            "seed":       seed,
+            "company":    company,
+            "from_date":  str(start_date),
+            "run_on":     str(now_datetime()),
+        },
+        "results": results,
+    }
+
+
+def get_benchmark_policy(saved, counting_mode, start_date):
+    """The saved policy with the benchmark's overrides, never written to the DB."""
+    policy = frappe._dict(saved)
+    policy.update({
+        "enable_late_penalty":    1,
+        "apply_from_date":        start_date,
+        "counting_mode":          counting_mode,
+        "strike_threshold":       policy.strike_threshold or 3,
+        "penalty_action":         policy.penalty_action or "Half-day",
+        "incremental_processing": 1,
+    })
+    return policy
+
+
+def _run_scenarios(mode, policy, start_date, employee_ids, measure):
+    """Run reprocess, full_run and incremental on one data set. Returns their metrics in order."""
+    results = [_run_scenario(mode, "reprocess", measure,
+                             reprocess_penalties_diff, employee_ids, policy, start_date)]
+
+    invalidate_watermarks(employees=employee_ids)
+    frappe.db.commit()
+    results.append(_run_scenario(mode, "full_run", measure,
+                                 run_late_strike_processor, employee_ids, policy))
+
+    results.append(_run_scenario(mode, "incremental", measure,
+                                 run_late_strike_processor, employee_ids, policy))
+    return results
+
+
+def _run_scenario(mode, scenario, measure, fn, *args):
+    with track_job_run(f"{PREFIX} {scenario}", run_id=f"{PREFIX}/{mode}/{scenario}"):
+        with measure() as metrics:
+            fn(*args)
+            frappe.db.commit()
+
+    metrics.update({"mode": mode, "scenario": scenario})
+    return metrics
+
+
+@contextmanager
+def measure_time():
+    """Collect wall time, statement count and rows written for a block.
+
+    Statements are counted with the same QueryCounter the job run logs use,
+    so benchmark numbers and production run logs are comparable.
+    """
+    metrics = {}
+    queries = QueryCounter()
+
+    queries.start()
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics["seconds"] = round(time.perf_counter() - started, 3)
+        queries.stop()
+        metrics["queries"] = queries.queries
+        metrics["rows_written"] = queries.rows_written
+
+
+@contextmanager
+def measure_memory():
+    """Collect peak Python memory for a block (timings under tracemalloc are not reported)."""
+    metrics = {}
+
+    tracemalloc.start()
+    try:
+        yield metrics
+    finally:
+        metrics["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+
+
+# ─────────────────────────────────────────────────────────────────
+# Synthetic data
+# ─────────────────────────────────────────────────────────────────
+
+def generate_synthetic_data(employee_count, start_date, late_ratio, company, seed=42):
+    """Bulk-insert a Holiday List, Employees and submitted Attendance.
+
+    Sundays are holidays. Every other day up to yesterday gets a submitted
+    Present attendance, late with probability late_ratio. Rows are written
+    with frappe.db.bulk_insert (no document hooks) so generating a large set
+    takes seconds. Returns the synthetic employee IDs.
+    """
+    rng      = random.Random(seed)
+    end_date = getdate(add_days(today(), -1))
+    now      = now_datetime()
+    owner    = frappe.session.user
+
+    working_days = []
+    holidays     = []
+    day = getdate(start_date)
+    while day <= end_date:
+        (holidays if day.weekday() == 6 else working_days).append(day)
+        day = add_days(day, 1)
+
+    holiday_list = frappe.get_doc({
+        "doctype":           "Holiday List",
+        "holiday_list_name": HOLIDAY_LIST,
+        "from_date":         start_date,
+        "to_date":           end_date,
+        "holidays":          [{"holiday_date": d, "description": "Sunday"} for d in holidays],
+    }).insert(ignore_permissions=True)
+
+    employee_ids = [f"{PREFIX}-EMP-{i:06d}" for i in range(1, employee_count + 1)]
+    frappe.db.bulk_insert(
+        "Employee",
+        ["name", "creation", "modified", "modified_by", "owner", "docstatus",
+         "first_name", "employee_name", "gender", "date_of_birth", "date_of_joining",
+         "company", "status", "holiday_list"],
+        [
+            (emp, now, now, owner, owner, 0,
+             emp, emp, "Male", "1990-01-01", add_days(start_date, -365),
+             company, "Active", holiday_list.name)
+            for emp in employee_ids
+        ],
+        chunk_size=INSERT_CHUNK_SIZE,
+    )
+
+    def attendance_rows():
+        serial = 0
+        for emp in employee_ids:
+            for day in working_days:
+                serial += 1
+                yield (
+                    f"{PREFIX}-ATT-{serial:09d}", now, now, owner, owner, 1,
+                    emp, emp, company, day, "Present", int(rng.random() < late_ratio),
+                )
+
+    frappe.db.bulk_insert(
+        "Attendance",
+        ["name", "creation", "modified", "modified_by", "owner", "docstatus",
+         "employee", "employee_name", "company", "attendance_date", "status", "late_entry"],
+        attendance_rows(),
+        chunk_size=INSERT_CHUNK_SIZE,
+    )
+
+    return employee_ids
+
+
+def cleanup_synthetic_data():
+    """Remove everything generate_synthetic_data (and the runs on it) created.
+
+    Everything is matched on the synthetic employee ID pattern rather than on
+    existing Employee rows, so leftovers of an interrupted run are removed
+    too: penalty amendments and their cancelled originals, ledger penalties,
+    summaries, watermarks and the benchmark's job run logs.
+    """
+    synthetic = {"employee": ["like", f"{PREFIX}-EMP-%"]}
+
+    frappe.db.delete(LEDGER_DOCTYPE, synthetic)
+    frappe.db.delete(SUMMARY_DOCTYPE, synthetic)
+    frappe.db.delete(WATERMARK_DOCTYPE, synthetic)
+    frappe.db.delete("Attendance", synthetic)
+    frappe.db.delete("Employee", {"name": ["like", f"{PREFIX}-EMP-%"]})
+    frappe.db.delete(RUN_LOG_DOCTYPE, {"run_id": ["like", f"{PREFIX}/%"]})
+
+    if frappe.db.exists("Holiday List", HOLIDAY_LIST):
+        frappe.db.delete("Holiday", {"parent": HOLIDAY_LIST})
+        frappe.db.delete("Holiday List", {"name": HOLIDAY_LIST})
+        invalidate_holiday_list(HOLIDAY_LIST)
+
+
+def get_default_company():
+    company = frappe.defaults.get_global_default("company") or frappe.db.get_value("Company", {}, "name")
+    if not company:
+        frappe.throw("No Company found. Pass --company to the benchmark.")
+    return company
+
+
+def format_results(report):
+    """Plain-text table of a run_benchmark report."""
+    header = f"{'mode':<24}{'scenario':<14}{'seconds':>10}{'queries':>10}{'rows':>10}{'peak MB':>10}"
+    lines  = [header, "-" * len(header)]
+    for r in report["results"]:
+        lines.append(
+            f"{r['mode']:<24}{r['scenario']:<14}{r['seconds']:>10.3f}"
+            f"{r['queries']:>10}{r['rows_written']:>10}{r['peak_memory_mb']:>10.2f}"
+        )
+    return "\n".join(lines)
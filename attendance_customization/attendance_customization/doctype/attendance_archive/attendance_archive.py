@@ -0,0 +1,18 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class AttendanceArchive(Document):
+    """Archived cancelled Attendance, written by tasks.attendance_compaction.
+
+    `data` holds the complete original row, so nothing is lost when the
+    cancelled record is removed from tabAttendance.
+    """
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("Attendance Archive", ["employee", "attendance_date"])
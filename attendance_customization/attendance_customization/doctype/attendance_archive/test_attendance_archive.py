@@ -0,0 +1,57 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from erpnext.setup.doctype.employee.test_employee import make_employee
+from frappe.tests.utils import FrappeTestCase
+
+from attendance_customization.attendance_customization.tasks.attendance_compaction import (
+    archive_chunk,
+    get_compactable_attendance,
+)
+
+
+class TestAttendanceArchive(FrappeTestCase):
+    def test_nothing_compactable_before_epoch(self):
+        self.assertEqual(get_compactable_attendance("1900-01-01", 10), [])
+
+    def test_archive_keeps_full_row(self):
+        original, penalty = self.make_penalty_chain()
+        frappe.db.set_value("Attendance", original.name, "modified", "2000-01-01", update_modified=False)
+
+        rows = get_compactable_attendance("2000-01-02", 10)
+        self.assertEqual([(r.name, r.replaced_by) for r in rows], [(original.name, penalty.name)])
+
+        archive_chunk(rows)
+
+        archived = frappe.get_doc("Attendance Archive", original.name)
+        self.assertEqual(archived.employee, original.employee)
+        self.assertEqual(archived.replaced_by, penalty.name)
+        self.assertEqual(frappe.parse_json(archived.data)["name"], original.name)
+        self.assertFalse(frappe.db.exists("Attendance", original.name))
+        self.assertEqual(frappe.db.get_value("Attendance", penalty.name, "amended_from"), original.name)
+
+    def make_penalty_chain(self):
+        """A cancelled late Present and the submitted Half Day penalty amended from it."""
+        self.addCleanup(frappe.db.rollback)
+        employee = make_employee("archive-test@example.com", company="_Test Company")
+
+        original = frappe.get_doc({
+            "doctype": "Attendance",
+            "employee": employee,
+            "attendance_date": "2025-01-06",
+            "status": "Present",
+            "late_entry": 1,
+        })
+        original.insert()
+        original.submit()
+        original.cancel()
+
+        penalty = frappe.copy_doc(original)
+        penalty.amended_from = original.name
+        penalty.status = "Half Day"
+        penalty.custom_late_penalty_applied = 1
+        penalty.custom_original_status = "Present"
+        penalty.insert()
+        penalty.submit()
+        return original, penalty
@@ -0,0 +1,13 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class AttendanceJobRunLog(Document):
+    """Metrics for one run of a scheduled job, written by tasks.job_run_log.
+
+    Compare Duration, Queries and Rows Read across runs of the same Job to
+    spot regressions (e.g. after an HRMS upgrade).
+    """
+    pass
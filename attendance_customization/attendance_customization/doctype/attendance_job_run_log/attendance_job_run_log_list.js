@@ -0,0 +1,14 @@
+// Copyright (c) 2026, Frappe Technologies and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings["Attendance Job Run Log"] = {
+  get_indicator: function (doc) {
+    if (doc.status === "Failed") {
+      return [__("Failed"), "red", "status,=,Failed"];
+    }
+    if (doc.failures) {
+      return [__("Partial Failures"), "orange", "failures,>,0"];
+    }
+    return [__("Success"), "green", "status,=,Success"];
+  },
+};
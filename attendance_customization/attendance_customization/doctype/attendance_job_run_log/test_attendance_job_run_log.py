@@ -0,0 +1,72 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from attendance_customization.attendance_customization.tasks.job_run_log import (
+    RUN_LOG_DOCTYPE,
+    get_current_run,
+    record_employee_time,
+    record_metric,
+    track_job_run,
+)
+
+
+class TestAttendanceJobRunLog(FrappeTestCase):
+    def latest_log(self, job):
+        return frappe.get_last_doc(RUN_LOG_DOCTYPE, filters={"job": job})
+
+    def test_run_records_metrics(self):
+        with track_job_run("Test Job Run Log"):
+            frappe.db.sql("SELECT name FROM `tabEmployee` LIMIT 1")
+            record_metric("penalties_applied", 2)
+            record_employee_time("EMP-A", 0.5)
+            record_employee_time("EMP-B", 1.5)
+
+        # The log is written once the caller's transaction ends.
+        frappe.db.rollback()
+
+        log = self.latest_log("Test Job Run Log")
+        self.assertEqual(log.status, "Success")
+        self.assertEqual(log.penalties_applied, 2)
+        self.assertGreaterEqual(log.queries, 1)
+        self.assertEqual(frappe.parse_json(log.slowest_employees)[0]["employee"], "EMP-B")
+        self.assertIsNone(get_current_run())
+
+    def test_failed_run_is_logged_and_reraised(self):
+        with self.assertRaises(ZeroDivisionError):
+            with track_job_run("Test Job Run Log Failure"):
+                1 / 0
+
+        frappe.db.rollback()
+
+        log = self.latest_log("Test Job Run Log Failure")
+        self.assertEqual(log.status, "Failed")
+        self.assertIn("ZeroDivisionError", log.error)
+
+    def test_metrics_outside_a_run_are_ignored(self):
+        record_metric("penalties_applied")
+        self.assertIsNone(get_current_run())
+
+    def test_run_leaves_the_callers_transaction_open(self):
+        with track_job_run("Test Job Run Log Transaction"):
+            frappe.db.sql("SELECT name FROM `tabEmployee` LIMIT 1")
+
+        self.assertFalse(frappe.db.exists(RUN_LOG_DOCTYPE, {"job": "Test Job Run Log Transaction"}))
+
+        frappe.db.rollback()
+        self.assertTrue(frappe.db.exists(RUN_LOG_DOCTYPE, {"job": "Test Job Run Log Transaction"}))
+
+    def test_nested_runs_count_their_own_queries(self):
+        with track_job_run("Test Job Run Log Outer"):
+            frappe.db.sql("SELECT name FROM `tabEmployee` LIMIT 1")
+            with track_job_run("Test Job Run Log Inner"):
+                frappe.db.sql("SELECT name FROM `tabEmployee` LIMIT 1")
+            frappe.db.sql("SELECT name FROM `tabEmployee` LIMIT 1")
+
+        frappe.db.rollback()
+
+        inner = self.latest_log("Test Job Run Log Inner")
+        outer = self.latest_log("Test Job Run Log Outer")
+        self.assertGreaterEqual(outer.queries, inner.queries + 2)
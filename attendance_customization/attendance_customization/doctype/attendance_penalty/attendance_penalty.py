@@ -0,0 +1,19 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class AttendancePenalty(Document):
+    """Ledger row written by late_strike_processor in Penalty Ledger storage.
+
+    The linked Attendance is never modified; its effective status is derived
+    from this row (see tasks.penalty_ledger).
+    """
+    pass
+
+
+def on_doctype_update():
+    # Hot lookup: one employee's penalties over a date range.
+    frappe.db.add_index("Attendance Penalty", ["employee", "attendance_date"])
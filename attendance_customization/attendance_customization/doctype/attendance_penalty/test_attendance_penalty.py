@@ -0,0 +1,53 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    BulkPenaltyApplier,
+    LedgerPenaltyWriter,
+    get_penalty_applier,
+)
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    PENALTY_DAYS,
+    get_penalty_deduction,
+)
+
+
+class TestAttendancePenalty(FrappeTestCase):
+    def make_policy(self, **values):
+        return frappe._dict({
+            "counting_mode": "Cumulative",
+            "strike_threshold": 3,
+            "penalty_action": "Half-day",
+            "write_batch_size": 100,
+            **values,
+        })
+
+    def test_default_storage_uses_document_lifecycle(self):
+        self.assertIsNone(get_penalty_applier(self.make_policy()))
+
+    def test_bulk_application(self):
+        applier = get_penalty_applier(self.make_policy(penalty_application="Bulk"))
+        self.assertIsInstance(applier, BulkPenaltyApplier)
+
+    def test_ledger_storage_wins_over_bulk(self):
+        applier = get_penalty_applier(
+            self.make_policy(penalty_application="Bulk", penalty_storage="Penalty Ledger")
+        )
+        self.assertIsInstance(applier, LedgerPenaltyWriter)
+        self.assertEqual(applier.chunk_size, 100)
+
+    def test_ledger_deduction_matches_amended_penalty(self):
+        # HRMS deducts PENALTY_DAYS for the status it reads on the Attendance:
+        # the penalty status when amended, the original status with the ledger.
+        for original in ("Present", "Work From Home", "Half Day"):
+            for penalty in ("Half Day", "Absent"):
+                ledger = PENALTY_DAYS.get(original, 0) + get_penalty_deduction(penalty, original)
+                self.assertEqual(ledger, PENALTY_DAYS[penalty], (original, penalty))
+
+    def test_half_day_original_only_adds_the_difference(self):
+        self.assertEqual(get_penalty_deduction("Half Day", "Half Day"), 0)
+        self.assertEqual(get_penalty_deduction("Absent", "Half Day"), 0.5)
+        self.assertEqual(get_penalty_deduction("Absent", "Present"), 1)
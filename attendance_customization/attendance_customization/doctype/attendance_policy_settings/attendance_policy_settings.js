@@ -35,24 +35,20 @@ frappe.ui.form.on("Attendance Policy Settings", {
                   args: {
                     from_date: frm.doc.apply_from_date,
                   },
-                  freeze: true,
-                  freeze_message: __("Processing attendance records..."),
                   callback: function (r) {
-                    if (r.message) {
-                      frappe.msgprint({
-                        title: __("Reprocess Complete"),
-                        message: r.message,
-                        indicator: "green",
-                      });
-                      // Refresh the form
-                      frm.reload_doc();
+                    if (!r.message) return;
+                    if (!r.message.job) {
+                      frappe.msgprint(r.message.message);
+                      return;
                     }
+                    frappe.show_alert({ message: r.message.message, indicator: "blue" });
+                    track_reprocess_job(frm, r.message.job);
                   },
                   error: function (r) {
                     frappe.msgprint({
                       title: __("Error"),
                       message: __(
-                        "Failed to reprocess attendance records. Check error logs."
+                        "Failed to queue the reprocess job. Check error logs."
                       ),
                       indicator: "red",
                     });
@@ -65,6 +61,23 @@ frappe.ui.form.on("Attendance Policy Settings", {
         );
       }
     }
+
+    // What-if simulator: never writes, so it is available even when disabled
+    frm.add_custom_button(
+      __("Simulate Policy"),
+      function () {
+        show_policy_simulator(frm);
+      },
+      __("Actions")
+    );
+
+    frm.add_custom_button(
+      __("Export Late Report"),
+      function () {
+        show_late_report_dialog();
+      },
+      __("Actions")
+    );
   },
 
   enable_late_penalty: function (frm) {
@@ -133,3 +146,183 @@ frappe.ui.form.on("Attendance Policy Settings", {
     }
   },
 });
+
+function show_policy_simulator(frm) {
+  const dialog = new frappe.ui.Dialog({
+    title: __("Simulate Policy"),
+    fields: [
+      {
+        fieldname: "from_date",
+        fieldtype: "Date",
+        label: __("From Date"),
+        reqd: 1,
+        default: frm.doc.apply_from_date || frappe.datetime.add_months(frappe.datetime.get_today(), -1),
+      },
+      {
+        fieldname: "to_date",
+        fieldtype: "Date",
+        label: __("To Date"),
+        reqd: 1,
+        default: frappe.datetime.get_today(),
+      },
+      { fieldtype: "Column Break" },
+      {
+        fieldname: "strike_threshold",
+        fieldtype: "Int",
+        label: __("Strike Threshold"),
+        default: frm.doc.strike_threshold || 3,
+      },
+      {
+        fieldname: "counting_mode",
+        fieldtype: "Select",
+        label: __("Counting Mode"),
+        options: "Cumulative\nStrictly Consecutive\nCumulative with Reset",
+        default: frm.doc.counting_mode || "Cumulative",
+      },
+      {
+        fieldname: "penalty_action",
+        fieldtype: "Select",
+        label: __("Penalty Action"),
+        options: "Half-day\nFull-day",
+        default: frm.doc.penalty_action || "Half-day",
+      },
+      { fieldtype: "Section Break" },
+      { fieldname: "result", fieldtype: "HTML" },
+    ],
+    primary_action_label: __("Simulate"),
+    primary_action: function (values) {
+      frappe.call({
+        method:
+          "attendance_customization.attendance_customization.tasks.policy_simulator.simulate_policy",
+        args: values,
+        freeze: true,
+        freeze_message: __("Simulating..."),
+        callback: function (r) {
+          if (r.message) {
+            dialog.fields_dict.result.$wrapper.html(render_simulation(r.message));
+          }
+        },
+      });
+    },
+  });
+  dialog.show();
+}
+
+function show_late_report_dialog() {
+  const dialog = new frappe.ui.Dialog({
+    title: __("Export Late Report"),
+    fields: [
+      {
+        fieldname: "from_date",
+        fieldtype: "Date",
+        label: __("From Date"),
+        reqd: 1,
+        default: frappe.datetime.month_start(),
+      },
+      {
+        fieldname: "to_date",
+        fieldtype: "Date",
+        label: __("To Date"),
+        reqd: 1,
+        default: frappe.datetime.get_today(),
+      },
+      {
+        fieldname: "min_late_count",
+        fieldtype: "Int",
+        label: __("Minimum Late Arrivals"),
+        default: 0,
+      },
+      { fieldtype: "Column Break" },
+      {
+        fieldname: "company",
+        fieldtype: "Link",
+        label: __("Company"),
+        options: "Company",
+      },
+      {
+        fieldname: "department",
+        fieldtype: "Link",
+        label: __("Department"),
+        options: "Department",
+      },
+      {
+        fieldname: "file_format",
+        fieldtype: "Select",
+        label: __("File Format"),
+        options: "CSV\nXLSX",
+        default: "CSV",
+      },
+    ],
+    primary_action_label: __("Export"),
+    primary_action: function (values) {
+      frappe.call({
+        method:
+          "attendance_customization.attendance_customization.tasks.late_report.export_late_report",
+        args: values,
+        callback: function (r) {
+          if (r.message) {
+            dialog.hide();
+            frappe.show_alert({ message: r.message, indicator: "blue" });
+          }
+        },
+      });
+    },
+  });
+  dialog.show();
+}
+
+function render_simulation(result) {
+  const rows = result.by_employee
+    .slice(0, 50)
+    .map(
+      (e) =>
+        `<tr><td>${frappe.utils.escape_html(e.employee)}</td>
+         <td>${frappe.utils.escape_html(e.employee_name || "")}</td>
+         <td class="text-right">${e.total}</td>
+         <td class="text-right">${e.current}</td></tr>`
+    )
+    .join("");
+
+  return `
+    <p>${__("{0} penalties for {1} employees ({2} deduction days). Currently applied in range: {3}.", [
+      result.total_penalties,
+      result.employees_affected,
+      result.deduction_days,
+      result.current_penalties,
+    ])}</p>
+    <table class="table table-bordered table-condensed">
+      <thead><tr>
+        <th>${__("Employee")}</th><th>${__("Name")}</th>
+        <th class="text-right">${__("Simulated")}</th><th class="text-right">${__("Current")}</th>
+      </tr></thead>
+      <tbody>${rows}</tbody>
+    </table>`;
+}
+
+function track_reprocess_job(frm, job_name) {
+  // Progress events come from tasks.reprocess_job after every checkpoint batch
+  frappe.realtime.off("attendance_reprocess_progress");
+  frappe.realtime.on("attendance_reprocess_progress", function (data) {
+    if (data.job !== job_name) return;
+
+    const title = __("Reprocessing Attendance ({0})", [job_name]);
+    if (data.status === "Running" || data.status === "Queued") {
+      frappe.show_progress(title, data.completed, data.total,
+        __("{0} of {1} employees", [data.completed, data.total]));
+      return;
+    }
+
+    frappe.hide_progress();
+    frappe.realtime.off("attendance_reprocess_progress");
+    frappe.msgprint({
+      title: __("Reprocess {0}", [data.status]),
+      message: __(
+        "{0} penalties added, {1} removed, {2} unchanged. See {3} for details.",
+        [data.added, data.removed, data.unchanged,
+          `<a href="/app/attendance-reprocess-job/${job_name}">${job_name}</a>`]
+      ),
+      indicator: data.status === "Completed" ? "green" : "orange",
+    });
+    frm.reload_doc();
+  });
+}
@@ -5,6 +5,8 @@
 import frappe
 from frappe.model.document import Document
 
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy, refresh_policy_cache
+
 
 class AttendancePolicySettings(Document):
     def validate(self):
@@ -37,8 +39,11 @@ class AttendancePolicySettings(Document):
             )
     
     def on_update(self):
-        """Clear cache when settings are updated."""
-        frappe.clear_cache(doctype=self.doctype)
+        """Publish the saved settings to the policy cache with their new version stamp.
+
+        Done after commit, so a rolled back save never reaches other workers.
+        """
+        frappe.db.after_commit.add(refresh_policy_cache)
     
     @frappe.whitelist()
     def get_penalty_settings(self):
@@ -56,10 +61,9 @@ class AttendancePolicySettings(Document):
 
 @frappe.whitelist()
 def get_attendance_policy_settings():
-    """Get the attendance policy settings."""
+    """Get the attendance policy settings (served from the policy cache)."""
     try:
-        settings = frappe.get_single("Attendance Policy Settings")
-        return settings.as_dict()
+        return get_policy()
     except frappe.DoesNotExistError:
         # Return default settings if document doesn't exist
         return {
@@ -6,6 +6,12 @@ import frappe
 import unittest
 from frappe.tests.utils import FrappeTestCase
 
+from attendance_customization.attendance_customization.tasks.policy_cache import (
+    clear_policy_cache,
+    get_policy,
+    policy_changed,
+)
+
 
 class TestAttendancePolicySettings(FrappeTestCase):
     def setUp(self):
@@ -65,6 +71,23 @@ class TestAttendancePolicySettings(FrappeTestCase):
         penalty_settings = settings.get_penalty_settings()
         self.assertIsNone(penalty_settings)
     
+    def test_policy_cache_version(self):
+        """The version stamp follows the saved values, not cache reloads."""
+        # Runs after tearDown's rollback, so no test value stays cached.
+        self.addCleanup(clear_policy_cache)
+
+        policy = get_policy()
+        self.assertTrue(policy.policy_version)
+
+        clear_policy_cache()
+        self.assertFalse(policy_changed(policy))
+
+        frappe.db.set_single_value(
+            "Attendance Policy Settings", "strike_threshold", (policy.strike_threshold or 0) + 1
+        )
+        clear_policy_cache()
+        self.assertTrue(policy_changed(policy))
+    
     def tearDown(self):
         """Clean up test data."""
         frappe.db.rollback()
@@ -0,0 +1,43 @@
+// Copyright (c) 2026, Frappe Technologies and contributors
+// For license information, please see license.txt
+
+const REPROCESS_JOB_API =
+  "attendance_customization.attendance_customization.tasks.reprocess_job";
+
+frappe.ui.form.on("Attendance Reprocess Job", {
+  refresh: function (frm) {
+    if (["Queued", "Running"].includes(frm.doc.status) && !frm.doc.cancel_requested) {
+      frm.add_custom_button(__("Cancel"), function () {
+        frappe.call({
+          method: `${REPROCESS_JOB_API}.cancel_reprocess_job`,
+          args: { job_name: frm.doc.name },
+          callback: () => frm.reload_doc(),
+        });
+      });
+    }
+
+    if (["Failed", "Cancelled"].includes(frm.doc.status)) {
+      frm.add_custom_button(__("Resume"), function () {
+        frappe.call({
+          method: `${REPROCESS_JOB_API}.resume_reprocess_job`,
+          args: { job_name: frm.doc.name },
+          callback: () => frm.reload_doc(),
+        });
+      });
+    }
+
+    if (frm.doc.total_employees) {
+      const percent = Math.round(
+        (frm.doc.completed_employees / frm.doc.total_employees) * 100
+      );
+      frm.dashboard.add_progress(__("Employees"), percent);
+    }
+
+    frappe.realtime.off("attendance_reprocess_progress");
+    frappe.realtime.on("attendance_reprocess_progress", function (data) {
+      if (data.job === frm.doc.name) {
+        frm.reload_doc();
+      }
+    });
+  },
+});
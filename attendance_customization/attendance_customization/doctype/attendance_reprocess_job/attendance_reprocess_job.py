@@ -0,0 +1,13 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class AttendanceReprocessJob(Document):
+    """One background run of reprocess_attendance_from_date.
+
+    Created and updated by tasks.reprocess_job — the fields are progress and
+    checkpoint state, not user input.
+    """
+    pass
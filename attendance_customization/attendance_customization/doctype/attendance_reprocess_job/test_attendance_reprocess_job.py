@@ -0,0 +1,30 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from attendance_customization.attendance_customization.tasks.reprocess_job import (
+    JOB_DOCTYPE,
+    start_reprocess_job,
+)
+
+
+class TestAttendanceReprocessJob(FrappeTestCase):
+    def make_job(self, status):
+        return frappe.get_doc({
+            "doctype": JOB_DOCTYPE,
+            "from_date": "2026-01-01",
+            "status": status,
+        }).insert(ignore_permissions=True)
+
+    def test_only_one_active_job(self):
+        self.make_job("Running")
+        self.assertRaises(frappe.ValidationError, start_reprocess_job, "2026-02-01")
+
+    def test_finished_jobs_do_not_block(self):
+        frappe.db.delete(JOB_DOCTYPE, {"status": ["in", ["Queued", "Running"]]})
+        self.make_job("Completed")
+        job = start_reprocess_job("2026-02-01")
+        self.assertEqual(job.status, "Queued")
+        self.assertFalse(job.last_completed_employee)
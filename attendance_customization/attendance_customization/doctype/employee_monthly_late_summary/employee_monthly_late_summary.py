@@ -0,0 +1,23 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import get_summary_name
+
+
+class EmployeeMonthlyLateSummary(Document):
+    """Late arrival state of one employee for one month (see tasks.monthly_late_summary).
+
+    Named <employee>-<YYYY-MM> so every lookup is a primary key read. Rows
+    are owned by the Attendance hooks and the late strike processor; delete
+    one to have it rebuilt from Attendance on next use.
+    """
+
+    def autoname(self):
+        self.name = get_summary_name(self.employee, self.month)
+
+
+def on_doctype_update():
+    frappe.db.add_index("Employee Monthly Late Summary", ["employee", "month"])
@@ -0,0 +1,42 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    get_summary_name,
+    summarize_month,
+)
+
+
+def row(day, late=0, penalized=0, counted=1, status="Present"):
+    return frappe._dict(
+        attendance_date=getdate(f"2026-03-{day:02d}"),
+        late_entry=late,
+        status=status,
+        custom_late_penalty_applied=penalized,
+        counted=counted,
+    )
+
+
+class TestEmployeeMonthlyLateSummary(FrappeTestCase):
+    def test_summary_name(self):
+        self.assertEqual(get_summary_name("HR-EMP-00001", "2026-03-17"), "HR-EMP-00001-2026-03")
+
+    def test_summarize_month(self):
+        summary = summarize_month([
+            row(2, late=1),
+            row(3),
+            row(4, late=1, penalized=1, status="Half Day"),
+            row(5, late=1, status="Work From Home"),
+            row(6, penalized=1, counted=0, status="Absent"),  # full-day penalty: outside counting
+        ])
+        self.assertEqual(summary.late_count, 3)
+        self.assertEqual(summary.present_late_count, 1)
+        self.assertEqual(summary.last_late_date, getdate("2026-03-05"))
+        self.assertEqual(summary.consecutive_streak, 2)
+        self.assertEqual(summary.last_attendance_date, getdate("2026-03-05"))
+        self.assertEqual(summary.penalties, 2)
+
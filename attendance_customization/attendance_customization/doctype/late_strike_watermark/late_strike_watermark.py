@@ -0,0 +1,14 @@
+
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+from frappe.model.document import Document
+
+
+class LateStrikeWatermark(Document):
+    """Resume point written by late_strike_processor after each incremental run.
+
+    Rows are owned by the processor — delete one (or all) to force a full
+    rescan for that employee on the next run.
+    """
+    pass
@@ -0,0 +1,65 @@
+
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    get_policy_signature,
+    resolve_resume_point,
+)
+
+
+class TestLateStrikeWatermark(FrappeTestCase):
+    def setUp(self):
+        self.policy = frappe._dict({
+            "apply_from_date": "2026-01-01",
+            "counting_mode": "Cumulative",
+            "strike_threshold": 3,
+            "penalty_action": "Half-day",
+        })
+        self.signature = get_policy_signature(self.policy)
+
+    def make_watermark(self, last_processed_date, carried_count=2, signature=None):
+        return frappe._dict({
+            "last_processed_date": last_processed_date,
+            "carried_count": carried_count,
+            "policy_signature": signature or self.signature,
+        })
+
+    def test_missing_watermark_forces_full_rescan(self):
+        self.assertEqual(resolve_resume_point(None, None, self.policy, self.signature), (None, 0))
+
+    def test_policy_change_forces_full_rescan(self):
+        watermark = self.make_watermark("2026-03-10", signature="stale")
+        self.assertEqual(resolve_resume_point(watermark, None, self.policy, self.signature), (None, 0))
+
+    def test_resume_carries_count_within_month(self):
+        watermark = self.make_watermark("2026-03-10", carried_count=2)
+        from_date, carried = resolve_resume_point(watermark, None, self.policy, self.signature)
+        self.assertEqual(getdate(from_date), getdate("2026-03-11"))
+        self.assertEqual(carried, 2)
+
+    def test_resume_resets_count_on_new_month(self):
+        watermark = self.make_watermark("2026-03-31", carried_count=4)
+        from_date, carried = resolve_resume_point(watermark, None, self.policy, self.signature)
+        self.assertEqual(getdate(from_date), getdate("2026-04-01"))
+        self.assertEqual(carried, 0)
+
+    def test_change_before_watermark_rewinds_to_month_start(self):
+        watermark = self.make_watermark("2026-03-10")
+        from_date, carried = resolve_resume_point(
+            watermark, getdate("2026-02-14"), self.policy, self.signature
+        )
+        self.assertEqual(getdate(from_date), getdate("2026-02-01"))
+        self.assertEqual(carried, 0)
+
+    def test_change_after_watermark_keeps_resume_point(self):
+        watermark = self.make_watermark("2026-03-10", carried_count=1)
+        from_date, carried = resolve_resume_point(
+            watermark, getdate("2026-03-12"), self.policy, self.signature
+        )
+        self.assertEqual(getdate(from_date), getdate("2026-03-11"))
+        self.assertEqual(carried, 1)
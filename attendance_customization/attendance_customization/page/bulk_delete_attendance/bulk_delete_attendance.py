@@ -2,6 +2,8 @@ import frappe
 from frappe import _
 from frappe.utils import getdate, date_diff
 
+from attendance_customization.attendance_customization.tasks.job_run_log import record_metric, tracked_job
+
 BATCH_SIZE = 100
 BG_THRESHOLD = 500  # Records above this count get queued as background job
 
@@ -87,6 +89,7 @@ def bulk_delete_attendance(from_date, to_date):
     return {"status": "done", **result}
 
 
+@tracked_job("Bulk Delete Attendance")
 def _do_bulk_delete(from_date, to_date, notify_user=None):
     """
     Core deletion loop.  Fetches records in BATCH_SIZE chunks and deletes them.
@@ -157,6 +160,8 @@ def _do_bulk_delete(from_date, to_date, notify_user=None):
         # Commit after each batch to release locks promptly
         frappe.db.commit()
 
+    record_metric("failures", failed)
+
     if failed:
         summary = "\n".join(
             f"{e['name']} ({e['date']}): {e['error']}" for e in errors[:50]
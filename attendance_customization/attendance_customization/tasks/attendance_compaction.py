@@ -0,0 +1,157 @@
+import json
+
+import frappe
+from frappe.utils import add_days, cint, now_datetime, today
+
+from attendance_customization.attendance_customization.tasks.job_run_log import record_metric, tracked_job
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy
+
+
+ARCHIVE_DOCTYPE = "Attendance Archive"
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Upper bound on chunks per nightly run, so a first run on an old site is
+# spread over several nights instead of holding the long queue for hours.
+MAX_CHUNKS_PER_RUN = 200
+
+
+# ─────────────────────────────────────────────────────────────────
+# Compaction of cancelled penalty amendment chains
+#
+# Penalty application and clearing leave a cancelled Attendance behind on
+# every cycle (ATT-0001 → ATT-0001-1 → ...). Once such a record is older than
+# Archive Cancelled After (Days) it is moved, in chunks, into the small
+# Attendance Archive table (key columns + the full row as JSON) and deleted
+# from tabAttendance. Per chunk:
+#
+#   1. re-point Employee Checkins still linked to an archived record to the
+#      active attendance of the same employee and date;
+#   2. drop the inert ledger rows of the archived records, keeping them in
+#      each record's archived JSON ("attendance_penalties");
+#   3. bulk-insert the archive rows and delete the originals;
+#   4. commit.
+#
+# A cancelled record is "from the penalty workflow" when an active record
+# exists for the same employee and date and either the cancelled record
+# itself is a penalty (cleared penalty) or a penalty record exists for that
+# employee and date (cancelled original). Cancelled rows without an active
+# replacement are never touched. Live records keep their amended_from: it
+# then names an Attendance Archive row (same name) instead of an Attendance.
+# ─────────────────────────────────────────────────────────────────
+
+@tracked_job("Attendance Compaction")
+def compact_cancelled_attendance():
+    """Daily (long queue): archive old cancelled penalty-chain attendance."""
+    policy = get_policy()
+    retention_days = cint(policy.get("archive_cancelled_after_days"))
+    if retention_days <= 0:
+        return
+
+    cutoff     = add_days(today(), -retention_days)
+    chunk_size = cint(policy.get("write_batch_size")) or DEFAULT_CHUNK_SIZE
+
+    for _ in range(MAX_CHUNKS_PER_RUN):
+        rows = get_compactable_attendance(cutoff, chunk_size)
+        if not rows:
+            break
+
+        try:
+            archive_chunk(rows)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            record_metric("failures")
+            frappe.log_error(
+                message=frappe.get_traceback(),
+                title="Attendance Compaction: chunk failed",
+            )
+            break
+
+
+def get_compactable_attendance(cutoff, limit):
+    """Full rows of cancelled penalty-workflow attendance last modified before cutoff.
+
+    Each row carries `replaced_by`: the active attendance for its employee
+    and date.
+    """
+    return frappe.db.sql("""
+        SELECT c.*, act.name AS replaced_by
+        FROM `tabAttendance` c
+        INNER JOIN `tabAttendance` act
+            ON act.employee = c.employee
+           AND act.attendance_date = c.attendance_date
+           AND act.docstatus = 1
+        WHERE c.docstatus = 2
+          AND c.modified < %(cutoff)s
+          AND (
+              c.custom_late_penalty_applied = 1
+              OR EXISTS (
+                  SELECT 1
+                  FROM `tabAttendance` pen
+                  WHERE pen.employee = c.employee
+                    AND pen.attendance_date = c.attendance_date
+                    AND pen.custom_late_penalty_applied = 1
+                    AND pen.name != c.name
+              )
+          )
+        ORDER BY c.modified
+        LIMIT %(limit)s
+    """, {"cutoff": cutoff, "limit": limit}, as_dict=True)
+
+
+def archive_chunk(rows):
+    """Move one chunk of cancelled attendance into Attendance Archive."""
+    # One active record per employee/date is the norm; if HRMS ever left two,
+    # keep the first replacement found for each cancelled name.
+    replaced_by = {}
+    for row in rows:
+        replaced_by.setdefault(row.name, row.replaced_by)
+    names = tuple(replaced_by)
+
+    cases  = " ".join(["WHEN %s THEN %s"] * len(names))
+    params = [value for pair in replaced_by.items() for value in pair]
+    params.append(names)
+    frappe.db.sql(f"""
+        UPDATE `tabEmployee Checkin`
+        SET attendance = CASE attendance {cases} END
+        WHERE attendance IN %s
+    """, params)
+
+    penalties = {}
+    for penalty in frappe.get_all(
+        "Attendance Penalty", filters={"attendance": ["in", list(names)]}, fields=["*"]
+    ):
+        penalties.setdefault(penalty.attendance, []).append(penalty)
+    if penalties:
+        frappe.db.delete("Attendance Penalty", {"attendance": ["in", list(penalties)]})
+
+    now  = now_datetime()
+    user = frappe.session.user
+    archived = {}
+    for row in rows:
+        if row.name in archived:
+            continue
+        data = {k: v for k, v in row.items() if k != "replaced_by"}
+        if row.name in penalties:
+            data["attendance_penalties"] = penalties[row.name]
+        archived[row.name] = (
+            row.name, now, now, user, user,
+            row.name, row.employee, row.attendance_date, row.status,
+            cint(row.get("custom_late_penalty_applied")), row.amended_from,
+            replaced_by[row.name], row.modified,
+            json.dumps(data, default=str, separators=(",", ":")),
+        )
+
+    frappe.db.bulk_insert(
+        ARCHIVE_DOCTYPE,
+        ["name", "creation", "modified", "modified_by", "owner",
+         "attendance", "employee", "attendance_date", "status",
+         "late_penalty_applied", "amended_from",
+         "replaced_by", "cancelled_on", "data"],
+        list(archived.values()),
+        ignore_duplicates=True,
+    )
+
+    frappe.db.sql("DELETE FROM `tabAttendance` WHERE name IN %s AND docstatus = 2", (names,))
+    record_metric("rows_archived", len(names))
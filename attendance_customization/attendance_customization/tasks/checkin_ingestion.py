@@ -0,0 +1,354 @@
+import frappe
+from frappe import _
+from frappe.utils import add_days, get_datetime, getdate
+
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    refresh_attendance_summaries,
+)
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy
+from attendance_customization.doctype_events.employee_checkin import get_checkin_update
+
+
+# Checkins accepted per ingest_checkins call.
+MAX_BATCH_SIZE = 5000
+
+# Employees per IN (...) list / checkins per linking UPDATE.
+CHUNK_SIZE = 1000
+
+CHECKIN_FIELDS = ("employee", "time", "log_type", "device_id", "latitude", "longitude", "skip_auto_attendance")
+
+ATTENDANCE_FIELDS = ("in_time", "out_time", "leave_application", "leave_type", "half_day_status")
+
+# Redis set of "<employee>|<YYYY-MM-DD>" markers waiting for the drain job.
+DIRTY_KEY = "attendance_checkin:dirty"
+DRAINING_KEY = "attendance_checkin:draining"
+
+# Attendance Policy Settings.checkin_processing value for the drain mode.
+COALESCED = "Coalesced"
+
+# Moves the dirty set into the draining set (merging markers a failed drain
+# left there) and returns it, in one atomic step: KEYS[1] draining, KEYS[2] dirty.
+TAKE_MARKERS_SCRIPT = """
+redis.call('SUNIONSTORE', KEYS[1], KEYS[1], KEYS[2])
+redis.call('DEL', KEYS[2])
+return redis.call('SMEMBERS', KEYS[1])
+"""
+
+DRAIN_JOB_ID = "attendance_checkin_drain"
+
+# Only one drain runs at a time (queued job and scheduler entry may overlap).
+DRAIN_LOCK_KEY = "attendance_checkin:drain_lock"
+DRAIN_LOCK_SECONDS = 300
+
+# Drain rounds per job; markers left after that wait for the next job.
+MAX_DRAIN_ROUNDS = 10
+
+
+# ─────────────────────────────────────────────────────────────────
+# Batch checkin ingestion for biometric sync
+#
+# Device middleware posts punches in batches instead of one insert per
+# punch. Each checkin is still inserted as a document (HRMS validation:
+# duplicate punches, shift fetch) but with frappe.flags.defer_checkin_reconcile
+# set, so employee_checkin.after_insert does nothing. The half-day work that
+# hook would have done runs once for the whole batch afterwards:
+#
+#   1 query    Half Day attendances for the batch's (employee, date) pairs
+#   2 queries  approved half-day Leave Applications / Attendance Requests,
+#              only when some attendance has no leave linked
+#   replay     get_checkin_update() per checkin in arrival order, in memory —
+#              the same rules as the per-insert hook
+#   writes     one set_value per changed attendance, checkin links in
+#              chunked CASE updates, late summaries of re-linked leaves
+#
+# A punch that fails validation is rolled back on its own and reported;
+# the rest of the batch goes through.
+# ─────────────────────────────────────────────────────────────────
+
+@frappe.whitelist()
+def ingest_checkins(checkins):
+    """
+    Insert a batch of Employee Checkins and reconcile Half Day attendance once.
+
+    `checkins` is a list (or JSON list) of dicts with employee, time and
+    optionally log_type, device_id, latitude, longitude, skip_auto_attendance.
+    Returns {"inserted": [names], "failed": [{"index", "error"}]}.
+    """
+    frappe.has_permission("Employee Checkin", "create", throw=True)
+
+    checkins = frappe.parse_json(checkins) or []
+    if len(checkins) > MAX_BATCH_SIZE:
+        frappe.throw(_("At most {0} checkins can be ingested per call.").format(MAX_BATCH_SIZE))
+
+    inserted, failed = [], []
+
+    frappe.flags.defer_checkin_reconcile = True
+    try:
+        for index, values in enumerate(checkins):
+            frappe.db.savepoint("checkin_ingest")
+            try:
+                doc = frappe.get_doc({
+                    "doctype": "Employee Checkin",
+                    **{f: values.get(f) for f in CHECKIN_FIELDS if values.get(f) is not None},
+                })
+                doc.insert()
+                frappe.db.release_savepoint("checkin_ingest")
+            except Exception as e:
+                frappe.db.rollback(save_point="checkin_ingest")
+                frappe.clear_messages()
+                failed.append({"index": index, "error": str(e)})
+                continue
+
+            inserted.append(frappe._dict(
+                name=doc.name, employee=doc.employee, time=get_datetime(doc.time), log_type=doc.log_type,
+            ))
+    finally:
+        frappe.flags.defer_checkin_reconcile = False
+
+    if inserted:
+        reconcile_checkins(inserted)
+
+    return {"inserted": [c.name for c in inserted], "failed": failed}
+
+
+def reconcile_checkins(checkins):
+    """Apply employee_checkin.after_insert to many checkins, grouped per (employee, date).
+
+    `checkins` are dicts with name, employee, time and log_type, in the order
+    they arrived (which decides in_time/out_time exactly as the per-insert
+    hook would). Returns the number of Half Day attendances they were linked to.
+    """
+    groups = {}
+    for checkin in checkins:
+        groups.setdefault((checkin.employee, getdate(checkin.time)), []).append(checkin)
+    if not groups:
+        return 0
+
+    employees = sorted({employee for employee, _ in groups})
+    dates     = [day for _, day in groups]
+    from_date, to_date = min(dates), max(dates)
+
+    attendances = {}
+    for chunk in _chunks(employees, CHUNK_SIZE):
+        for row in frappe.db.sql("""
+            SELECT name, employee, attendance_date, in_time, out_time,
+                   leave_application, leave_type, half_day_status
+            FROM `tabAttendance`
+            WHERE employee IN %(employees)s
+              AND attendance_date BETWEEN %(from_date)s AND %(to_date)s
+              AND status = 'Half Day'
+              AND docstatus = 1
+        """, {"employees": chunk, "from_date": from_date, "to_date": to_date}, as_dict=True):
+            key = (row.employee, getdate(row.attendance_date))
+            if key in groups:
+                attendances[key] = row
+
+    if not attendances:
+        return 0
+
+    leaves, requests = {}, {}
+    if any(not a.leave_application for a in attendances.values()):
+        leaves, requests = get_half_day_approvals(
+            sorted({employee for employee, _ in attendances}), from_date, to_date
+        )
+
+    links, relinked = {}, []
+    for key, attendance in attendances.items():
+        state = frappe._dict(attendance)
+        for checkin in groups[key]:
+            state.update(get_checkin_update(
+                state,
+                checkin,
+                find_approvals=lambda: frappe._dict(
+                    leave=leaves.get(key), attendance_request=requests.get(key)
+                ),
+            ))
+            links[checkin.name] = attendance.name
+
+        changed = {f: state[f] for f in ATTENDANCE_FIELDS if state.get(f) != attendance.get(f)}
+        if changed:
+            frappe.db.set_value("Attendance", attendance.name, changed)
+            if "leave_application" in changed:
+                relinked.append(key)
+
+    link_checkins(links)
+    # A leave link decides whether the Half Day takes part in strike counting.
+    refresh_attendance_summaries(relinked)
+
+    frappe.logger().info(
+        "checkin_ingestion: linked {} checkin(s) to {} Half Day attendance(s)".format(
+            len(links), len(attendances)
+        )
+    )
+    return len(attendances)
+
+
+def get_half_day_approvals(employees, from_date, to_date):
+    """Approved half-day Leave Applications and submitted Attendance Requests, keyed by (employee, date).
+
+    The most recently modified one wins, as in half_day_cache.get_half_day_approvals.
+    """
+    leaves, requests = {}, {}
+    for chunk in _chunks(employees, CHUNK_SIZE):
+        values = {"employees": chunk, "from_date": from_date, "to_date": to_date}
+
+        for row in frappe.db.sql("""
+            SELECT name, leave_type, employee, half_day_date
+            FROM `tabLeave Application`
+            WHERE employee IN %(employees)s
+              AND half_day_date BETWEEN %(from_date)s AND %(to_date)s
+              AND half_day = 1
+              AND status = 'Approved'
+              AND docstatus = 1
+            ORDER BY modified DESC, name DESC
+        """, values, as_dict=True):
+            leaves.setdefault((row.employee, getdate(row.half_day_date)), row)
+
+        for row in frappe.db.sql("""
+            SELECT name, employee, half_day_date
+            FROM `tabAttendance Request`
+            WHERE employee IN %(employees)s
+              AND half_day_date BETWEEN %(from_date)s AND %(to_date)s
+              AND half_day = 1
+              AND docstatus = 1
+            ORDER BY modified DESC, name DESC
+        """, values, as_dict=True):
+            requests.setdefault((row.employee, getdate(row.half_day_date)), row.name)
+
+    return leaves, requests
+
+
+def link_checkins(links):
+    """Set Employee Checkin.attendance from {checkin name: attendance name}."""
+    items = list(links.items())
+    for chunk in _chunks(items, CHUNK_SIZE):
+        cases  = " ".join(["WHEN %s THEN %s"] * len(chunk))
+        params = [value for pair in chunk for value in pair]
+        params.append([name for name, _ in chunk])
+        frappe.db.sql(f"""
+            UPDATE `tabEmployee Checkin`
+            SET attendance = CASE name {cases} END
+            WHERE name IN %s
+        """, params)
+
+
+# ─────────────────────────────────────────────────────────────────
+# Coalesced mode (Checkin Processing = "Coalesced")
+#
+# employee_checkin.after_insert only adds "<employee>|<date>" to a Redis set
+# once the insert commits and enqueues drain_dirty_checkins under a fixed
+# job id. While that job is still queued, further enqueues are dropped, so a
+# burst of punches collapses into one job and one reconciliation per
+# employee-date. The job moves the set into a draining set in one Lua call,
+# so markers added meanwhile are kept for the next round, and deletes the
+# draining set only after the reconciliation commits — a failed or killed
+# drain leaves its markers for the next one. It reconciles every
+# still-unlinked checkin of the marked employee-dates in arrival order —
+# the ones the inline hook would have processed — via reconcile_checkins.
+# A one-minute scheduler entry drains anything an enqueue missed; it returns
+# at once unless Checkin Processing is Coalesced.
+# ─────────────────────────────────────────────────────────────────
+
+def mark_checkin_dirty(employee, checkin_date):
+    """Queue (employee, date) for coalesced reconciliation once the current transaction commits."""
+    marker = _marker(employee, checkin_date)
+
+    def _mark():
+        frappe.cache.sadd(DIRTY_KEY, marker)
+        frappe.enqueue(
+            "attendance_customization.attendance_customization.tasks.checkin_ingestion.drain_dirty_checkins",
+            queue="short",
+            job_id=DRAIN_JOB_ID,
+            deduplicate=True,
+        )
+
+    frappe.db.after_commit.add(_mark)
+
+
+def drain_dirty_checkins():
+    """Reconcile every marked employee-date once. Returns the number reconciled."""
+    if get_policy().checkin_processing != COALESCED:
+        return 0
+
+    lock = frappe.cache.make_key(DRAIN_LOCK_KEY)
+    if not frappe.cache.set(lock, 1, nx=True, ex=DRAIN_LOCK_SECONDS):
+        return 0  # another drain is running; it picks up these markers
+
+    try:
+        return _drain()
+    finally:
+        frappe.cache.delete(lock)
+
+
+def _drain():
+    reconciled = 0
+    for _round in range(MAX_DRAIN_ROUNDS):
+        markers = pop_dirty_markers()
+        if not markers:
+            break
+
+        try:
+            reconcile_checkins(get_pending_checkins(markers))
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            # The markers stay in the draining set for the next drain.
+            frappe.log_error(
+                message=frappe.get_traceback(),
+                title="Checkin Ingestion: coalesced reconciliation failed",
+            )
+            break
+
+        frappe.cache.delete_value(DRAINING_KEY)
+        reconciled += len(markers)
+    return reconciled
+
+
+def pop_dirty_markers():
+    """Move the current markers into the draining set and return them as [(employee, date)].
+
+    The draining set is deleted by _drain once the markers are reconciled.
+    """
+    # The raw redis call needs the site prefix that frappe.cache adds itself.
+    members = frappe.cache.eval(
+        TAKE_MARKERS_SCRIPT, 2, frappe.cache.make_key(DRAINING_KEY), frappe.cache.make_key(DIRTY_KEY)
+    )
+
+    markers = []
+    for member in members:
+        employee, _sep, day = frappe.safe_decode(member).rpartition("|")
+        markers.append((employee, getdate(day)))
+    return markers
+
+
+def get_pending_checkins(markers):
+    """Unlinked checkins of the marked employee-dates, in arrival order."""
+    wanted    = set(markers)
+    employees = sorted({employee for employee, _day in markers})
+    dates     = [day for _employee, day in markers]
+
+    pending = []
+    for chunk in _chunks(employees, CHUNK_SIZE):
+        rows = frappe.db.sql("""
+            SELECT name, employee, time, log_type
+            FROM `tabEmployee Checkin`
+            WHERE employee IN %(employees)s
+              AND time >= %(range_start)s AND time < %(range_end)s
+              AND IFNULL(attendance, '') = ''
+            ORDER BY creation, name
+        """, {
+            "employees":   chunk,
+            "range_start": get_datetime(min(dates)),
+            "range_end":   get_datetime(add_days(max(dates), 1)),
+        }, as_dict=True)
+        pending.extend(r for r in rows if (r.employee, getdate(r.time)) in wanted)
+    return pending
+
+
+def _marker(employee, day):
+    return "{}|{}".format(employee, getdate(day))
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
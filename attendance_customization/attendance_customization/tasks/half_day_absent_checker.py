@@ -1,8 +1,26 @@
 import frappe
-from frappe.utils import add_days, getdate, nowdate
+from frappe.utils import add_days, date_diff, get_datetime, getdate, nowdate
 
+from attendance_customization.attendance_customization.tasks.half_day_cache import load_half_day_employees
+from attendance_customization.attendance_customization.tasks.job_run_log import record_metric, tracked_job
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    refresh_attendance_summaries,
+)
 
-def check_half_day_no_show(date=None):
+
+# frappe.db global holding the last date the scheduled check fully audited.
+LAST_CHECKED_KEY = "half_day_no_show_last_checked_date"
+
+# After a longer outage only this many most recent days are caught up; older
+# dates need an explicit check_half_day_no_show(from_date=..., to_date=...).
+MAX_CATCH_UP_DAYS = 31
+
+# Employees per IN (...) list, so very large companies never build oversized SQL.
+EMPLOYEE_CHUNK_SIZE = 1000
+
+
+@tracked_job("Half Day No-Show Check")
+def check_half_day_no_show(date=None, from_date=None, to_date=None):
     """
     Runs daily at 6 AM and audits the previous day's Half Day leave attendance.
 
@@ -45,70 +63,129 @@ def check_half_day_no_show(date=None):
         employee_checkin.after_insert will restore leave_application and set
         half_day_status="Present" when a late checkin arrives — but only if
         the new checkin completes a valid IN+OUT pair for that date.
+
+    CATCH-UP (scheduled run, no arguments):
+        Audits every date after the last successfully checked one up to
+        yesterday (at most MAX_CATCH_UP_DAYS), so a weekend of scheduler
+        downtime or a skipped 6 AM slot is made up on the next run. The
+        whole range is one attendance query and one checkin aggregation.
+        Pass `date` for one specific day, or from_date/to_date for a range;
+        explicit calls do not move the last-checked date.
+
+    The scheduled run also loads today's set in half_day_cache, so the
+    morning's punches hit a warm cache in employee_checkin.after_insert.
     """
-    yesterday = getdate(date) if date else getdate(add_days(nowdate(), -1))
+    yesterday = getdate(add_days(nowdate(), -1))
+    scheduled = not (date or from_date or to_date)
+
+    if date:
+        from_date = to_date = getdate(date)
+    elif scheduled:
+        from_date, to_date = get_catch_up_range(yesterday), yesterday
+    else:
+        from_date = getdate(from_date or to_date)
+        to_date   = getdate(to_date or from_date)
+
+    if scheduled:
+        load_half_day_employees(nowdate())
+
+    if from_date > to_date:
+        return
+
+    if audit_half_day_no_show(from_date, to_date) and scheduled:
+        frappe.db.set_global(LAST_CHECKED_KEY, str(to_date))
 
-    # Query 1: all submitted Half Day attendances with leave linked for yesterday.
+
+def get_catch_up_range(yesterday):
+    """First date the scheduled run still has to audit (yesterday on a normal day)."""
+    last_checked = frappe.db.get_global(LAST_CHECKED_KEY)
+    if not last_checked:
+        return yesterday
+
+    from_date = add_days(getdate(last_checked), 1)
+    if date_diff(yesterday, from_date) >= MAX_CATCH_UP_DAYS:
+        from_date = add_days(yesterday, -(MAX_CATCH_UP_DAYS - 1))
+    return getdate(from_date)
+
+
+def audit_half_day_no_show(from_date, to_date):
+    """Set-based audit of every date in [from_date, to_date]. Returns False if the update failed."""
+    # Query 1: all submitted Half Day attendances with leave linked in the range.
     attendances = frappe.get_all(
         "Attendance",
         filters=[
-            ["attendance_date", "=", yesterday],
+            ["attendance_date", "between", [from_date, to_date]],
             ["status", "=", "Half Day"],
             ["docstatus", "=", 1],
             ["leave_application", "is", "set"],
         ],
-        fields=["name", "employee"],
+        fields=["name", "employee", "attendance_date"],
     )
 
     if not attendances:
-        return
-
-    employees_on_leave = {a.employee: a.name for a in attendances}
-
-    # Query 2: employees who have a valid IN+OUT pair for yesterday.
-    # Also treat untyped checkins (log_type IS NULL) as valid — legacy device support.
-    # Two separate sub-queries unioned to keep the SQL readable and indexed.
-    employees_with_valid_pair = set(frappe.db.sql_list("""
-        SELECT employee
-        FROM `tabEmployee Checkin`
-        WHERE employee IN %(employees)s
-          AND DATE(time) = %(date)s
-          AND log_type IN ('IN', 'OUT')
-        GROUP BY employee
-        HAVING COUNT(DISTINCT log_type) = 2
-
-        UNION
-
-        SELECT DISTINCT employee
-        FROM `tabEmployee Checkin`
-        WHERE employee IN %(employees)s
-          AND DATE(time) = %(date)s
-          AND (log_type IS NULL OR log_type = '')
-    """, {"employees": list(employees_on_leave.keys()), "date": yesterday}))
-
-    # Employees without a valid pair = absent/incomplete for working half → HD/A.
-    no_show_employees = set(employees_on_leave.keys()) - employees_with_valid_pair
-
-    if not no_show_employees:
-        return
-
-    no_show_att_names = [employees_on_leave[e] for e in no_show_employees]
+        return True
+
+    on_leave = {(a.employee, getdate(a.attendance_date)): a.name for a in attendances}
+    employees = sorted({employee for employee, _ in on_leave})
+    record_metric("employees_processed", len(employees))
+
+    # Query 2: (employee, date) pairs with a valid IN+OUT pair, one aggregation
+    # per employee chunk over the whole range. Untyped checkins (log_type NULL
+    # or blank) also count as valid — legacy device support.
+    # `time` is compared as a half-open range (not DATE(time) = ...) so the
+    # (employee, time) index on Employee Checkin can be used.
+    valid_pairs = set()
+    for chunk in _chunks(employees, EMPLOYEE_CHUNK_SIZE):
+        rows = frappe.db.sql("""
+            SELECT employee, DATE(time) AS checkin_date
+            FROM `tabEmployee Checkin`
+            WHERE employee IN %(employees)s
+              AND time >= %(range_start)s AND time < %(range_end)s
+            GROUP BY employee, DATE(time)
+            HAVING (SUM(log_type = 'IN') > 0 AND SUM(log_type = 'OUT') > 0)
+                OR SUM(log_type IS NULL OR log_type = '') > 0
+        """, {
+            "employees":   chunk,
+            "range_start": get_datetime(from_date),
+            "range_end":   get_datetime(add_days(to_date, 1)),
+        }, as_dict=True)
+        valid_pairs.update((r.employee, getdate(r.checkin_date)) for r in rows)
+
+    # No valid pair = absent/incomplete for the working half → HD/A.
+    no_shows = sorted(key for key in on_leave if key not in valid_pairs)
+    if not no_shows:
+        return True
+
+    no_show_att_names = [on_leave[key] for key in no_shows]
 
     try:
-        frappe.db.sql("""
-            UPDATE `tabAttendance`
-            SET leave_application = NULL, half_day_status = 'Absent', modified = NOW()
-            WHERE name IN %(names)s
-        """, {"names": no_show_att_names})
+        for names in _chunks(no_show_att_names, EMPLOYEE_CHUNK_SIZE):
+            frappe.db.sql("""
+                UPDATE `tabAttendance`
+                SET leave_application = NULL, half_day_status = 'Absent', modified = NOW()
+                WHERE name IN %(names)s
+            """, {"names": names})
+
+        # Without its leave the Half Day now takes part in strike counting.
+        refresh_attendance_summaries(no_shows)
 
         frappe.logger().info(
-            "half_day_absent_checker [{}]: {} employee(s) changed to HD/A "
+            "half_day_absent_checker [{} – {}]: {} attendance(s) changed to HD/A "
             "(no valid IN+OUT pair for working half): {}".format(
-                yesterday, len(no_show_employees), ", ".join(no_show_employees)
+                from_date, to_date, len(no_shows),
+                ", ".join(f"{employee} {day}" for employee, day in no_shows),
             )
         )
+        return True
     except Exception:
+        record_metric("failures")
         frappe.log_error(
             message=frappe.get_traceback(),
-            title="half_day_absent_checker [{}]: bulk update failed".format(yesterday),
+            title="half_day_absent_checker [{} – {}]: bulk update failed".format(from_date, to_date),
         )
+        return False
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
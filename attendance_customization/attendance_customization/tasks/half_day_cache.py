@@ -0,0 +1,190 @@
+import frappe
+from frappe.utils import getdate
+
+
+KEY_PREFIX = "attendance_half_day"
+
+INDEX_KEY_PREFIX = "attendance_half_day_index"
+
+# Member marking a date's set as loaded from the database.
+LOADED = "__loaded__"
+
+# Sets expire on their own; punches older than this fall back to one load.
+CACHE_TTL = 3 * 24 * 3600
+
+
+# ─────────────────────────────────────────────────────────────────
+# Half Day employee-date cache
+#
+# One Redis set per date ("attendance_half_day:<YYYY-MM-DD>") holding the
+# employees with a submitted Half Day attendance on that date, plus the
+# LOADED sentinel once it has been filled from the database. Most punches
+# land on normal working days, so employee_checkin.after_insert asks
+# has_half_day_attendance() first and skips its Attendance query for
+# everyone not in the set.
+#
+# The set may contain too many employees, never too few:
+#   - additions happen immediately (even if the transaction later rolls back,
+#     an extra member only costs the hook its usual query)
+#   - removals wait for the commit and re-check the database first
+#   - a set without the sentinel, or any Redis error, is answered from the
+#     database (a load, or "yes" when Redis is down)
+#
+# Kept current from the Attendance, Leave Application and Attendance Request
+# hooks (HRMS flips status to Half Day with db_set, bypassing Attendance
+# hooks) and warmed for the day by the 6 AM half-day checker.
+# ─────────────────────────────────────────────────────────────────
+
+def has_half_day_attendance(employee, day):
+    """False only when the employee certainly has no submitted Half Day attendance on `day`."""
+    try:
+        key = _key(day)
+        if not frappe.cache.sismember(key, LOADED):
+            load_half_day_employees(day)
+        return bool(frappe.cache.sismember(key, employee))
+    except Exception:
+        return True  # Redis unavailable: let the caller query the database
+
+
+def load_half_day_employees(day):
+    """Fill (or top up) the date's set from the database and mark it loaded."""
+    employees = frappe.get_all(
+        "Attendance",
+        filters={"attendance_date": getdate(day), "status": "Half Day", "docstatus": 1},
+        pluck="employee",
+    )
+    # Union, never replace: a member added by a hook meanwhile must survive.
+    _add(day, *employees, LOADED)
+
+
+def add_half_day_employee(employee, day):
+    if employee and day:
+        _add(day, employee)
+
+
+def discard_half_day_employee(employee, day):
+    """Drop the employee from the date's set after commit, unless a Half Day attendance remains."""
+    if not (employee and day):
+        return
+
+    def _discard():
+        if not _half_day_attendance_exists(employee, day):
+            frappe.cache.srem(_key(day), employee)
+
+    frappe.db.after_commit.add(_discard)
+
+
+def sync_half_day_employee(employee, day):
+    """Bring one employee-date in line with the database (for db_set changes made by HRMS)."""
+    if not (employee and day):
+        return
+
+    if _half_day_attendance_exists(employee, day):
+        add_half_day_employee(employee, day)
+    else:
+        discard_half_day_employee(employee, day)
+
+
+def _half_day_attendance_exists(employee, day):
+    return bool(frappe.db.exists(
+        "Attendance",
+        {"employee": employee, "attendance_date": getdate(day), "status": "Half Day", "docstatus": 1},
+    ))
+
+
+def _add(day, *members):
+    key = _key(day)
+    frappe.cache.sadd(key, *members)
+    frappe.cache.expire(frappe.cache.make_key(key), CACHE_TTL)
+
+
+def _key(day):
+    return "{}:{}".format(KEY_PREFIX, getdate(day))
+
+
+# ─────────────────────────────────────────────────────────────────
+# Half-day leave index
+#
+# Per date, one cached dict {employee: (leave application, leave type,
+# attendance request)} of approved half-day Leave Applications and submitted
+# half-day Attendance Requests, built with two queries the first time the
+# date is asked for. Attendance validate and employee_checkin.after_insert
+# resolve both lookups for an (employee, date) with one cache read through
+# get_half_day_approvals().
+#
+# The Leave Application and Attendance Request hooks drop the date's index
+# before the document changes (HRMS creates/cancels the attendance inside the
+# same save, and its validate must already see the new state) and again
+# after commit or rollback, so an index built from uncommitted or superseded
+# data never outlives the transaction.
+# ─────────────────────────────────────────────────────────────────
+
+def get_half_day_approvals(employee, day):
+    """frappe._dict(leave=(name, leave_type) dict or None, attendance_request=name or None)."""
+    try:
+        index = frappe.cache.get_value(_index_key(day))
+        if index is None:
+            index = load_half_day_index(day)
+        entry = index.get(employee)
+    except Exception:
+        entry = _query_half_day_index(day, employee).get(employee)  # Redis unavailable
+
+    leave, leave_type, attendance_request = entry or (None, None, None)
+    return frappe._dict(
+        leave=frappe._dict(name=leave, leave_type=leave_type) if leave else None,
+        attendance_request=attendance_request,
+    )
+
+
+def load_half_day_index(day):
+    index = _query_half_day_index(day)
+    frappe.cache.set_value(_index_key(day), index, expires_in_sec=CACHE_TTL)
+    return index
+
+
+def invalidate_half_day_index(day):
+    """Drop the date's index now and once the transaction commits or rolls back."""
+    if not day:
+        return
+
+    def _clear():
+        frappe.cache.delete_value(_index_key(day))
+
+    _clear()
+    frappe.db.after_commit.add(_clear)
+    frappe.db.after_rollback.add(_clear)
+
+
+def _query_half_day_index(day, employee=None):
+    conditions = "half_day_date = %(day)s AND half_day = 1 AND docstatus = 1"
+    values = {"day": getdate(day)}
+    if employee:
+        conditions += " AND employee = %(employee)s"
+        values["employee"] = employee
+
+    # Most recently modified first, as the frappe.db.get_value lookups this
+    # replaces returned (name breaks ties): with two approvals for the same
+    # half day, the latest one wins.
+    index = {}
+    for row in frappe.db.sql(f"""
+        SELECT employee, name, leave_type
+        FROM `tabLeave Application`
+        WHERE {conditions} AND status = 'Approved'
+        ORDER BY modified DESC, name DESC
+    """, values, as_dict=True):
+        index.setdefault(row.employee, [row.name, row.leave_type, None])
+
+    for row in frappe.db.sql(f"""
+        SELECT employee, name
+        FROM `tabAttendance Request`
+        WHERE {conditions}
+        ORDER BY modified DESC, name DESC
+    """, values, as_dict=True):
+        entry = index.setdefault(row.employee, [None, None, None])
+        entry[2] = entry[2] or row.name
+
+    return {employee: tuple(entry) for employee, entry in index.items()}
+
+
+def _index_key(day):
+    return "{}:{}".format(INDEX_KEY_PREFIX, getdate(day))
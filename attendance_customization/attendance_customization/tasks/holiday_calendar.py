@@ -0,0 +1,156 @@
+import frappe
+from frappe.utils import getdate
+
+
+# ─────────────────────────────────────────────────────────────────
+# Compiled holiday calendars
+#
+# Thousands of employees share a handful of Holiday Lists, so holidays are
+# compiled once per (Holiday List, year) into a frozenset of dates and cached
+# at two levels:
+#
+#   1. Redis   — hash "holiday_calendar:<list>" → {year: [dates]}, shared by
+#                every worker on the bench.
+#   2. Process — plain dict, so a long job never goes back to Redis for a
+#                calendar it already holds.
+#
+# A random version stamp in Redis is bumped on every invalidation. Process
+# copies are tagged with the stamp they were built under and are ignored once
+# it changes, so workers never need to be told individually. Invalidation
+# runs after the saving transaction commits (a reader in between would
+# otherwise recompile the old holidays under the new stamp), and compiled
+# lists expire after COMPILED_TTL as a backstop.
+#
+# Employee → Holiday List resolution (employee list, else company default) is
+# done once per HolidayCalendar instance, i.e. once per run, in one query.
+# ─────────────────────────────────────────────────────────────────
+
+VERSION_KEY = "holiday_calendar:version"
+
+COMPILED_TTL = 7 * 24 * 3600
+
+_compiled = {}
+
+
+class HolidayCalendar:
+    """Per-run view over the compiled holiday cache.
+
+    Usage:
+        holidays = HolidayCalendar()
+        holidays.resolve(employees)                         # one query
+        dates = holidays.get_dates(employee, from_date, to_date)
+    """
+
+    def __init__(self):
+        self.version = get_version()
+        self.assignments = {}
+
+    def resolve(self, employees):
+        """Resolve and remember the effective Holiday List of each employee."""
+        pending = [e for e in employees if e not in self.assignments]
+        if not pending:
+            return
+
+        rows = frappe.db.sql("""
+            SELECT e.name AS employee,
+                   COALESCE(NULLIF(e.holiday_list, ''), c.default_holiday_list) AS holiday_list
+            FROM `tabEmployee` e
+            LEFT JOIN `tabCompany` c ON c.name = e.company
+            WHERE e.name IN %(employees)s
+        """, {"employees": pending}, as_dict=True)
+
+        for row in rows:
+            if not row.holiday_list:
+                frappe.logger().warning(
+                    f"Late Strike Processor: no holiday list found for employee {row.employee} "
+                    f"(and no company default). Holiday skipping is disabled for this employee."
+                )
+            self.assignments[row.employee] = row.holiday_list
+
+        for employee in pending:
+            self.assignments.setdefault(employee, None)
+
+    def get_holiday_list(self, employee):
+        if employee not in self.assignments:
+            self.resolve([employee])
+        return self.assignments[employee]
+
+    def get_dates(self, employee, from_date, to_date):
+        """Return the employee's holiday dates between from_date and to_date (inclusive)."""
+        holiday_list = self.get_holiday_list(employee)
+        if not holiday_list:
+            return set()
+
+        from_date, to_date = getdate(from_date), getdate(to_date)
+        dates = set()
+        for year in range(from_date.year, to_date.year + 1):
+            dates.update(d for d in self.get_year(holiday_list, year) if from_date <= d <= to_date)
+        return dates
+
+    def get_year(self, holiday_list, year):
+        """Return the compiled frozenset of holidays for one list and year."""
+        key = (frappe.local.site, holiday_list, year)
+        cached = _compiled.get(key)
+        if cached and cached[0] == self.version:
+            return cached[1]
+
+        stored = frappe.cache.hget(_list_key(holiday_list), str(year))
+        if stored is None:
+            stored = compile_year(holiday_list, year)
+            frappe.cache.hset(_list_key(holiday_list), str(year), stored)
+            frappe.cache.expire(frappe.cache.make_key(_list_key(holiday_list)), COMPILED_TTL)
+
+        dates = frozenset(getdate(d) for d in stored)
+        _compiled[key] = (self.version, dates)
+        return dates
+
+
+def compile_year(holiday_list, year):
+    """Read one year of a Holiday List from the database as sorted ISO dates."""
+    holidays = frappe.db.get_all(
+        "Holiday",
+        filters={
+            "parent": holiday_list,
+            "holiday_date": ["between", [f"{year}-01-01", f"{year}-12-31"]],
+        },
+        pluck="holiday_date",
+    )
+    return sorted(str(getdate(d)) for d in holidays)
+
+
+def get_version():
+    version = frappe.cache.get_value(VERSION_KEY)
+    if not version:
+        version = bump_version()
+    return version
+
+
+def bump_version():
+    version = frappe.generate_hash(length=10)
+    frappe.cache.set_value(VERSION_KEY, version)
+    return version
+
+
+def invalidate_holiday_list(holiday_list):
+    """Drop a list's compiled years everywhere once the current transaction commits
+    (Redis directly, processes via the version)."""
+
+    def _invalidate():
+        frappe.cache.delete_value(_list_key(holiday_list))
+        bump_version()
+
+    frappe.db.after_commit.add(_invalidate)
+
+
+def get_employees_using_holiday_list(holiday_list):
+    """Employees whose effective Holiday List is holiday_list (own or company default)."""
+    return frappe.db.sql_list("""
+        SELECT e.name
+        FROM `tabEmployee` e
+        LEFT JOIN `tabCompany` c ON c.name = e.company
+        WHERE COALESCE(NULLIF(e.holiday_list, ''), c.default_holiday_list) = %s
+    """, holiday_list)
+
+
+def _list_key(holiday_list):
+    return f"holiday_calendar:{holiday_list}"
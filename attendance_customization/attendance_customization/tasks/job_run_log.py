@@ -0,0 +1,222 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import now_datetime
+
+
+RUN_LOG_DOCTYPE = "Attendance Job Run Log"
+
+# How many of the slowest employees are kept on each run log.
+SLOWEST_EMPLOYEES = 10
+
+WRITE_STATEMENTS = ("insert", "update", "delete")
+
+
+# ─────────────────────────────────────────────────────────────────
+# Per-run metrics for scheduled jobs
+#
+# Usage:
+#     @tracked_job("Half Day No-Show Check")
+#     def check_half_day_no_show(...): ...
+#
+#     with track_job_run("Late Strike Processor", run_id=...) as run:
+#         ...
+#
+# While a run is active it is reachable through get_current_run(), so code
+# deep inside a job reports into it with record_metric() /
+# record_employee_time() — both are no-ops outside a tracked run. Queries,
+# rows read and rows written are counted by QueryCounter (see below).
+#
+# One Attendance Job Run Log is written per run, success or failure. The
+# tracker never commits or rolls back: the caller owns its transaction, and
+# the log is written by a short background job enqueued once that
+# transaction ends — after its commit, or after its rollback for a failed
+# run whose work is discarded. Recording never raises: a metrics problem
+# must not fail the job.
+# ─────────────────────────────────────────────────────────────────
+
+class JobRun:
+    def __init__(self, job, run_id=None):
+        self.job        = job
+        self.run_id     = run_id
+        self.started_on = now_datetime()
+        self.started    = time.perf_counter()
+        self.metrics    = {"employees_processed": 0, "penalties_applied": 0, "failures": 0}
+        self.employee_seconds = {}
+
+    def incr(self, key, amount=1):
+        self.metrics[key] = self.metrics.get(key, 0) + amount
+
+    def add_employee_time(self, employee, seconds):
+        self.employee_seconds[employee] = self.employee_seconds.get(employee, 0) + seconds
+
+    def slowest_employees(self):
+        ranked = sorted(self.employee_seconds.items(), key=lambda item: item[1], reverse=True)
+        return [{"employee": e, "seconds": round(s, 3)} for e, s in ranked[:SLOWEST_EMPLOYEES]]
+
+    def get_log_values(self, status, queries, error=None):
+        return {
+            "job":                 self.job,
+            "run_id":              self.run_id,
+            "status":              status,
+            "started_on":          self.started_on,
+            "ended_on":            now_datetime(),
+            "duration":            round(time.perf_counter() - self.started, 3),
+            "employees_processed": self.metrics["employees_processed"],
+            "penalties_applied":   self.metrics["penalties_applied"],
+            "failures":            self.metrics["failures"],
+            "queries":             queries.queries,
+            "rows_read":           queries.rows_read,
+            "rows_written":        queries.rows_written,
+            "slowest_employees":   json.dumps(self.slowest_employees(), indent=1) if self.employee_seconds else None,
+            "error":               error,
+        }
+
+
+class QueryCounter:
+    """Counts statements, rows read and rows written through frappe.db.sql.
+
+    Rows read are the rows returned by SELECTs; rows written are the affected
+    rows of INSERT / UPDATE / DELETE as reported by the cursor.
+
+    Every connection gets one counting wrapper, installed the first time a
+    counter starts on it and never removed. The wrapper reports to each
+    counter active in the current request or job (frappe.local), so nested
+    runs each see their own window of statements and starting or stopping
+    one counter never unhooks another.
+    """
+
+    def __init__(self):
+        self.queries      = 0
+        self.rows_read    = 0
+        self.rows_written = 0
+
+    def start(self):
+        _install_query_hook(frappe.db)
+        _active_counters().append(self)
+
+    def stop(self):
+        counters = _active_counters()
+        if self in counters:
+            counters.remove(self)
+
+    def count(self, query, result):
+        self.queries += 1
+        statement = str(query).lstrip().lower()
+        if statement.startswith(WRITE_STATEMENTS):
+            cursor = getattr(frappe.db, "_cursor", None)
+            self.rows_written += max(getattr(cursor, "rowcount", 0) or 0, 0)
+        elif isinstance(result, (list, tuple)):
+            self.rows_read += len(result)
+
+
+def _active_counters():
+    if getattr(frappe.local, "attendance_query_counters", None) is None:
+        frappe.local.attendance_query_counters = []
+    return frappe.local.attendance_query_counters
+
+
+def _install_query_hook(db):
+    if getattr(db, "_attendance_query_hook", False):
+        return
+
+    original = db.sql
+
+    def counting_sql(query, *args, **kwargs):
+        result = original(query, *args, **kwargs)
+        for counter in getattr(frappe.local, "attendance_query_counters", None) or ():
+            counter.count(query, result)
+        return result
+
+    db.sql = counting_sql
+    db._attendance_query_hook = True
+
+
+@contextmanager
+def track_job_run(job, run_id=None):
+    """Track one run of a job and write its Attendance Job Run Log on exit."""
+    run      = JobRun(job, run_id)
+    queries  = QueryCounter()
+    previous = getattr(frappe.local, "attendance_job_run", None)
+
+    frappe.local.attendance_job_run = run
+    queries.start()
+    status, error = "Success", None
+    try:
+        yield run
+    except Exception:
+        status, error = "Failed", frappe.get_traceback()
+        raise
+    finally:
+        queries.stop()
+        frappe.local.attendance_job_run = previous
+        _save_run(run, status, queries, error)
+
+
+def tracked_job(job):
+    """Decorator form of track_job_run."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track_job_run(job):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_current_run():
+    return getattr(frappe.local, "attendance_job_run", None)
+
+
+def record_metric(key, amount=1):
+    """Add to a counter of the active run (no-op when nothing is tracked)."""
+    run = get_current_run()
+    if run is not None:
+        run.incr(key, amount)
+
+
+def record_employee_time(employee, seconds):
+    """Add processing time for one employee to the active run (no-op when untracked)."""
+    run = get_current_run()
+    if run is not None:
+        run.add_employee_time(employee, seconds)
+
+
+def _save_run(run, status, queries, error):
+    """Write the run log once the caller's transaction commits or rolls back."""
+    try:
+        values  = run.get_log_values(status, queries, error)
+        pending = {"queued": False}
+
+        def enqueue_log():
+            if pending["queued"]:
+                return
+            pending["queued"] = True
+            try:
+                frappe.enqueue(
+                    "attendance_customization.attendance_customization.tasks.job_run_log.insert_run_log",
+                    queue="short",
+                    now=frappe.flags.in_test,
+                    values=values,
+                )
+            except Exception:
+                _log_save_error(run)
+
+        frappe.db.after_commit.add(enqueue_log)
+        frappe.db.after_rollback.add(enqueue_log)
+    except Exception:
+        _log_save_error(run)
+
+
+def insert_run_log(values):
+    frappe.get_doc({"doctype": RUN_LOG_DOCTYPE, **values}).insert(ignore_permissions=True)
+
+
+def _log_save_error(run):
+    frappe.log_error(
+        message=frappe.get_traceback(),
+        title=f"Attendance Job Run Log: could not record run of {run.job}",
+    )
@@ -0,0 +1,177 @@
+import frappe
+from frappe.utils import escape_html, get_first_day, get_last_day, getdate
+
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    EFFECTIVE_STATUS,
+    PENALTY_LEDGER_JOIN,
+)
+
+
+# Late arrivals in a month at which the employee and HR are notified (the same
+# limit as the "Exceeded monthly late arrival limit" remark).
+LATE_LIMIT = 3
+
+# Attendance Policy Settings.hr_notification_mode values.
+DISABLED = "Disabled"
+PER_EMPLOYEE = "Per Employee"
+DAILY_DIGEST = "Daily Digest"
+
+
+# ─────────────────────────────────────────────────────────────────
+# Late limit notifications
+#
+# Sent once per nightly run for the employees who arrived late on the
+# processed date and are now at or over LATE_LIMIT late 'Present' arrivals
+# for its month (one grouped query for all of them):
+#
+#   Disabled      nothing is sent (the default)
+#   Per Employee  the employee is told when they reach the limit; every HR
+#                 Manager gets one Notification Log per employee ("Late
+#                 Limit Reached" at the limit, "URGENT: Excessive Late
+#                 Arrivals" above it)
+#   Daily Digest  the employee notices are unchanged; every HR Manager gets
+#                 ONE Notification Log listing all of them
+#
+# Notification Logs are inserted as documents, so e-mail follows each
+# user's Notification Settings as for any other alert. The HR recipients
+# are read once by the caller and passed down explicitly.
+# ─────────────────────────────────────────────────────────────────
+
+def notify_late_limits(date, policy):
+    """Send the late limit notifications for `date`. Returns the number of employees notified about."""
+    mode = policy.get("hr_notification_mode") or DISABLED
+    if mode == DISABLED:
+        return 0
+
+    offenders = get_late_limit_offenders(date)
+    if not offenders:
+        return 0
+
+    hr_users   = get_hr_users()
+    month_year = getdate(date).strftime("%B %Y")
+
+    for row in offenders:
+        if row.late_count == LATE_LIMIT and row.user_id:
+            employee_name = escape_html(row.employee_name or "")
+            _notify(
+                row.user_id,
+                f"Late Arrival Limit Reached - {employee_name}",
+                f"""
+    <p>Dear {employee_name},</p>
+    <p>You have reached the maximum allowed late arrivals ({row.late_count}) for {month_year}.</p>
+    <p>Any additional late arrivals may result in disciplinary action.</p>
+    <p>Please ensure timely attendance going forward.</p>
+    """,
+                row.employee,
+            )
+
+    if mode == DAILY_DIGEST:
+        send_late_limit_digest(offenders, month_year, hr_users)
+    else:
+        for row in offenders:
+            notify_hr_about_employee(row, month_year, hr_users)
+
+    return len(offenders)
+
+
+def get_late_limit_offenders(date):
+    """Employees late on `date` with at least LATE_LIMIT late 'Present' arrivals in its month."""
+    date = getdate(date)
+    return frappe.db.sql(f"""
+        SELECT a.employee, e.employee_name, e.user_id, COUNT(*) AS late_count
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        INNER JOIN `tabEmployee` e ON e.name = a.employee
+        WHERE a.attendance_date BETWEEN %(first_day)s AND %(last_day)s
+          AND a.late_entry = 1
+          AND a.docstatus = 1
+          AND {EFFECTIVE_STATUS} = 'Present'
+          AND a.employee IN (
+              SELECT employee
+              FROM `tabAttendance`
+              WHERE attendance_date = %(date)s
+                AND late_entry = 1
+                AND docstatus = 1
+          )
+        GROUP BY a.employee, e.employee_name, e.user_id
+        HAVING late_count >= %(limit)s
+        ORDER BY late_count DESC, a.employee
+    """, {
+        "date":      date,
+        "first_day": get_first_day(date),
+        "last_day":  get_last_day(date),
+        "limit":     LATE_LIMIT,
+    }, as_dict=True)
+
+
+def get_hr_users():
+    """Enabled users with the HR Manager role."""
+    return frappe.db.sql_list("""
+        SELECT DISTINCT r.parent
+        FROM `tabHas Role` r
+        INNER JOIN `tabUser` u ON u.name = r.parent
+        WHERE r.role = 'HR Manager'
+          AND r.parenttype = 'User'
+          AND u.enabled = 1
+    """)
+
+
+def notify_hr_about_employee(row, month_year, hr_users):
+    """Per Employee mode: one notification per HR user for one offender."""
+    employee_name = escape_html(row.employee_name or "")
+    if row.late_count == LATE_LIMIT:
+        subject = f"Employee Late Limit Reached - {employee_name}"
+        content = f"""
+        <p>HR Alert: Employee {employee_name} ({row.employee}) has reached the late arrival limit.</p>
+        <p>Late arrivals in {month_year}: {row.late_count}</p>
+        <p>Please take appropriate action as per company policy.</p>
+        """
+    else:
+        subject = f"URGENT: Excessive Late Arrivals - {employee_name}"
+        content = f"""
+        <p>HR Alert: Employee {employee_name} ({row.employee}) has exceeded the late arrival limit.</p>
+        <p>Late arrivals in {month_year}: {row.late_count}</p>
+        <p>Please take appropriate action as per company policy.</p>
+        """
+
+    for user in hr_users:
+        _notify(user, subject, content, row.employee)
+
+
+def send_late_limit_digest(offenders, month_year, hr_users):
+    """Daily Digest mode: one notification per HR user listing every offender."""
+    subject = f"Late Arrival Digest - {month_year}: {len(offenders)} employee(s) at or over the limit"
+    content = get_late_limit_digest_html(offenders, month_year)
+
+    for user in hr_users:
+        _notify(user, subject, content)
+
+
+def get_late_limit_digest_html(offenders, month_year):
+    content = f"<p>HR Alert: employees at or over the late arrival limit in {month_year}.</p>"
+    content += "<table border='1' style='border-collapse: collapse;'>"
+    content += "<tr><th>Employee ID</th><th>Employee Name</th><th>Late Count</th><th>Status</th></tr>"
+
+    for row in offenders:
+        status = "<strong>Exceeded</strong>" if row.late_count > LATE_LIMIT else "Limit reached"
+        content += (
+            f"<tr><td>{row.employee}</td><td>{escape_html(row.employee_name or '')}</td>"
+            f"<td>{row.late_count}</td><td>{status}</td></tr>"
+        )
+
+    content += "</table>"
+    content += "<p>Please take appropriate action as per company policy.</p>"
+    return content
+
+
+def _notify(for_user, subject, content, employee=None):
+    notification = frappe.new_doc("Notification Log")
+    notification.subject = subject
+    notification.for_user = for_user
+    notification.type = "Alert"
+    if employee:
+        notification.document_type = "Employee"
+        notification.document_name = employee
+    notification.from_user = "Administrator"
+    notification.email_content = content
+    notification.insert(ignore_permissions=True)
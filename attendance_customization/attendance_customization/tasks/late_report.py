@@ -0,0 +1,294 @@
+import csv
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, cint, date_diff, get_first_day, get_last_day, get_url, getdate
+
+from attendance_customization.attendance_customization.tasks.job_run_log import record_metric, tracked_job
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    EFFECTIVE_PENALIZED,
+    EFFECTIVE_STATUS,
+    PENALTY_LEDGER_JOIN,
+)
+
+
+REPORT_FORMATS = ("CSV", "XLSX")
+
+# Attendance rows fetched per keyset page.
+REPORT_CHUNK_SIZE = 2000
+
+REPORT_TIMEOUT = 2 * 3600
+
+# Report files are attached here, so every user who can read the settings
+# (System Manager, HR Manager, HR User) can open the emailed link.
+REPORT_ATTACHED_TO = "Attendance Policy Settings"
+
+MAX_REPORT_DAYS = 366
+
+# The monthly report HR receives lists employees with at least this many
+# late arrivals in the month.
+MONTHLY_REPORT_MIN_LATE_COUNT = 3
+
+# (column, header) in file order.
+REPORT_COLUMNS = (
+    ("employee",             "Employee"),
+    ("employee_name",        "Employee Name"),
+    ("company",              "Company"),
+    ("department",           "Department"),
+    ("attendance_date",      "Attendance Date"),
+    ("status",               "Status"),
+    ("in_time",              "In Time"),
+    ("late_count",           "Late Arrivals in Period"),
+    ("late_strike_count",    "Strike Count"),
+    ("penalized",            "Late Penalty Applied"),
+    ("late_incident_remark", "Remark"),
+)
+
+
+# ─────────────────────────────────────────────────────────────────
+# Late arrival report export
+#
+# One row per submitted late 'Present' attendance in the date range,
+# optionally for one company and/or department, and optionally only for
+# employees with at least `min_late_count` late arrivals in the range. Status,
+# strike count, remark and the penalty flag are the effective (ledger-aware)
+# values, and a late arrival that has since been penalized is still listed
+# when it was 'Present' before the penalty.
+#
+# Rows are read in keyset pages of REPORT_CHUNK_SIZE (employee, date, name)
+# and written straight into a file under private/files — CSV with the csv
+# module, XLSX with a write-only openpyxl workbook — so memory stays flat
+# whatever the company size. The file is registered as a private File
+# attached to Attendance Policy Settings (REPORT_ATTACHED_TO) and recipients
+# get an email with a download link, never the table itself.
+#
+# Requested on demand from Attendance Policy Settings (Actions → Export Late
+# Report), and sent to HR Managers for the previous month by the monthly
+# scheduler.
+# ─────────────────────────────────────────────────────────────────
+
+@frappe.whitelist()
+def export_late_report(from_date, to_date, company=None, department=None,
+                       file_format="CSV", min_late_count=0):
+    """Queue a late arrival report; the file link is emailed to the requesting user."""
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    filters = get_report_filters(from_date, to_date, company, department, file_format, min_late_count)
+    recipient = frappe.db.get_value("User", frappe.session.user, "email")
+    if not recipient:
+        frappe.throw(_("Your user has no email address to send the report to."))
+
+    frappe.enqueue(
+        "attendance_customization.attendance_customization.tasks.late_report.send_late_report",
+        queue="long",
+        timeout=REPORT_TIMEOUT,
+        enqueue_after_commit=True,
+        filters=filters,
+        recipients=[recipient],
+    )
+    return _("The late arrival report is being prepared and will be emailed to {0}.").format(recipient)
+
+
+def send_monthly_late_report():
+    """Monthly (long queue): last month's report, employees with 3+ late arrivals, to HR Managers."""
+    recipients = get_hr_manager_emails()
+    if not recipients:
+        return
+
+    last_month = add_months(getdate(), -1)
+    filters = get_report_filters(
+        get_first_day(last_month),
+        get_last_day(last_month),
+        min_late_count=MONTHLY_REPORT_MIN_LATE_COUNT,
+    )
+    send_late_report(filters, recipients)
+
+
+def get_hr_manager_emails():
+    return frappe.db.sql_list("""
+        SELECT DISTINCT u.email
+        FROM `tabHas Role` r
+        INNER JOIN `tabUser` u ON u.name = r.parent
+        WHERE r.role = 'HR Manager'
+          AND r.parenttype = 'User'
+          AND u.enabled = 1
+          AND IFNULL(u.email, '') != ''
+    """)
+
+
+def get_report_filters(from_date, to_date, company=None, department=None, file_format="CSV", min_late_count=0):
+    """Validate and normalise report arguments into a frappe._dict."""
+    from_date, to_date = getdate(from_date), getdate(to_date)
+    if to_date < from_date:
+        frappe.throw(_("To Date cannot be before From Date."))
+    if date_diff(to_date, from_date) >= MAX_REPORT_DAYS:
+        frappe.throw(_("The report covers at most {0} days.").format(MAX_REPORT_DAYS))
+
+    file_format = (file_format or "CSV").upper()
+    if file_format not in REPORT_FORMATS:
+        frappe.throw(_("File format must be one of {0}.").format(", ".join(REPORT_FORMATS)))
+
+    return frappe._dict(
+        from_date=str(from_date),
+        to_date=str(to_date),
+        company=company or None,
+        department=department or None,
+        file_format=file_format,
+        min_late_count=cint(min_late_count),
+    )
+
+
+@tracked_job("Late Arrival Report")
+def send_late_report(filters, recipients):
+    """Background job: build the report file and email its link."""
+    filters = frappe._dict(filters)
+    file_doc, row_count = build_late_report(filters)
+    frappe.db.commit()
+
+    period = f"{filters.from_date} to {filters.to_date}"
+    scope  = ", ".join(v for v in (filters.company, filters.department) if v)
+    link   = get_url(file_doc.file_url)
+
+    frappe.sendmail(
+        recipients=recipients,
+        subject=_("Late Arrival Report - {0}").format(period),
+        message=_(
+            "<p>The late arrival report for {0}{1} is ready ({2} rows).</p>"
+            "<p><a href=\"{3}\">Download {4}</a></p>"
+        ).format(period, f" ({scope})" if scope else "", row_count, link, file_doc.file_name),
+    )
+    return file_doc.name
+
+
+def build_late_report(filters):
+    """Stream the report into a private File. Returns (File document, row count)."""
+    extension = filters.file_format.lower()
+    file_name = "late-arrivals-{}-{}-{}.{}".format(
+        filters.from_date, filters.to_date, frappe.generate_hash(length=6), extension
+    )
+    path = frappe.get_site_path("private", "files", file_name)
+
+    rows = iter_report_rows(filters)
+    if filters.file_format == "XLSX":
+        row_count = write_xlsx(path, rows)
+    else:
+        row_count = write_csv(path, rows)
+    record_metric("rows_exported", row_count)
+
+    file_doc = frappe.get_doc({
+        "doctype":             "File",
+        "file_name":           file_name,
+        "file_url":            f"/private/files/{file_name}",
+        "is_private":          1,
+        "file_size":           os.path.getsize(path),
+        "attached_to_doctype": REPORT_ATTACHED_TO,
+        "attached_to_name":    REPORT_ATTACHED_TO,
+    })
+    file_doc.insert(ignore_permissions=True)
+    return file_doc, row_count
+
+
+def iter_report_rows(filters, chunk_size=REPORT_CHUNK_SIZE):
+    """Yield report rows (dicts) page by page, ordered by employee and date."""
+    conditions, values = get_report_conditions(filters)
+
+    late_counts = dict(frappe.db.sql(f"""
+        SELECT a.employee, COUNT(*)
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        WHERE {conditions}
+        GROUP BY a.employee
+    """, values))
+
+    last = None
+    while True:
+        page_values = dict(values, limit=chunk_size)
+        keyset = ""
+        if last:
+            keyset = """
+              AND (a.employee, a.attendance_date, a.name)
+                  > (%(last_employee)s, %(last_date)s, %(last_name)s)
+            """
+            page_values.update(last_employee=last.employee, last_date=last.attendance_date, last_name=last.name)
+
+        page = frappe.db.sql(f"""
+            SELECT a.name, a.employee, a.employee_name, a.company, a.department,
+                   a.attendance_date, {EFFECTIVE_STATUS} AS status, a.in_time,
+                   COALESCE(p.strike_count, a.late_strike_count) AS late_strike_count,
+                   {EFFECTIVE_PENALIZED} AS penalized,
+                   COALESCE(p.remark, a.late_incident_remark) AS late_incident_remark
+            FROM `tabAttendance` a
+            {PENALTY_LEDGER_JOIN}
+            WHERE {conditions}
+            {keyset}
+            ORDER BY a.employee, a.attendance_date, a.name
+            LIMIT %(limit)s
+        """, page_values, as_dict=True)
+
+        for row in page:
+            row.late_count = late_counts.get(row.employee, 0)
+            if row.late_count >= filters.min_late_count:
+                row.penalized = "Yes" if cint(row.penalized) else "No"
+                yield row
+
+        if len(page) < chunk_size:
+            return
+        last = page[-1]
+
+
+def get_report_conditions(filters):
+    """WHERE clause over Attendance `a` with its ledger penalty `p` (PENALTY_LEDGER_JOIN)."""
+    conditions = [
+        "a.docstatus = 1",
+        "a.late_entry = 1",
+        "a.attendance_date BETWEEN %(from_date)s AND %(to_date)s",
+        f"""(
+            {EFFECTIVE_STATUS} = 'Present'
+            OR (
+                {EFFECTIVE_PENALIZED} = 1
+                AND COALESCE(p.original_status, NULLIF(a.custom_original_status, ''), 'Present') = 'Present'
+            )
+        )""",
+    ]
+    values = {"from_date": filters.from_date, "to_date": filters.to_date}
+
+    if filters.company:
+        conditions.append("a.company = %(company)s")
+        values["company"] = filters.company
+    if filters.department:
+        conditions.append("a.department = %(department)s")
+        values["department"] = filters.department
+
+    return " AND ".join(conditions), values
+
+
+def write_csv(path, rows):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([header for _, header in REPORT_COLUMNS])
+        for row in rows:
+            writer.writerow([_cell(row.get(column)) for column, _ in REPORT_COLUMNS])
+            count += 1
+    return count
+
+
+def write_xlsx(path, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Late Arrivals")
+    sheet.append([header for _, header in REPORT_COLUMNS])
+
+    count = 0
+    for row in rows:
+        sheet.append([row.get(column) for column, _ in REPORT_COLUMNS])
+        count += 1
+
+    workbook.save(path)
+    return count
+
+
+def _cell(value):
+    return "" if value is None else str(value)
@@ -0,0 +1,82 @@
+"""Pure strike counting engine for the late strike processor.
+
+No database access and no side effects: the engine takes one month of
+attendance, ordered by date, as plain (date, late, already_penalized) tuples
+and returns what the processor should do with each record. Persisting strike
+counts and applying penalties is the caller's job (late_strike_processor
+plans with this module and applies the result), which keeps the counting
+rules cheap to test, batch, simulate and parallelize.
+"""
+
+from collections import namedtuple
+
+
+CUMULATIVE            = "Cumulative"
+STRICTLY_CONSECUTIVE  = "Strictly Consecutive"
+CUMULATIVE_WITH_RESET = "Cumulative with Reset"
+
+COUNTING_MODES = (CUMULATIVE, STRICTLY_CONSECUTIVE, CUMULATIVE_WITH_RESET)
+
+# One entry per late, not-yet-penalized record:
+#   index         position of the record in the input sequence
+#   date          its attendance date
+#   strike_count  counter value to store as late_strike_count
+#   penalize      True when the record crosses the threshold
+StrikeDecision = namedtuple("StrikeDecision", ["index", "date", "strike_count", "penalize"])
+
+# decisions: list of StrikeDecision in input order
+# final_count: counter value after the last record (seed for a resumed run)
+StrikeResult = namedtuple("StrikeResult", ["decisions", "final_count"])
+
+
+def evaluate_strikes(records, counting_mode, strike_threshold, holiday_dates=frozenset(), seed=0):
+    """Run one counting mode over an ordered month of attendance.
+
+    Args:
+        records:          Ordered iterable of (date, late, already_penalized).
+        counting_mode:    One of COUNTING_MODES. Unknown modes decide nothing.
+        strike_threshold: Strikes allowed before a penalty; the first strike
+                          ABOVE it is penalized.
+        holiday_dates:    Dates that are neutral — skipped without touching
+                          the counter, in every mode.
+        seed:             Counter value carried in from earlier in the month.
+
+    Rules per mode:
+        Cumulative            every late adds a strike; already-penalized
+                              records still consumed a strike.
+        Strictly Consecutive  as Cumulative, but an on-time day resets the
+                              streak to zero.
+        Cumulative with Reset as Cumulative, but the counter resets to zero
+                              after each penalty (an already-penalized record
+                              marks such a reset).
+
+    Returns a StrikeResult.
+    """
+    threshold = int(strike_threshold or 0)
+    count     = seed or 0
+    decisions = []
+
+    if counting_mode not in COUNTING_MODES:
+        return StrikeResult(decisions, count)
+
+    for index, (att_date, late, already_penalized) in enumerate(records):
+        if att_date in holiday_dates:
+            continue
+
+        if already_penalized:
+            count = 0 if counting_mode == CUMULATIVE_WITH_RESET else count + 1
+            continue
+
+        if not late:
+            if counting_mode == STRICTLY_CONSECUTIVE:
+                count = 0
+            continue
+
+        count += 1
+        penalize = count > threshold
+        decisions.append(StrikeDecision(index, att_date, count, penalize))
+
+        if penalize and counting_mode == CUMULATIVE_WITH_RESET:
+            count = 0
+
+    return StrikeResult(decisions, count)
@@ -1,205 +1,679 @@
 import frappe
-from frappe.utils import getdate, get_first_day, get_last_day, add_days, today
+from frappe.utils import getdate, get_first_day, get_last_day, add_days, today, now_datetime, cint
 import calendar
+import time
+import zlib
+
+from attendance_customization.attendance_customization.tasks.half_day_cache import (
+    add_half_day_employee,
+    discard_half_day_employee,
+)
+from attendance_customization.attendance_customization.tasks.holiday_calendar import HolidayCalendar
+from attendance_customization.attendance_customization.tasks.job_run_log import (
+    record_employee_time,
+    record_metric,
+    track_job_run,
+)
+from attendance_customization.attendance_customization.tasks.late_limit_notifications import notify_late_limits
+from attendance_customization.attendance_customization.tasks.late_strike_engine import evaluate_strikes
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    EFFECTIVE_PENALIZED,
+    EFFECTIVE_STATUS,
+    LEDGER_DOCTYPE,
+    PENALTY_LEDGER_JOIN,
+    is_ledger_storage,
+)
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy, policy_changed
+
+
+WATERMARK_DOCTYPE = "Late Strike Watermark"
+
+# Job name on Attendance Job Run Log entries.
+JOB_NAME = "Late Strike Processor"
+
+# Rows per multi-row late_strike_count UPDATE when the policy doesn't set one.
+DEFAULT_WRITE_BATCH_SIZE = 500
+
+# Attendance Policy Settings.penalty_application value that switches penalty
+# creation from per-document cancel/amend to BulkPenaltyApplier.
+BULK_PENALTY_APPLICATION = "Bulk"
+
+# Statuses that take part in strike counting.
+ELIGIBLE_STATUSES = ("Present", "Half Day", "Work From Home")
+_ELIGIBLE_STATUS_LIST = "({})".format(", ".join(f"'{status}'" for status in ELIGIBLE_STATUSES))
+
+# Attendance rows that take part in strike counting. Shared by the month
+# loader and the Employee Monthly Late Summary so both always see exactly
+# the same records.
+# Written against Attendance `a` with its ledger penalty `p` LEFT JOINed
+# (PENALTY_LEDGER_JOIN): a ledger penalty overrides the status and, like an
+# amended penalty, drops the leave link.
+ELIGIBLE_ATTENDANCE_CONDITIONS = f"""
+    a.docstatus = 1
+    AND {EFFECTIVE_STATUS} IN {_ELIGIBLE_STATUS_LIST}
+    AND NOT (
+        {EFFECTIVE_STATUS} = 'Half Day'
+        AND p.name IS NULL
+        AND a.leave_application IS NOT NULL
+        AND a.leave_application != ''
+    )
+"""
+
+# The same rows as they were before any late penalty: an amended penalty is
+# judged by its original status (the SQL form of diff_employee_month's replay
+# rule). Ledger penalties leave the Attendance untouched, so `a` already
+# carries the original status and leave link. Used by the policy simulator.
+PRE_PENALTY_ATTENDANCE_CONDITIONS = f"""
+    a.docstatus = 1
+    AND (
+        (
+            IFNULL(a.custom_late_penalty_applied, 0) = 0
+            AND a.status IN {_ELIGIBLE_STATUS_LIST}
+            AND NOT (
+                a.status = 'Half Day'
+                AND a.leave_application IS NOT NULL
+                AND a.leave_application != ''
+            )
+        )
+        OR (
+            a.custom_late_penalty_applied = 1
+            AND IFNULL(NULLIF(a.custom_original_status, ''), 'Present') IN {_ELIGIBLE_STATUS_LIST}
+        )
+    )
+"""
+
+# Columns the month loader reads, with the effective (ledger-aware) status and flag.
+ELIGIBLE_ATTENDANCE_COLUMNS = f"""
+    a.name, a.employee, a.attendance_date, {EFFECTIVE_STATUS} AS status, a.late_entry,
+    {EFFECTIVE_PENALIZED} AS custom_late_penalty_applied, a.late_strike_count
+"""
 
 
 # ─────────────────────────────────────────────────────────────────
-# Holiday helpers
+# Scheduled entry point
 # ─────────────────────────────────────────────────────────────────
 
-def get_employee_holiday_dates(employee, month_start, month_end):
-    """Return a set of holiday dates (datetime.date) for the employee in the range.
+def daily_late_strike_processor():
+    """Daily scheduled task (2 AM) to process late attendance penalties.
+
+    With Shard Count > 1 the run is fanned out to background jobs on the long
+    queue (see enqueue_sharded_run); otherwise it runs serially right here.
+    Every serial run and every shard writes an Attendance Job Run Log.
 
-    Resolution order:
-      1. Employee's own holiday_list
-      2. Company's default_holiday_list
-      3. Empty set (logs a warning so ops can fix missing config)
+    Late limit notifications for yesterday are sent first, once for the
+    whole run (never per shard), in the HR Late Limit Notifications mode.
     """
-    holiday_list = frappe.db.get_value("Employee", employee, "holiday_list")
 
-    if not holiday_list:
-        company = frappe.db.get_value("Employee", employee, "company")
-        holiday_list = frappe.db.get_value("Company", company, "default_holiday_list")
+    policy = get_policy()
+    if not policy.enable_late_penalty:
+        return
+
+    send_late_limit_notifications(add_days(getdate(), -1), policy)
 
-    if not holiday_list:
-        frappe.logger().warning(
-            f"Late Strike Processor: no holiday list found for employee {employee} "
-            f"(and no company default). Holiday skipping is disabled for this employee."
+    if cint(policy.shard_count) > 1:
+        employees = frappe.get_all(
+            "Employee", filters={"status": "Active"}, fields=["name", "company"]
         )
-        return set()
-
-    holidays = frappe.db.get_all(
-        "Holiday",
-        filters={
-            "parent": holiday_list,
-            "holiday_date": ["between", [month_start, month_end]],
-        },
-        pluck="holiday_date",
-    )
-    return {getdate(d) for d in holidays}
+        enqueue_sharded_run(employees, policy)
+        return
+
+    with track_job_run(JOB_NAME):
+        employees = frappe.get_all("Employee", filters={"status": "Active"}, pluck="name")
+        run_late_strike_processor(employees, policy)
+
+
+def send_late_limit_notifications(date, policy):
+    """Notify employees and HR about late limits; a failure never blocks the penalty run."""
+    try:
+        notify_late_limits(date, policy)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(
+            message=frappe.get_traceback(),
+            title="Late Strike Processor: late limit notifications failed",
+        )
+
+
+def run_late_strike_processor(employees, policy):
+    """Process one set of employees (everyone, or a single shard) and commit.
+
+    Returns a summary dict: employees, processed, failed.
+    """
+    if policy.incremental_processing:
+        states, failures = process_incremental(employees, policy)
+    else:
+        states, failures = process_penalties_bulk(employees, policy)
+        log_employee_failures(failures)
+
+    frappe.db.commit()
+
+    record_metric("employees_processed", len(states))
+    record_metric("failures", len(failures))
+
+    return {
+        "employees": len(employees),
+        "processed": len(states),
+        "failed":    len(failures),
+    }
 
 
 # ─────────────────────────────────────────────────────────────────
-# Scheduled entry point
+# Sharded fan-out across RQ workers
 # ─────────────────────────────────────────────────────────────────
 
-def daily_late_strike_processor():
-    """Daily scheduled task (2 AM) to process late attendance penalties."""
+SHARD_JOB_TIMEOUT    = 7200
+SHARD_RUN_CACHE_TTL  = 86400  # aggregation keys outlive any realistic run
 
-    policy = frappe.get_single("Attendance Policy Settings")
-    if not policy.enable_late_penalty:
-        return
 
-    employees = frappe.get_all("Employee", filters={"status": "Active"}, pluck="name")
+def split_into_shards(employees, shard_count, shard_by="Employee Hash"):
+    """Split employee rows (name, company) into at most shard_count lists.
 
-    for employee in employees:
+    Employee Hash: stable crc32(employee) % shard_count — an employee always
+                   lands in the same shard, so runs are reproducible.
+    Company:       whole companies are kept together and packed greedily
+                   (largest first) into the currently smallest shard.
+    Empty shards are dropped.
+    """
+    shard_count = max(cint(shard_count), 1)
+    shards = [[] for _ in range(shard_count)]
+
+    if shard_by == "Company":
+        by_company = {}
+        for emp in employees:
+            by_company.setdefault(emp.company or "", []).append(emp.name)
+        for names in sorted(by_company.values(), key=len, reverse=True):
+            min(shards, key=len).extend(names)
+    else:
+        for emp in employees:
+            shards[zlib.crc32(emp.name.encode()) % shard_count].append(emp.name)
+
+    return [shard for shard in shards if shard]
+
+
+def enqueue_sharded_run(employees, policy):
+    """Enqueue one long-queue job per shard; the last job to finish logs the summary."""
+    shards = split_into_shards(employees, policy.shard_count, policy.shard_by)
+    if not shards:
+        return None
+
+    run_id = frappe.generate_hash(length=10)
+    frappe.cache.set_value(
+        _shard_run_key(run_id, "meta"),
+        {"shards": len(shards), "started": str(now_datetime())},
+        expires_in_sec=SHARD_RUN_CACHE_TTL,
+    )
+
+    for index, shard in enumerate(shards):
+        frappe.enqueue(
+            "attendance_customization.attendance_customization.tasks.late_strike_processor.process_shard",
+            queue="long",
+            timeout=SHARD_JOB_TIMEOUT,
+            job_name=f"late_strike_processor_{run_id}_{index}",
+            enqueue_after_commit=True,
+            run_id=run_id,
+            shard_index=index,
+            employees=shard,
+        )
+
+    frappe.logger().info(
+        f"Late Strike Processor [{run_id}]: enqueued {len(shards)} shard(s) "
+        f"for {len(employees)} employee(s) by {policy.shard_by or 'Employee Hash'}"
+    )
+    return run_id
+
+
+def process_shard(run_id, shard_index, employees):
+    """Background job: process one shard and report into the run's aggregate."""
+    policy = get_policy()
+
+    summary = {"employees": len(employees), "processed": 0, "failed": 0}
+    if policy.enable_late_penalty:
         try:
-            process_employee_penalties(employee, policy)
+            with track_job_run(JOB_NAME, run_id=f"{run_id}/{shard_index}"):
+                summary = run_late_strike_processor(employees, policy)
         except Exception:
-            # Log and continue — one bad employee must not block the rest.
+            frappe.db.rollback()
+            summary["failed"] = len(employees)
             frappe.log_error(
                 message=frappe.get_traceback(),
-                title=f"Late Strike Processor: failed for employee {employee}",
+                title=f"Late Strike Processor [{run_id}]: shard {shard_index} failed",
             )
 
-    frappe.db.commit()
+    _record_shard_result(run_id, shard_index, summary)
+
+
+def _record_shard_result(run_id, shard_index, summary):
+    """Store one shard's summary; the shard that completes the set logs the total."""
+    results_key = _shard_run_key(run_id, "results")
+    frappe.cache.hset(results_key, str(shard_index), summary)
+
+    # INCR is atomic, so exactly one shard sees the final count.
+    done_key = frappe.cache.make_key(_shard_run_key(run_id, "done"))
+    done = frappe.cache.incr(done_key)
+    frappe.cache.expire(done_key, SHARD_RUN_CACHE_TTL)
+
+    meta = frappe.cache.get_value(_shard_run_key(run_id, "meta")) or {}
+    if done < meta.get("shards", 0):
+        return
+
+    results = frappe.cache.hgetall(results_key) or {}
+    totals = {
+        key: sum(cint(r.get(key)) for r in results.values())
+        for key in ("employees", "processed", "failed")
+    }
+    frappe.logger().info(
+        f"Late Strike Processor [{run_id}]: {len(results)} shard(s) complete "
+        f"(started {meta.get('started')}) — employees={totals['employees']}, "
+        f"processed={totals['processed']}, failed={totals['failed']}"
+    )
+
+    frappe.cache.delete_value([_shard_run_key(run_id, "meta"), results_key])
+    frappe.cache.delete(done_key)
+
+
+def _shard_run_key(run_id, part):
+    return f"late_strike_processor:{run_id}:{part}"
+
+
+# ─────────────────────────────────────────────────────────────────
+# Incremental (watermark) mode
+# ─────────────────────────────────────────────────────────────────
+
+def process_incremental(employees, policy):
+    """Process each employee from its Late Strike Watermark instead of apply_from_date.
+
+    A watermark stores the last fully processed date plus the running counter
+    for that month, so an unchanged employee only evaluates the days since the
+    previous run. Any Attendance created, amended or cancelled since the
+    watermark's run (modified > last_run_on) rewinds that employee to the first
+    day of the earliest affected month — counters never cross months, so a
+    month start is always a safe restart point.
+
+    Full rescan fallback (from apply_from_date) when:
+      - the employee has no watermark yet (or it was invalidated/deleted),
+      - the policy signature changed (mode, threshold, action or start date).
+
+    last_run_on is the run START time: records written by this run's own
+    penalties are therefore picked up as "changed" next night, which costs one
+    extra month scan for that employee but never misses a concurrent edit.
+    """
+    run_started = now_datetime()
+    signature   = get_policy_signature(policy)
+    watermarks  = {
+        w.employee: w for w in frappe.get_all(
+            WATERMARK_DOCTYPE,
+            filters={"employee": ["in", employees]},
+            fields=["employee", "last_processed_date", "carried_count", "policy_signature"],
+        )
+    }
+    changed = get_earliest_changed_dates(employees)
+
+    resume_points = {
+        employee: resolve_resume_point(watermarks.get(employee), changed.get(employee), policy, signature)
+        for employee in employees
+    }
+
+    states, failures = process_penalties_bulk(employees, policy, resume_points)
+
+    for employee, state in states.items():
+        save_watermark(employee, state, run_started, signature, exists=employee in watermarks)
+
+    log_employee_failures(failures)
+
+    return states, failures
+
+
+def get_policy_signature(policy):
+    """Stable string of every policy value that affects strike counting."""
+    return "|".join(str(v or "") for v in (
+        policy.apply_from_date,
+        policy.counting_mode,
+        policy.strike_threshold,
+        policy.penalty_action,
+    ))
+
+
+def policy_superseded(policy):
+    """True when the saved policy was changed in a way that affects strike counting
+    since `policy` was loaded (see policy_cache.policy_changed)."""
+    return policy_changed(policy) and get_policy_signature(get_policy()) != get_policy_signature(policy)
+
+
+def get_earliest_changed_dates(employees):
+    """Return {employee: earliest attendance_date modified after that employee's watermark}.
+
+    One grouped query for the whole employee set — cancelled and draft rows
+    count too, because cancelling a late day changes the month's strike sequence.
+    """
+    if not employees:
+        return {}
+
+    rows = frappe.db.sql("""
+        SELECT a.employee, MIN(a.attendance_date) AS earliest_date
+        FROM `tabAttendance` a
+        INNER JOIN `tabLate Strike Watermark` w ON w.employee = a.employee
+        WHERE a.modified > w.last_run_on
+          AND a.employee IN %(employees)s
+        GROUP BY a.employee
+    """, {"employees": employees}, as_dict=True)
+    return {r.employee: getdate(r.earliest_date) for r in rows}
+
+
+def resolve_resume_point(watermark, earliest_changed, policy, signature):
+    """Return (from_date, carried_count) for one employee.
+
+    from_date=None means a full rescan from policy.apply_from_date.
+    """
+    if not watermark or not watermark.last_processed_date:
+        return None, 0
+    if watermark.policy_signature != signature:
+        return None, 0
+
+    last_processed = getdate(watermark.last_processed_date)
+    if add_days(last_processed, 1) < getdate(policy.apply_from_date):
+        return None, 0
+
+    if earliest_changed and earliest_changed <= last_processed:
+        # Something already counted changed — restart that whole month.
+        return get_first_day(earliest_changed), 0
+
+    from_date = add_days(last_processed, 1)
+    if get_first_day(from_date) != get_first_day(last_processed):
+        return from_date, 0  # new month — counters start from zero
+    return from_date, watermark.carried_count or 0
+
+
+def save_watermark(employee, state, run_started, signature, exists=None):
+    """Insert or update the employee's watermark with the state of this run."""
+    values = {
+        "last_processed_date": state.last_processed_date,
+        "carried_count":       state.carried_count,
+        "last_run_on":         run_started,
+        "policy_signature":    signature,
+    }
+
+    if exists is None:
+        exists = frappe.db.exists(WATERMARK_DOCTYPE, employee)
+
+    if exists:
+        frappe.db.set_value(WATERMARK_DOCTYPE, employee, values, update_modified=False)
+    else:
+        frappe.get_doc({"doctype": WATERMARK_DOCTYPE, "employee": employee, **values}).insert(
+            ignore_permissions=True
+        )
+
+
+def invalidate_watermarks(employee=None, employees=None):
+    """Drop watermarks so the next run does a full rescan.
+
+    Pass one employee, a list of employees, or nothing to invalidate everyone.
+    """
+    if employee:
+        filters = {"employee": employee}
+    elif employees is not None:
+        if not employees:
+            return
+        filters = {"employee": ["in", employees]}
+    else:
+        filters = {}
+    frappe.db.delete(WATERMARK_DOCTYPE, filters)
 
 
 # ─────────────────────────────────────────────────────────────────
-# Per-employee orchestration
+# Bulk (all-employee) orchestration
 # ─────────────────────────────────────────────────────────────────
 
-def process_employee_penalties(employee, policy):
-    """Process late penalties for one employee, month by month."""
+def load_month_attendance(employees, from_date, to_date):
+    """Fetch eligible attendance for many employees in one ordered query.
+
+    Returns {employee: [rows ordered by attendance_date]}.
+    """
+    rows = frappe.db.sql(f"""
+        SELECT {ELIGIBLE_ATTENDANCE_COLUMNS}
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        WHERE a.employee IN %(employees)s
+          AND a.attendance_date BETWEEN %(from_date)s AND %(to_date)s
+          AND {ELIGIBLE_ATTENDANCE_CONDITIONS}
+        ORDER BY a.employee, a.attendance_date
+    """, {"employees": employees, "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.employee, []).append(row)
+    return grouped
+
+
+def process_penalties_bulk(employees, policy, resume_points=None):
+    """Process late penalties for many employees, month by month.
+
+    Walks the calendar month by month; each month is one attendance query for
+    every employee that is due (or the given shard of employees), grouped in
+    memory and fed to the same counting functions. Holiday lists are resolved
+    once for the whole run from the compiled holiday calendar cache (employee
+    list, else company default), and late_strike_count is written back
+    through a StrikeCountWriter (chunked multi-row UPDATEs of changed values
+    only).
+
+    Args:
+        employees:     Employee IDs to process.
+        resume_points: Optional {employee: (from_date, carried_count)} from the
+                       watermark logic. Missing employees start at apply_from_date.
+
+    Returns (states, failures):
+        states:   {employee: frappe._dict(last_processed_date, carried_count)}
+        failures: {employee: traceback} — an employee that fails is dropped for
+                  the rest of the run.
+
+    Every due month is loaded and evaluated — the Employee Monthly Late
+    Summary is never trusted to skip one, since raw writes (the half-day
+    checker, checkin reconciliation) can change counted records without
+    Attendance hooks. Instead, the summaries of every evaluated employee-month
+    are refreshed after penalties are flushed, which also repairs any drift.
+    """
+    from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+        refresh_month_summaries,
+    )
 
     if not policy.apply_from_date:
         frappe.log_error(
             message="apply_from_date is not set on Attendance Policy Settings.",
             title="Late Strike Processor: missing apply_from_date",
         )
-        return
+        return {}, {}
 
-    policy_start = getdate(policy.apply_from_date)
-    today_date   = getdate(today())
+    if not employees:
+        return {}, {}
+
+    resume_points = resume_points or {}
+    policy_start  = getdate(policy.apply_from_date)
+    today_date    = getdate(today())
+
+    states = {}
+    for employee in employees:
+        from_date, carried_count = resume_points.get(employee, (None, 0))
+        start = max(getdate(from_date), policy_start) if from_date else policy_start
+        seed  = carried_count if from_date else 0
+        states[employee] = frappe._dict(
+            start=start,
+            seed=seed,
+            last_processed_date=add_days(start, -1),
+            carried_count=seed,
+        )
+
+    failures   = {}
+    run_start  = min(state.start for state in states.values())
+    holidays   = HolidayCalendar()
+    holidays.resolve(employees)
+    writer     = StrikeCountWriter(policy.get("write_batch_size"))
+    penalties  = get_penalty_applier(policy)
+    refresh    = {}   # {month_start: {employee: month-end counter}}
 
-    current_date = policy_start
+    current_date = run_start
     while current_date <= today_date:
+        if policy_superseded(policy):
+            # Stop at a month boundary: the watermarks saved for this run carry
+            # the old policy signature, so the next run rescans everyone.
+            frappe.log_error(
+                message=f"Stopped before {current_date}: Attendance Policy Settings changed during the run.",
+                title="Late Strike Processor: policy changed mid-run",
+            )
+            break
+
         month_start = get_first_day(current_date)
         month_end   = get_last_day(current_date)
 
-        # Respect apply_from_date: never process attendance before that date,
-        # even if it falls in the same calendar month.
-        effective_start = max(month_start, policy_start)
-
-        attendances = frappe.db.sql("""
-            SELECT name, attendance_date, status, late_entry, custom_late_penalty_applied
-            FROM `tabAttendance`
-            WHERE employee = %s
-              AND attendance_date BETWEEN %s AND %s
-              AND docstatus = 1
-              AND status IN ('Present', 'Half Day', 'Work From Home')
-              AND NOT (
-                  status = 'Half Day'
-                  AND leave_application IS NOT NULL
-                  AND leave_application != ''
-              )
-            ORDER BY attendance_date
-        """, (employee, effective_start, month_end), as_dict=True)
-
-        holiday_dates = get_employee_holiday_dates(employee, effective_start, month_end)
-
-        if policy.counting_mode == "Cumulative":
-            apply_cumulative_penalties(attendances, policy, holiday_dates)
-        elif policy.counting_mode == "Strictly Consecutive":
-            apply_consecutive_penalties(attendances, policy, holiday_dates)
-        elif policy.counting_mode == "Cumulative with Reset":
-            apply_cumulative_with_reset_penalties(attendances, policy, holiday_dates)
+        due = [
+            employee for employee, state in states.items()
+            if employee not in failures and state.start <= month_end
+        ]
+
+        if due:
+            query_start = max(month_start, min(states[e].start for e in due))
+            month_rows  = load_month_attendance(due, query_start, month_end)
+
+            for employee in due:
+                state = states[employee]
+                effective_start = max(month_start, state.start)
+                attendances = [
+                    a for a in month_rows.get(employee, [])
+                    if getdate(a.attendance_date) >= effective_start
+                ]
+                # Only the employee's first month is seeded with the carried count.
+                seed = state.seed if get_first_day(state.start) == month_start else 0
+
+                started = time.perf_counter()
+                try:
+                    result = plan_strikes(
+                        attendances, policy, holidays.get_dates(employee, month_start, month_end), seed
+                    )
+                    apply_strike_plan(attendances, policy, result.decisions, writer, penalties)
+                except Exception:
+                    failures[employee] = frappe.get_traceback()
+                    continue
+                finally:
+                    record_employee_time(employee, time.perf_counter() - started)
+
+                refresh.setdefault(month_start, {})[employee] = result.final_count
+
+                if attendances:
+                    state.carried_count       = result.final_count
+                    state.last_processed_date = getdate(attendances[-1].attendance_date)
 
         current_date = add_days(month_end, 1)
 
+    writer.flush()
+    if penalties is not None:
+        penalties.flush()
 
-# ─────────────────────────────────────────────────────────────────
-# Counting modes
-# ─────────────────────────────────────────────────────────────────
+    for month_start, counters in refresh.items():
+        refresh_month_summaries(
+            [e for e in counters if e not in failures], month_start, counters
+        )
 
-def apply_cumulative_penalties(attendances, policy, holiday_dates):
-    """All lates in the month accumulate; every late beyond the threshold is penalized."""
+    return {
+        employee: frappe._dict(
+            last_processed_date=state.last_processed_date,
+            carried_count=state.carried_count,
+        )
+        for employee, state in states.items()
+        if employee not in failures
+    }, failures
 
-    late_count = 0
-    for att in attendances:
-        att_date = getdate(att.attendance_date)
 
-        if att_date in holiday_dates:
-            continue
+def log_employee_failures(failures, title="Late Strike Processor: failed for employee {0}"):
+    """Write one Error Log per failed employee — one bad employee must not block the rest."""
+    for employee, traceback in failures.items():
+        frappe.log_error(message=traceback, title=title.format(employee))
 
-        # Already-penalized record: count it in the running total (the strike
-        # that triggered this penalty DID consume a slot) but don't re-penalize.
-        if att.get("custom_late_penalty_applied"):
-            late_count += 1
-            continue
 
-        if att.late_entry:
-            late_count += 1
-            frappe.db.set_value("Attendance", att.name,
-                                "late_strike_count", late_count, update_modified=False)
+# ─────────────────────────────────────────────────────────────────
+# Counting modes
+# ─────────────────────────────────────────────────────────────────
 
-            if late_count > policy.strike_threshold:
-                apply_penalty_to_attendance(att.name, policy, late_count, att_date)
+def plan_strikes(attendances, policy, holiday_dates, seed=0):
+    """Pure planning step: run the policy's counting mode over attendance rows."""
+    return evaluate_strikes(
+        _engine_records(attendances), policy.counting_mode, policy.strike_threshold, holiday_dates, seed
+    )
 
 
-def apply_consecutive_penalties(attendances, policy, holiday_dates):
-    """Only back-to-back late days count; any on-time day resets the streak to zero."""
+def apply_strike_plan(attendances, policy, decisions, writer=None, penalties=None):
+    """Side-effect step: store each strike count and apply the planned penalties.
 
-    consecutive_count = 0
-    for att in attendances:
-        att_date = getdate(att.attendance_date)
+    Records are handled in plan order — count first, then penalty — exactly as
+    the counting loops did before planning was split out. With a penalty
+    applier (bulk mode) penalties are queued and created when it flushes;
+    the plan never depends on them, so deferring them changes nothing.
+    """
+    for decision in decisions:
+        att = attendances[decision.index]
+        record_strike_count(att, decision.strike_count, writer)
 
-        # Holidays are neutral: they don't break the streak and don't count toward it.
-        if att_date in holiday_dates:
+        if not decision.penalize:
             continue
+        if penalties is not None:
+            penalties.add(att.name, decision.strike_count, decision.date)
+        else:
+            apply_penalty_to_attendance(att.name, policy, decision.strike_count, decision.date)
 
-        # Already-penalized record: treat as a late day for streak continuity
-        # (it was late — that's why it was penalized) but don't re-penalize.
-        if att.get("custom_late_penalty_applied"):
-            consecutive_count += 1
-            continue
 
-        if att.late_entry:
-            consecutive_count += 1
-            frappe.db.set_value("Attendance", att.name,
-                                "late_strike_count", consecutive_count, update_modified=False)
+def record_strike_count(att, count, writer=None):
+    """Persist late_strike_count for one record — buffered when a writer is given."""
+    if writer is not None:
+        writer.add(att, count)
+    else:
+        frappe.db.set_value("Attendance", att.name,
+                            "late_strike_count", count, update_modified=False)
+
 
-            if consecutive_count > policy.strike_threshold:
-                apply_penalty_to_attendance(att.name, policy, consecutive_count, att_date)
-        else:
-            consecutive_count = 0
+class StrikeCountWriter:
+    """Buffers late_strike_count values and flushes them as chunked multi-row UPDATEs.
 
+    One `UPDATE ... SET late_strike_count = CASE name WHEN .. THEN .. END
+    WHERE name IN (..)` per chunk replaces one set_value per late record.
+    Rows whose loaded late_strike_count already equals the computed value are
+    never written. Like the set_value(update_modified=False) it replaces, the
+    UPDATE leaves `modified` untouched.
+    """
 
-def apply_cumulative_with_reset_penalties(attendances, policy, holiday_dates):
-    """Cumulative count, but resets to zero after each penalty is applied."""
+    def __init__(self, chunk_size=None):
+        self.chunk_size = cint(chunk_size) or DEFAULT_WRITE_BATCH_SIZE
+        self.pending    = {}
+        self.written    = 0
 
-    late_count = 0
-    for att in attendances:
-        att_date = getdate(att.attendance_date)
+    def add(self, att, count):
+        if att.get("late_strike_count") is not None and cint(att.late_strike_count) == count:
+            self.pending.pop(att.name, None)
+            return
+        self.pending[att.name] = count
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
 
-        # Holidays are neutral — skip without touching the running count.
-        if att_date in holiday_dates:
-            continue
+    def flush(self):
+        items = list(self.pending.items())
+        self.pending = {}
 
-        # Already-penalized record: this was the record that triggered a reset.
-        # Reset our counter so we pick up where the penalty left off.
-        if att.get("custom_late_penalty_applied"):
-            late_count = 0
-            continue
+        for start in range(0, len(items), self.chunk_size):
+            chunk  = items[start:start + self.chunk_size]
+            cases  = " ".join(["WHEN %s THEN %s"] * len(chunk))
+            params = [value for pair in chunk for value in pair]
+            params.append(tuple(name for name, _ in chunk))
+
+            frappe.db.sql(f"""
+                UPDATE `tabAttendance`
+                SET late_strike_count = CASE name {cases} END
+                WHERE name IN %s
+            """, params)
+            self.written += len(chunk)
 
-        if att.late_entry:
-            late_count += 1
-            frappe.db.set_value("Attendance", att.name,
-                                "late_strike_count", late_count, update_modified=False)
 
-            if late_count > policy.strike_threshold:
-                apply_penalty_to_attendance(att.name, policy, late_count, att_date)
-                late_count = 0
+def _engine_records(attendances):
+    return [
+        (getdate(att.attendance_date), bool(att.late_entry), bool(att.get("custom_late_penalty_applied")))
+        for att in attendances
+    ]
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -211,6 +685,7 @@ def apply_penalty_to_attendance(attendance_name, policy, strike_count, attendanc
 
     attendance_date must be a datetime.date object (not a string).
     Uses a savepoint so a failed insert does not leave a cancelled-but-orphaned record.
+    Returns the name of the penalized copy, or None when nothing was applied.
     """
     # Ensure we have a date object for calendar lookups.
     attendance_date = getdate(attendance_date)
@@ -219,7 +694,7 @@ def apply_penalty_to_attendance(attendance_name, policy, strike_count, attendanc
         old_doc = frappe.get_doc("Attendance", attendance_name)
 
         if old_doc.custom_late_penalty_applied:
-            return  # already penalized — nothing to do
+            return None  # already penalized — nothing to do
 
         original_status = old_doc.status
 
@@ -230,49 +705,14 @@ def apply_penalty_to_attendance(attendance_name, policy, strike_count, attendanc
 
         new_doc = frappe.copy_doc(old_doc)
 
-        # frappe.copy_doc clears: name, owner, creation, modified, modified_by,
-        # docstatus, amended_from, amendment_date.
-        # It does NOT clear no_copy fields when ignore_no_copy=True (default).
-        # Attendance has no_copy on: naming_series, status, leave_application,
-        # amended_from — so leave_application IS copied and must be cleared manually.
-        # Also clear related fields that belong to the original context, not the penalty.
-        new_doc.name                        = None
-        new_doc.docstatus                   = 0
-        new_doc.amended_from               = None
-
-        # --- penalty status ---
-        new_doc.status                      = "Half Day" if policy.penalty_action == "Half-day" else "Absent"
-
-        # When penalty produces Half Day, half_day_status must be set explicitly.
-        # Absent penalties don't use half_day_status — clear it to avoid confusion.
-        new_doc.half_day_status             = "Absent" if policy.penalty_action == "Half-day" else None
-
-        # --- clear leave / request linkage ---
-        # leave_application has no_copy=1 but copy_doc copies it (ignore_no_copy=True).
-        # Carrying the leave link forward would make payroll treat this penalty
-        # attendance as a leave day instead of an absent/half-day deduction.
-        new_doc.leave_application           = None
-        new_doc.leave_type                  = None
-        new_doc.attendance_request          = None
-
-        # --- penalty flags ---
-        new_doc.custom_late_penalty_applied = 1
-        new_doc.custom_original_status      = original_status
-        new_doc.late_strike_count           = strike_count
-        new_doc.strike_processed            = 0   # reset so scheduler doesn't skip it
-
-        month_name = calendar.month_name[attendance_date.month]
-        year       = attendance_date.year
-        reset_note = " (Count reset to 0)" if policy.counting_mode == "Cumulative with Reset" else ""
-        new_doc.late_incident_remark = (
-            f"Strike #{strike_count} in {month_name} {year} "
-            f"- {policy.penalty_action} penalty applied{reset_note}"
-        )
+        set_penalty_fields(new_doc, policy, original_status, strike_count, attendance_date)
 
         new_doc.insert()
         new_doc.submit()
 
         frappe.db.release_savepoint("penalty_apply")
+        record_metric("penalties_applied")
+        return new_doc.name
 
     except Exception:
         frappe.db.rollback(save_point="penalty_apply")
@@ -280,6 +720,250 @@ def apply_penalty_to_attendance(attendance_name, policy, strike_count, attendanc
             message=frappe.get_traceback(),
             title=f"Late Strike Processor: failed to apply penalty on {attendance_name}",
         )
+        return None
+
+
+def set_penalty_fields(new_doc, policy, original_status, strike_count, attendance_date):
+    """Turn a copy of an attendance into its penalized replacement (in memory).
+
+    Shared by the document-lifecycle path and BulkPenaltyApplier so both
+    produce exactly the same field values.
+    """
+    # frappe.copy_doc clears: name, owner, creation, modified, modified_by,
+    # docstatus, amended_from, amendment_date.
+    # It does NOT clear no_copy fields when ignore_no_copy=True (default).
+    # Attendance has no_copy on: naming_series, status, leave_application,
+    # amended_from — so leave_application IS copied and must be cleared manually.
+    # Also clear related fields that belong to the original context, not the penalty.
+    new_doc.name                        = None
+    new_doc.docstatus                   = 0
+    new_doc.amended_from               = None
+
+    # --- penalty status ---
+    new_doc.status                      = get_penalty_status(policy)
+
+    # When penalty produces Half Day, half_day_status must be set explicitly.
+    # Absent penalties don't use half_day_status — clear it to avoid confusion.
+    new_doc.half_day_status             = "Absent" if policy.penalty_action == "Half-day" else None
+
+    # --- clear leave / request linkage ---
+    # leave_application has no_copy=1 but copy_doc copies it (ignore_no_copy=True).
+    # Carrying the leave link forward would make payroll treat this penalty
+    # attendance as a leave day instead of an absent/half-day deduction.
+    new_doc.leave_application           = None
+    new_doc.leave_type                  = None
+    new_doc.attendance_request          = None
+
+    # --- penalty flags ---
+    new_doc.custom_late_penalty_applied = 1
+    new_doc.custom_original_status      = original_status
+    new_doc.late_strike_count           = strike_count
+    new_doc.strike_processed            = 0   # reset so scheduler doesn't skip it
+
+    new_doc.late_incident_remark        = get_penalty_remark(policy, strike_count, attendance_date)
+
+
+def get_penalty_remark(policy, strike_count, attendance_date):
+    """late_incident_remark written on a penalized attendance."""
+    attendance_date = getdate(attendance_date)
+    month_name = calendar.month_name[attendance_date.month]
+    year       = attendance_date.year
+    reset_note = " (Count reset to 0)" if policy.counting_mode == "Cumulative with Reset" else ""
+    return (
+        f"Strike #{strike_count} in {month_name} {year} "
+        f"- {policy.penalty_action} penalty applied{reset_note}"
+    )
+
+
+def get_penalty_status(policy):
+    """Attendance status a penalty produces under the policy's penalty_action."""
+    return "Half Day" if policy.penalty_action == "Half-day" else "Absent"
+
+
+# ─────────────────────────────────────────────────────────────────
+# Bulk penalty application
+# ─────────────────────────────────────────────────────────────────
+
+def get_penalty_applier(policy):
+    """The applier the policy asks for, or None for the per-document path.
+
+    Penalty Ledger storage wins over Bulk application: ledger penalties never
+    touch the Attendance at all.
+    """
+    if is_ledger_storage(policy):
+        return LedgerPenaltyWriter(policy, policy.get("write_batch_size"))
+    if policy.get("penalty_application") == BULK_PENALTY_APPLICATION:
+        return BulkPenaltyApplier(policy, policy.get("write_batch_size"))
+    return None
+
+
+class BulkPenaltyApplier:
+    """Collects planned penalties and applies them in chunks without document hooks.
+
+    Per chunk, inside one savepoint:
+      1. SELECT the still-unpenalized submitted originals (FOR UPDATE);
+      2. cancel them with one UPDATE (docstatus=2);
+      3. unlink their Employee Checkins with one UPDATE — what the HRMS
+         Attendance.on_cancel hook does in the per-document path;
+      4. build each replacement with copy_doc + set_penalty_fields, name it
+         from the naming series and db_insert it already submitted;
+      5. update the half-day cache as the Attendance on_submit/on_cancel hooks
+         would: add Half Day replacements, re-check Half Day originals that
+         were replaced by something else.
+
+    Field values match apply_penalty_to_attendance exactly; what is skipped is
+    the hook chain (HRMS validate/on_submit/on_cancel, this app's attendance
+    hooks — which ignore penalty records anyway) and version/timeline entries.
+    If a chunk fails it is rolled back and retried record by record through
+    apply_penalty_to_attendance, so one bad row never blocks the rest.
+    """
+
+    def __init__(self, policy, chunk_size=None):
+        self.policy     = policy
+        self.chunk_size = cint(chunk_size) or DEFAULT_WRITE_BATCH_SIZE
+        self.pending    = {}
+        self.applied    = 0
+
+    def add(self, attendance_name, strike_count, attendance_date):
+        self.pending[attendance_name] = (strike_count, getdate(attendance_date))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        items = list(self.pending.items())
+        self.pending = {}
+
+        for start in range(0, len(items), self.chunk_size):
+            self._apply_chunk(dict(items[start:start + self.chunk_size]))
+
+    def _apply_chunk(self, plan):
+        try:
+            frappe.db.savepoint("bulk_penalty_apply")
+
+            originals = frappe.db.sql("""
+                SELECT *
+                FROM `tabAttendance`
+                WHERE name IN %s
+                  AND docstatus = 1
+                  AND IFNULL(custom_late_penalty_applied, 0) = 0
+                FOR UPDATE
+            """, (tuple(plan),), as_dict=True)
+
+            if originals:
+                names = tuple(row.name for row in originals)
+
+                frappe.db.sql("""
+                    UPDATE `tabAttendance`
+                    SET docstatus = 2, modified = %s, modified_by = %s
+                    WHERE name IN %s
+                """, (now_datetime(), frappe.session.user, names))
+
+                frappe.db.sql("""
+                    UPDATE `tabEmployee Checkin`
+                    SET attendance = NULL
+                    WHERE attendance IN %s
+                """, (names,))
+
+                for row in originals:
+                    strike_count, attendance_date = plan[row.name]
+                    new_doc = frappe.copy_doc(frappe.get_doc(dict(row, doctype="Attendance")))
+                    set_penalty_fields(new_doc, self.policy, row.status, strike_count, attendance_date)
+                    new_doc.docstatus = 1
+                    new_doc.set_new_name()
+                    new_doc.set_user_and_timestamp()
+                    new_doc.db_insert()
+
+                    if new_doc.status == "Half Day":
+                        add_half_day_employee(new_doc.employee, new_doc.attendance_date)
+                    elif row.status == "Half Day":
+                        discard_half_day_employee(row.employee, row.attendance_date)
+
+            frappe.db.release_savepoint("bulk_penalty_apply")
+
+        except Exception:
+            frappe.db.rollback(save_point="bulk_penalty_apply")
+            frappe.log_error(
+                message=frappe.get_traceback(),
+                title="Late Strike Processor: bulk penalty chunk failed, applying one by one",
+            )
+            for name, (strike_count, attendance_date) in plan.items():
+                if apply_penalty_to_attendance(name, self.policy, strike_count, attendance_date):
+                    self.applied += 1
+            return
+
+        self.applied += len(originals)
+        record_metric("penalties_applied", len(originals))
+
+
+class LedgerPenaltyWriter:
+    """Penalty applier for Penalty Ledger storage.
+
+    Same add/flush/applied interface as BulkPenaltyApplier, but a penalty is
+    one Attendance Penalty row, bulk-inserted per chunk; the Attendance stays
+    submitted and unchanged. Status, half_day_status, remark and strike
+    number are computed exactly as for an amended penalty.
+    """
+
+    def __init__(self, policy, chunk_size=None):
+        self.policy     = policy
+        self.chunk_size = cint(chunk_size) or DEFAULT_WRITE_BATCH_SIZE
+        self.pending    = {}
+        self.applied    = 0
+
+    def add(self, attendance_name, strike_count, attendance_date):
+        self.pending[attendance_name] = (strike_count, getdate(attendance_date))
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        items = list(self.pending.items())
+        self.pending = {}
+
+        for start in range(0, len(items), self.chunk_size):
+            self._write_chunk(dict(items[start:start + self.chunk_size]))
+
+    def _write_chunk(self, plan):
+        originals = frappe.db.sql(f"""
+            SELECT a.name, a.employee, a.status
+            FROM `tabAttendance` a
+            {PENALTY_LEDGER_JOIN}
+            WHERE a.name IN %s
+              AND a.docstatus = 1
+              AND IFNULL(a.custom_late_penalty_applied, 0) = 0
+              AND p.name IS NULL
+        """, (tuple(plan),), as_dict=True)
+
+        if not originals:
+            return
+
+        now    = now_datetime()
+        user   = frappe.session.user
+        status = get_penalty_status(self.policy)
+        half_day_status = "Absent" if self.policy.penalty_action == "Half-day" else None
+
+        values = []
+        for row in originals:
+            strike_count, attendance_date = plan[row.name]
+            values.append((
+                frappe.generate_hash(length=10), now, now, user, user,
+                row.name, row.employee, attendance_date,
+                row.status, status, half_day_status,
+                strike_count, get_penalty_remark(self.policy, strike_count, attendance_date),
+                self.policy.counting_mode, cint(self.policy.strike_threshold), self.policy.penalty_action,
+            ))
+
+        frappe.db.bulk_insert(
+            LEDGER_DOCTYPE,
+            ["name", "creation", "modified", "modified_by", "owner",
+             "attendance", "employee", "attendance_date",
+             "original_status", "penalty_status", "half_day_status",
+             "strike_count", "remark",
+             "counting_mode", "strike_threshold", "penalty_action"],
+            values,
+        )
+
+        self.applied += len(values)
+        record_metric("penalties_applied", len(values))
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -288,7 +972,7 @@ def apply_penalty_to_attendance(attendance_name, policy, strike_count, attendanc
 
 @frappe.whitelist()
 def reprocess_attendance_from_date(from_date=None, employee=None):
-    """Manually reprocess late penalties from a given date.
+    """Queue a manual reprocess of late penalties from a given date.
 
     Args:
         from_date: ISO date string (required).
@@ -297,97 +981,313 @@ def reprocess_attendance_from_date(from_date=None, employee=None):
 
     The policy's apply_from_date is NOT mutated — reprocessing is a one-off
     operation and should not permanently alter global config.
+
+    The work runs as a resumable Attendance Reprocess Job on the long queue
+    (see tasks.reprocess_job), so large ranges no longer time out inside the
+    HTTP request. Progress is pushed to the caller via publish_realtime.
+    Reprocessing is diff-based (see reprocess_penalties_diff): the target
+    penalty set is computed first and only records whose outcome changes go
+    through a cancel/amend cycle. Watermarks are left alone: every record it
+    touches gets a new `modified`, so the next nightly run rewinds exactly
+    the affected months.
+
+    Returns {"job": name, "message": str}.
     """
+    from attendance_customization.attendance_customization.tasks.reprocess_job import start_reprocess_job
+
+    frappe.only_for(["System Manager", "HR Manager"])
+
     if not from_date:
         frappe.throw("Please provide a from_date")
 
-    policy = frappe.get_single("Attendance Policy Settings")
+    policy = get_policy()
     if not policy.enable_late_penalty:
-        return "Late penalty is disabled in Attendance Policy Settings."
+        return {"job": None, "message": "Late penalty is disabled in Attendance Policy Settings."}
 
-    clear_penalties_from_date(from_date, employee=employee)
+    job   = start_reprocess_job(from_date, employee=employee)
+    scope = f"employee {employee}" if employee else "all employees"
+    return {
+        "job":     job.name,
+        "message": f"Reprocessing for {scope} from {from_date} has been queued as {job.name}.",
+    }
+
+
+def reprocess_penalties_diff(employees, policy, from_date):
+    """Bring penalties from from_date in line with the policy, touching only what differs.
+
+    The old clear-all-then-reapply flow cancelled and re-amended every penalty
+    from from_date and then penalized most of the same records again. Here
+    each month from from_date's month to today is read once for all
+    employees (penalized rows included) and evaluated with the strike engine
+    as if every penalty from from_date had been cleared first:
+
+      - penalized rows on/after from_date are replayed as their original
+        (pre-penalty) attendance;
+      - rows before from_date keep their current state, as they did when
+        only later penalties were cleared.
+
+    The plan is then compared with what is stored:
+
+      unchanged  penalized, and still penalized with the same status — only
+                 late_strike_count / late_incident_remark are refreshed when
+                 the strike number moved;
+      removed    penalized, but no longer (or with a different penalty
+                 status) — restored to the original status;
+      added      not penalized, but now — penalized as the nightly run would.
+
+    A changed penalty status counts as one removal plus one addition. Months
+    before from_date's month are left to the nightly run, which never
+    rewrites them either.
+
+    Returns (stats, failures):
+        stats:    frappe._dict(unchanged, added, removed)
+        failures: {employee: traceback}; a failing employee is skipped for
+                  the rest of the reprocess.
+    """
+    stats    = frappe._dict(unchanged=0, added=0, removed=0)
+    failures = {}
 
-    if employee:
-        employees = [employee]
-    else:
-        employees = frappe.get_all("Employee", filters={"status": "Active"}, pluck="name")
+    if not employees:
+        return stats, failures
 
-    for emp in employees:
-        try:
-            process_employee_penalties(emp, policy)
-        except Exception:
-            frappe.log_error(
-                message=frappe.get_traceback(),
-                title=f"Late Strike Processor (reprocess): failed for employee {emp}",
-            )
+    if not policy.apply_from_date:
+        frappe.log_error(
+            message="apply_from_date is not set on Attendance Policy Settings.",
+            title="Late Strike Processor: missing apply_from_date",
+        )
+        return stats, failures
 
-    frappe.db.commit()
+    from_date    = getdate(from_date)
+    policy_start = getdate(policy.apply_from_date)
+    today_date   = getdate(today())
 
-    filters = {"attendance_date": [">=", from_date], "custom_late_penalty_applied": 1, "docstatus": 1}
-    if employee:
-        filters["employee"] = employee
+    holidays = HolidayCalendar()
+    holidays.resolve(employees)
+    writer    = StrikeCountWriter(policy.get("write_batch_size"))
+    penalties = get_penalty_applier(policy)
+    changed   = set()
 
-    penalty_count = frappe.db.count("Attendance", filters)
-    scope = f"employee {employee}" if employee else "all employees"
-    return f"Reprocessing complete for {scope}. {penalty_count} penalized records now exist from {from_date}."
+    current_date = get_first_day(from_date)
+    while current_date <= today_date:
+        month_start = get_first_day(current_date)
+        month_end   = min(get_last_day(current_date), today_date)
+
+        due        = [e for e in employees if e not in failures]
+        month_rows = load_reprocess_attendance(due, month_start, month_end) if due else {}
+
+        for employee in due:
+            rows = month_rows.get(employee)
+            if not rows:
+                continue
+
+            try:
+                if diff_employee_month(
+                    rows, policy, from_date, policy_start,
+                    holidays.get_dates(employee, month_start, month_end), stats, writer, penalties,
+                ):
+                    changed.add(employee)
+            except Exception:
+                failures[employee] = frappe.get_traceback()
+
+        current_date = add_days(get_last_day(current_date), 1)
+
+    writer.flush()
+    if penalties is not None:
+        penalties.flush()
+        stats.added += penalties.applied
+
+    # Ledger inserts/deletes leave no trail in Attendance.modified, so the
+    # watermarks of employees whose ledger changed are dropped explicitly.
+    if changed and is_ledger_storage(policy):
+        invalidate_watermarks(employees=sorted(changed))
+
+    return stats, failures
+
+
+def load_reprocess_attendance(employees, from_date, to_date):
+    """All submitted attendance in the range, penalized or not, grouped by employee.
+
+    Eligibility is decided in memory by diff_employee_month because penalized
+    rows are judged by their original status.
+    """
+    rows = frappe.db.sql(f"""
+        SELECT a.name, a.employee, a.attendance_date, {EFFECTIVE_STATUS} AS status, a.late_entry,
+               IF(p.name IS NULL, a.leave_application, NULL) AS leave_application,
+               {EFFECTIVE_PENALIZED} AS custom_late_penalty_applied,
+               COALESCE(p.original_status, a.custom_original_status) AS custom_original_status,
+               COALESCE(p.strike_count, a.late_strike_count) AS late_strike_count,
+               COALESCE(p.remark, a.late_incident_remark) AS late_incident_remark,
+               p.name AS ledger_penalty
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        WHERE a.employee IN %(employees)s
+          AND a.attendance_date BETWEEN %(from_date)s AND %(to_date)s
+          AND a.docstatus = 1
+        ORDER BY a.employee, a.attendance_date
+    """, {"employees": employees, "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.employee, []).append(row)
+    return grouped
+
+
+def diff_employee_month(rows, policy, from_date, policy_start, holiday_dates, stats, writer, penalties=None):
+    """Plan one employee-month with the engine and apply only the differences.
+
+    Returns True when any penalty was added, removed or refreshed.
+    """
+    target_status = get_penalty_status(policy)
+    candidates    = []   # (row, replayed) in date order — what the engine sees
+    stale         = []   # penalized rows on/after from_date that can never stay
+
+    for row in rows:
+        att_date = getdate(row.attendance_date)
+        replayed = bool(row.custom_late_penalty_applied) and att_date >= from_date
+
+        if att_date < policy_start:
+            if replayed:
+                stale.append(row)
+            continue
+
+        if replayed:
+            if (row.custom_original_status or "Present") in ELIGIBLE_STATUSES:
+                candidates.append((row, True))
+            else:
+                stale.append(row)
+        elif row.status in ELIGIBLE_STATUSES and not (row.status == "Half Day" and row.leave_application):
+            candidates.append((row, False))
+
+    records = [
+        (getdate(row.attendance_date), bool(row.late_entry), bool(row.custom_late_penalty_applied) and not replayed)
+        for row, replayed in candidates
+    ]
+    result    = evaluate_strikes(records, policy.counting_mode, policy.strike_threshold, holiday_dates)
+    decisions = {d.index: d for d in result.decisions}
+
+    changed = False
+
+    for row in stale:
+        if remove_penalty(row):
+            stats.removed += 1
+            changed = True
+
+    for index, (row, replayed) in enumerate(candidates):
+        decision = decisions.get(index)
+        if decision is None:
+            if replayed and remove_penalty(row):
+                stats.removed += 1
+                changed = True
+            continue
+
+        if replayed and decision.penalize and row.status == target_status:
+            changed = refresh_penalty_strike(row, policy, decision) or changed
+            stats.unchanged += 1
+            continue
+
+        name = row.name
+        if replayed:
+            name = remove_penalty(row)
+            if not name:
+                continue
+            stats.removed += 1
+            changed = True
+            if not decision.penalize:
+                frappe.db.set_value("Attendance", name, "late_strike_count",
+                                    decision.strike_count, update_modified=False)
+                continue
+        else:
+            record_strike_count(row, decision.strike_count, writer)
+            if not decision.penalize:
+                continue
+
+        changed = True
+        if penalties is not None:
+            penalties.add(name, decision.strike_count, decision.date)   # counted on flush
+        elif apply_penalty_to_attendance(name, policy, decision.strike_count, decision.date):
+            stats.added += 1
+
+    return changed
+
+
+def refresh_penalty_strike(row, policy, decision):
+    """Keep an unchanged penalty's strike number and remark in step with the plan.
+
+    Returns True when something had to be written.
+    """
+    remark = get_penalty_remark(policy, decision.strike_count, decision.date)
+    if cint(row.late_strike_count) == decision.strike_count and row.get("late_incident_remark") == remark:
+        return False
+
+    if row.get("ledger_penalty"):
+        frappe.db.set_value(
+            LEDGER_DOCTYPE, row.ledger_penalty,
+            {"strike_count": decision.strike_count, "remark": remark},
+            update_modified=False,
+        )
+    else:
+        frappe.db.set_value(
+            "Attendance", row.name,
+            {"late_strike_count": decision.strike_count, "late_incident_remark": remark},
+            update_modified=False,
+        )
+    return True
+
+
+def remove_penalty(row):
+    """Undo one penalty in whichever storage it lives.
+
+    Returns the name of the attendance that is now unpenalized — the same
+    record for a ledger penalty, the restored amendment otherwise — or None
+    if restoring failed.
+    """
+    if row.get("ledger_penalty"):
+        frappe.db.delete(LEDGER_DOCTYPE, {"name": row.ledger_penalty})
+        return row.name
+    return restore_penalized_attendance(row.name, row.custom_original_status)
 
 
 # ─────────────────────────────────────────────────────────────────
-# Penalty clearing (used by reprocess)
+# Penalty clearing
 # ─────────────────────────────────────────────────────────────────
 
-def clear_penalties_from_date(from_date, employee=None):
-    """Cancel all penalty attendances from from_date and restore original status.
+def restore_penalized_attendance(attendance_name, original_status):
+    """Cancel one penalty attendance and replace it with an amended copy in its original status.
 
-    Args:
-        from_date: ISO date string.
-        employee:  When provided, only clears that employee's penalties.
+    Returns the name of the restored copy, or None if the restore failed (the
+    savepoint leaves the penalty in place and an Error Log is written).
     """
-    conditions = "attendance_date >= %s AND custom_late_penalty_applied = 1 AND docstatus = 1"
-    params     = [from_date]
+    try:
+        frappe.db.savepoint("clear_penalty")
 
-    if employee:
-        conditions += " AND employee = %s"
-        params.append(employee)
+        doc = frappe.get_doc("Attendance", attendance_name)
+        doc.cancel()
 
-    penalty_attendances = frappe.db.sql(
-        f"SELECT name, custom_original_status FROM `tabAttendance` WHERE {conditions}",
-        params,
-        as_dict=True,
-    )
+        new_doc                             = frappe.copy_doc(doc)
+        new_doc.name                        = None
+        new_doc.docstatus                   = 0
+        new_doc.amended_from               = None
+        new_doc.status                      = original_status or "Present"
+        # Clear penalty flags
+        new_doc.custom_late_penalty_applied = 0
+        new_doc.custom_original_status      = None
+        new_doc.late_incident_remark        = None
+        new_doc.late_strike_count           = 0
+        new_doc.strike_processed            = 0
+        # leave_application was cleared when penalty was applied, so the
+        # cancelled penalty doc has it as None — copy_doc carries that None
+        # forward correctly. No action needed here.
 
-    for att in penalty_attendances:
-        try:
-            frappe.db.savepoint("clear_penalty")
-
-            doc = frappe.get_doc("Attendance", att.name)
-            doc.cancel()
-
-            new_doc                             = frappe.copy_doc(doc)
-            new_doc.name                        = None
-            new_doc.docstatus                   = 0
-            new_doc.amended_from               = None
-            new_doc.status                      = att.custom_original_status or "Present"
-            # Clear penalty flags
-            new_doc.custom_late_penalty_applied = 0
-            new_doc.custom_original_status      = None
-            new_doc.late_incident_remark        = None
-            new_doc.late_strike_count           = 0
-            new_doc.strike_processed            = 0
-            # leave_application was cleared when penalty was applied, so the
-            # cancelled penalty doc has it as None — copy_doc carries that None
-            # forward correctly. No action needed here.
-
-            new_doc.insert()
-            new_doc.submit()
-
-            frappe.db.release_savepoint("clear_penalty")
+        new_doc.insert()
+        new_doc.submit()
 
-        except Exception:
-            frappe.db.rollback(save_point="clear_penalty")
-            frappe.log_error(
-                message=frappe.get_traceback(),
-                title=f"Late Strike Processor: failed to clear penalty for {att.name}",
-            )
+        frappe.db.release_savepoint("clear_penalty")
+        return new_doc.name
 
-    frappe.db.commit()
+    except Exception:
+        frappe.db.rollback(save_point="clear_penalty")
+        frappe.log_error(
+            message=frappe.get_traceback(),
+            title=f"Late Strike Processor: failed to clear penalty for {attendance_name}",
+        )
+        return None
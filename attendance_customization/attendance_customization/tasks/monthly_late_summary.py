@@ -0,0 +1,319 @@
+import frappe
+from frappe.utils import cint, get_first_day, get_last_day, getdate, now_datetime
+
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    ELIGIBLE_ATTENDANCE_CONDITIONS,
+    ELIGIBLE_STATUSES,
+)
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    EFFECTIVE_PENALIZED,
+    EFFECTIVE_STATUS,
+    PENALTY_LEDGER_JOIN,
+)
+
+
+SUMMARY_DOCTYPE = "Employee Monthly Late Summary"
+
+SUMMARY_FIELDS = (
+    "late_count", "present_late_count", "last_late_date", "consecutive_streak",
+    "last_attendance_date", "reset_counter", "penalties",
+)
+
+
+# ─────────────────────────────────────────────────────────────────
+# Employee Monthly Late Summary
+#
+# One row per employee and month, named <employee>-<YYYY-MM>, so the monthly
+# late count is a primary key read instead of a COUNT(*) over Attendance:
+#
+#   late_count            late arrivals that take part in strike counting
+#                         (same records the late strike processor counts)
+#   present_late_count    late arrivals with status Present — the month's
+#                         count in the Attendance late remark
+#   last_late_date        date of the latest of them
+#   consecutive_streak    late arrivals in a row up to last_attendance_date
+#   last_attendance_date  latest counted attendance of the month
+#   reset_counter         strike counter at month end under the policy's
+#                         counting mode — written by the processor only
+#   penalties             late penalties in the month (amended or ledger)
+#
+# Kept current by:
+#   - Attendance on_submit: O(1) update when the record is the newest of its
+#     month (the normal daily flow); anything back-dated rebuilds the month.
+#   - Attendance on_cancel: rebuilds the month (one indexed query).
+#   - The late strike processor: writes reset_counter and refreshes every
+#     month it evaluated (bulk penalty application and the ledger bypass
+#     document hooks).
+#   - Writers that change a counted record without Attendance hooks — the
+#     half-day no-show checker, checkin reconciliation re-linking a leave,
+#     and the Leave Application / Attendance Request hooks after HRMS's
+#     db_set — call refresh_attendance_summaries for the dates they touched.
+#
+# A missing row is never wrong, only slower: readers rebuild it on demand.
+# The processor never skips work based on a summary.
+# ─────────────────────────────────────────────────────────────────
+
+def get_summary_name(employee, month):
+    return "{}-{}".format(employee, getdate(month).strftime("%Y-%m"))
+
+
+def get_month_summaries(employees, month):
+    """{employee: summary row} for one month; employees without a row are absent."""
+    if not employees:
+        return {}
+
+    names = [get_summary_name(e, month) for e in employees]
+    rows = frappe.get_all(
+        SUMMARY_DOCTYPE,
+        filters={"name": ["in", names]},
+        fields=["name", "employee", *SUMMARY_FIELDS],
+    )
+    return {r.employee: r for r in rows}
+
+
+def get_month_late_count(employee, attendance_date):
+    """Submitted late arrivals with status Present in attendance_date's month."""
+    late_count = frappe.db.get_value(
+        SUMMARY_DOCTYPE, get_summary_name(employee, attendance_date), "present_late_count"
+    )
+    if late_count is None:
+        summary = rebuild_month_summary(employee, attendance_date)
+        late_count = summary.present_late_count
+    return cint(late_count)
+
+
+# ─────────────────────────────────────────────────────────────────
+# Incremental updates (Attendance hooks)
+# ─────────────────────────────────────────────────────────────────
+
+def record_attendance_submit(doc):
+    """Fold a newly submitted attendance into its month's summary."""
+    if not doc.employee or not doc.attendance_date:
+        return
+
+    penalized = cint(doc.get("custom_late_penalty_applied"))
+    if not is_counted(doc):
+        # Only a full-day penalty outside counting still changes the summary.
+        if penalized:
+            rebuild_month_summary(doc.employee, doc.attendance_date)
+        return
+
+    attendance_date = getdate(doc.attendance_date)
+    name    = get_summary_name(doc.employee, attendance_date)
+    summary = frappe.db.get_value(
+        SUMMARY_DOCTYPE, name, list(SUMMARY_FIELDS), as_dict=True, for_update=True
+    )
+
+    if not summary or (
+        summary.last_attendance_date and attendance_date <= getdate(summary.last_attendance_date)
+    ):
+        rebuild_month_summary(doc.employee, attendance_date)
+        return
+
+    values = {
+        "last_attendance_date": attendance_date,
+        "consecutive_streak":   cint(summary.consecutive_streak) + 1 if doc.late_entry else 0,
+    }
+    if doc.late_entry:
+        values["late_count"]     = cint(summary.late_count) + 1
+        values["last_late_date"] = attendance_date
+        if doc.status == "Present":
+            values["present_late_count"] = cint(summary.present_late_count) + 1
+    if penalized:
+        values["penalties"] = cint(summary.penalties) + 1
+
+    frappe.db.set_value(SUMMARY_DOCTYPE, name, values, update_modified=False)
+
+
+def is_counted(doc):
+    """Python twin of ELIGIBLE_ATTENDANCE_CONDITIONS for one submitted document.
+
+    A record being submitted has no ledger penalty yet, so its own status is
+    the effective status.
+    """
+    if doc.status not in ELIGIBLE_STATUSES:
+        return False
+    return not (doc.status == "Half Day" and doc.get("leave_application"))
+
+
+# ─────────────────────────────────────────────────────────────────
+# Rebuilds
+# ─────────────────────────────────────────────────────────────────
+
+def rebuild_month_summary(employee, month):
+    """Recompute one employee-month from Attendance and store it. Returns the summary."""
+    month_start = get_first_day(month)
+    return refresh_month_summaries([employee], month_start)[employee]
+
+
+def refresh_attendance_summaries(employee_dates):
+    """Rebuild the summaries of the months holding the given (employee, date) pairs."""
+    months = {}
+    for employee, day in employee_dates:
+        if employee and day:
+            months.setdefault(get_first_day(day), set()).add(employee)
+
+    for month_start, employees in months.items():
+        refresh_month_summaries(sorted(employees), month_start)
+
+
+def refresh_month_summaries(employees, month, reset_counters=None):
+    """Recompute the month's summary for many employees in one query.
+
+    reset_counters ({employee: counter}) replaces the stored reset_counter;
+    employees not in it keep theirs. Only rows whose values changed are
+    written; missing rows are bulk-inserted. Returns {employee: summary}.
+    """
+    if not employees:
+        return {}
+
+    month_start    = get_first_day(month)
+    month_end      = get_last_day(month_start)
+    reset_counters = reset_counters or {}
+
+    rows = frappe.db.sql(f"""
+        SELECT a.employee, a.attendance_date, a.late_entry,
+               {EFFECTIVE_STATUS} AS status,
+               {EFFECTIVE_PENALIZED} AS custom_late_penalty_applied,
+               ({ELIGIBLE_ATTENDANCE_CONDITIONS}) AS counted
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        WHERE a.employee IN %(employees)s
+          AND a.attendance_date BETWEEN %(from_date)s AND %(to_date)s
+          AND a.docstatus = 1
+        ORDER BY a.employee, a.attendance_date
+    """, {"employees": employees, "from_date": month_start, "to_date": month_end}, as_dict=True)
+
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row.employee, []).append(row)
+
+    existing = get_month_summaries(employees, month_start)
+    summaries, missing = {}, []
+
+    for employee in employees:
+        current = existing.get(employee)
+        summary = summarize_month(grouped.get(employee, []))
+        summary.reset_counter = cint(
+            reset_counters.get(employee, current.reset_counter if current else 0)
+        )
+        summaries[employee] = summary
+
+        if current is None:
+            missing.append((employee, summary))
+        elif any(_differs(current.get(f), summary[f]) for f in SUMMARY_FIELDS):
+            frappe.db.set_value(SUMMARY_DOCTYPE, current.name, dict(summary), update_modified=False)
+
+    if missing:
+        _insert_summaries(missing, month_start)
+
+    return summaries
+
+
+def summarize_month(rows):
+    """Summary values from one employee's submitted attendance of a month, in date order.
+
+    Rows carry attendance_date, late_entry, status (effective),
+    custom_late_penalty_applied and `counted` (whether the record takes part
+    in strike counting).
+    """
+    summary = frappe._dict(
+        late_count=0,
+        present_late_count=0,
+        last_late_date=None,
+        consecutive_streak=0,
+        last_attendance_date=None,
+        penalties=0,
+    )
+
+    for row in rows:
+        if cint(row.custom_late_penalty_applied):
+            summary.penalties += 1
+        if not cint(row.counted):
+            continue
+
+        summary.last_attendance_date = getdate(row.attendance_date)
+        if row.late_entry:
+            summary.late_count        += 1
+            summary.last_late_date     = summary.last_attendance_date
+            summary.consecutive_streak += 1
+            if row.status == "Present":
+                summary.present_late_count += 1
+        else:
+            summary.consecutive_streak = 0
+
+    return summary
+
+
+def _insert_summaries(items, month_start):
+    now  = now_datetime()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        SUMMARY_DOCTYPE,
+        ["name", "creation", "modified", "modified_by", "owner",
+         "employee", "month", *SUMMARY_FIELDS],
+        [
+            (get_summary_name(employee, month_start), now, now, user, user,
+             employee, month_start, *(s[f] for f in SUMMARY_FIELDS))
+            for employee, s in items
+        ],
+        ignore_duplicates=True,
+    )
+
+
+def _differs(stored, computed):
+    if computed is None or stored is None:
+        return stored != computed
+    if isinstance(computed, int):
+        return cint(stored) != computed
+    return getdate(stored) != computed
+
+
+# ─────────────────────────────────────────────────────────────────
+# Read API
+# ─────────────────────────────────────────────────────────────────
+
+def get_monthly_late_summary(employee, month=None, year=None, include_entries=False):
+    """
+    Get late arrival summary for an employee for a specific month.
+
+    late_count covers late records with status Present, as it always has,
+    and is read with the strike counting state from the stored Employee
+    Monthly Late Summary. The per-day late_entries are only queried when
+    include_entries is set.
+    """
+    if not month or not year:
+        today = getdate()
+        month = today.month
+        year = today.year
+
+    first_day = getdate("{}-{:02d}-01".format(year, month))
+
+    summary = frappe.db.get_value(
+        SUMMARY_DOCTYPE, get_summary_name(employee, first_day), list(SUMMARY_FIELDS), as_dict=True
+    ) or rebuild_month_summary(employee, first_day)
+
+    result = {
+        "employee":           employee,
+        "month":              first_day.strftime("%B %Y"),
+        "late_count":         cint(summary.present_late_count),
+        "last_late_date":     summary.last_late_date,
+        "consecutive_streak": cint(summary.consecutive_streak),
+        "reset_counter":      cint(summary.reset_counter),
+        "penalties":          cint(summary.penalties),
+    }
+
+    if include_entries:
+        result["late_entries"] = frappe.db.sql(f"""
+            SELECT a.name, a.attendance_date, a.late_incident_remark
+            FROM `tabAttendance` a
+            {PENALTY_LEDGER_JOIN}
+            WHERE a.employee = %s
+              AND a.attendance_date BETWEEN %s AND %s
+              AND a.late_entry = 1
+              AND a.docstatus = 1
+              AND {EFFECTIVE_STATUS} = 'Present'
+            ORDER BY a.attendance_date
+        """, (employee, first_day, get_last_day(first_day)), as_dict=True)
+
+    return result
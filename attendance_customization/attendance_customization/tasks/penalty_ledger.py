@@ -0,0 +1,117 @@
+import frappe
+from frappe.utils import flt, getdate
+
+
+LEDGER_DOCTYPE = "Attendance Penalty"
+
+# Attendance Policy Settings.penalty_storage value for ledger storage.
+LEDGER_STORAGE = "Penalty Ledger"
+
+PENALTY_DAYS = {"Half Day": 0.5, "Absent": 1.0}
+
+
+# ─────────────────────────────────────────────────────────────────
+# Penalty ledger
+#
+# In "Penalty Ledger" storage a late penalty is one Attendance Penalty row
+# linked to the untouched, still-submitted Attendance: status override,
+# half_day_status override, strike number, remark and the policy values it
+# was computed with. Applying or clearing a penalty is an insert or delete
+# on this small indexed table instead of a cancel/amend cycle that leaves a
+# cancelled Attendance behind every time.
+#
+# Everything that reads attendance for strike counting goes through the SQL
+# snippets below (ledger LEFT JOINed as `p` onto Attendance `a`), so both
+# storage modes — and a site that switched from one to the other — see the
+# same effective status. Amended penalties simply carry it on the Attendance.
+# ─────────────────────────────────────────────────────────────────
+
+PENALTY_LEDGER_JOIN = "LEFT JOIN `tabAttendance Penalty` p ON p.attendance = a.name"
+
+EFFECTIVE_STATUS = "COALESCE(p.penalty_status, a.status)"
+
+EFFECTIVE_PENALIZED = "IF(p.name IS NULL, IFNULL(a.custom_late_penalty_applied, 0), 1)"
+
+
+def is_ledger_storage(policy):
+    return policy.get("penalty_storage") == LEDGER_STORAGE
+
+
+def delete_ledger_penalties(attendance_names):
+    """Drop the ledger rows of the given attendances (no-op for an empty list)."""
+    if attendance_names:
+        frappe.db.delete(LEDGER_DOCTYPE, {"attendance": ["in", list(attendance_names)]})
+
+
+# ─────────────────────────────────────────────────────────────────
+# Payroll-facing API
+# ─────────────────────────────────────────────────────────────────
+
+@frappe.whitelist()
+def get_effective_attendance(employee, from_date, to_date):
+    """Submitted attendance of one employee with late penalties applied.
+
+    Works for both storage modes: ledger penalties override status and
+    half_day_status, amended penalties are already on the Attendance.
+    HRMS salary slips read tabAttendance directly; the Salary Slip validate
+    hook (doctype_events.salary_slip) deducts ledger penalties for them.
+    Other payroll integrations should read attendance through this (or
+    get_effective_penalty_days) when Penalty Ledger storage is enabled.
+    """
+    _check_employee_access(employee)
+
+    return frappe.db.sql(f"""
+        SELECT a.name, a.attendance_date,
+               {EFFECTIVE_STATUS} AS status,
+               IF(p.name IS NULL, a.half_day_status, p.half_day_status) AS half_day_status,
+               {EFFECTIVE_PENALIZED} AS late_penalty_applied,
+               COALESCE(p.strike_count, a.late_strike_count) AS late_strike_count,
+               p.name AS penalty
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        WHERE a.employee = %(employee)s
+          AND a.attendance_date BETWEEN %(from_date)s AND %(to_date)s
+          AND a.docstatus = 1
+        ORDER BY a.attendance_date
+    """, {"employee": employee, "from_date": getdate(from_date), "to_date": getdate(to_date)}, as_dict=True)
+
+
+@frappe.whitelist()
+def get_effective_penalty_days(employee, from_date, to_date):
+    """Extra salary deduction days from ledger penalties in a range.
+
+    Only ledger penalties are counted: amended penalties already reduce
+    payment days through the Attendance status HRMS reads.
+    """
+    _check_employee_access(employee)
+    return get_ledger_penalty_days(employee, from_date, to_date)
+
+
+def get_ledger_penalty_days(employee, from_date, to_date):
+    """get_effective_penalty_days without the permission check, for server-side callers."""
+    rows = frappe.db.sql("""
+        SELECT p.penalty_status, a.status, COUNT(*) AS penalties
+        FROM `tabAttendance Penalty` p
+        INNER JOIN `tabAttendance` a ON a.name = p.attendance AND a.docstatus = 1
+        WHERE p.employee = %(employee)s
+          AND p.attendance_date BETWEEN %(from_date)s AND %(to_date)s
+        GROUP BY p.penalty_status, a.status
+    """, {"employee": employee, "from_date": getdate(from_date), "to_date": getdate(to_date)}, as_dict=True)
+
+    return sum(get_penalty_deduction(r.penalty_status, r.status) * r.penalties for r in rows)
+
+
+def get_penalty_deduction(penalty_status, original_status):
+    """Days a ledger penalty deducts on top of what HRMS deducts for the Attendance.
+
+    The Attendance keeps its original status in ledger storage and HRMS
+    already deducts for that (0.5 for a Half Day), so only the difference to
+    the penalty status is added — the same total an amended penalty gives.
+    """
+    return max(flt(PENALTY_DAYS.get(penalty_status)) - flt(PENALTY_DAYS.get(original_status)), 0)
+
+
+def _check_employee_access(employee):
+    """Whitelisted reads are limited to employees the user may see."""
+    frappe.has_permission("Attendance", "read", throw=True)
+    frappe.has_permission("Employee", "read", employee, throw=True)
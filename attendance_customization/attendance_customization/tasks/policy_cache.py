@@ -0,0 +1,68 @@
+import hashlib
+
+import frappe
+
+
+SETTINGS_DOCTYPE = "Attendance Policy Settings"
+
+CACHE_KEY = "attendance_policy:settings"
+
+# Writes that bypass on_update (set_single_value, patches, direct SQL) are
+# picked up at the latest after this long.
+CACHE_TTL = 3600
+
+
+# ─────────────────────────────────────────────────────────────────
+# Cached Attendance Policy Settings
+#
+# The policy is read by every scheduler run, shard, reprocess batch and form
+# call, but changes a few times a year. It is kept in Redis as a plain dict
+# under one key, together with a `policy_version` stamp hashed from the
+# saved values:
+#
+#   get_policy()       one Redis GET; the database is only read when the
+#                      key is missing (first use, expiry, cache flush)
+#   refresh on save    AttendancePolicySettings.on_update rewrites the key
+#                      once the save has committed
+#   clear_policy_cache registered as the app's clear_cache and after_migrate
+#                      hook; the key also expires after CACHE_TTL
+#   policy_changed()   lets a long job compare the stamp it started with
+#                      against the current one between batches
+#
+# The stamp only changes when the values do, so a reload after expiry or a
+# cache flush does not make a running job think the policy changed. Values
+# and stamp live in the same key, so a reader never sees one without the
+# other. Callers get their own copy and may modify it freely.
+# ─────────────────────────────────────────────────────────────────
+
+def get_policy():
+    """Attendance Policy Settings as a frappe._dict carrying its policy_version."""
+    cached = frappe.cache.get_value(CACHE_KEY)
+    if cached is None:
+        cached = refresh_policy_cache()
+    return frappe._dict(cached)
+
+
+def get_policy_version():
+    cached = frappe.cache.get_value(CACHE_KEY)
+    if cached is None:
+        cached = refresh_policy_cache()
+    return cached["policy_version"]
+
+
+def policy_changed(policy):
+    """True when the settings were saved after `policy` was loaded."""
+    return policy.get("policy_version") != get_policy_version()
+
+
+def refresh_policy_cache(doc=None):
+    """Store the saved settings (or `doc`) with their version stamp and return them."""
+    doc    = doc or frappe.get_single(SETTINGS_DOCTYPE)
+    values = doc.as_dict()
+    values["policy_version"] = hashlib.sha1(frappe.as_json(values).encode()).hexdigest()[:10]
+    frappe.cache.set_value(CACHE_KEY, values, expires_in_sec=CACHE_TTL)
+    return values
+
+
+def clear_policy_cache():
+    frappe.cache.delete_value(CACHE_KEY)
@@ -0,0 +1,209 @@
+import frappe
+from frappe import _
+from frappe.utils import cint, date_diff, get_first_day, getdate, today
+
+from attendance_customization.attendance_customization.tasks.holiday_calendar import HolidayCalendar
+from attendance_customization.attendance_customization.tasks.late_strike_engine import (
+    COUNTING_MODES,
+    evaluate_strikes,
+)
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    PRE_PENALTY_ATTENDANCE_CONDITIONS,
+)
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    EFFECTIVE_PENALIZED,
+    PENALTY_LEDGER_JOIN,
+)
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy
+
+MAX_SIMULATION_DAYS = 366
+
+PENALTY_DAYS = {"Half-day": 0.5, "Full-day": 1.0}
+
+
+# ─────────────────────────────────────────────────────────────────
+# What-if simulator (read-only)
+# ─────────────────────────────────────────────────────────────────
+
+@frappe.whitelist()
+def simulate_policy(from_date, to_date=None, strike_threshold=None, counting_mode=None,
+                    penalty_action=None, employee=None):
+    """Evaluate a proposed late penalty policy over a date range without writing anything.
+
+    Any policy value left empty falls back to the saved Attendance Policy
+    Settings, so HR can change one knob at a time.
+
+    The whole range is read in ONE attendance query and evaluated in memory
+    with the same strike engine the scheduler uses. Existing penalties are
+    ignored for counting: a penalized record is replayed as its original
+    (pre-penalty) late attendance, so the result shows what the proposed
+    policy would produce on its own. Current penalties are reported alongside
+    for comparison.
+
+    Counters are per calendar month, so attendance is read from the first day
+    of from_date's month: a mid-month start counts the month's earlier lates
+    exactly as the processor does, but only penalties dated inside the range
+    are reported.
+
+    Returns:
+        {
+            "policy":             {strike_threshold, counting_mode, penalty_action},
+            "from_date", "to_date",
+            "total_penalties":    int,
+            "current_penalties":  int,   # penalties that exist today in the range
+            "deduction_days":     float, # total_penalties × 0.5 or 1
+            "employees_affected": int,
+            "by_month":           {"YYYY-MM": count},
+            "by_employee":        [{employee, employee_name, total, current, months}],
+        }
+    """
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    saved = get_policy()
+    policy = frappe._dict({
+        "strike_threshold": cint(strike_threshold) or cint(saved.strike_threshold),
+        "counting_mode":    counting_mode or saved.counting_mode,
+        "penalty_action":   penalty_action or saved.penalty_action,
+    })
+
+    from_date = getdate(from_date)
+    to_date   = getdate(to_date or today())
+    _validate(policy, from_date, to_date)
+
+    employees = _get_employees(employee)
+    if not employees:
+        return _empty_result(policy, from_date, to_date)
+
+    rows     = _load_attendance(list(employees), get_first_day(from_date), to_date)
+    holidays = HolidayCalendar()
+    holidays.resolve(list(employees))
+
+    by_employee = {}
+    by_month    = {}
+    current     = {}
+
+    for (emp, month_key), month_rows in _group_by_employee_month(rows).items():
+        current[emp] = current.get(emp, 0) + sum(
+            1 for r in month_rows
+            if r.custom_late_penalty_applied and getdate(r.attendance_date) >= from_date
+        )
+
+        holiday_dates = holidays.get_dates(emp, month_rows[0].attendance_date, month_rows[-1].attendance_date)
+        records = [(getdate(r.attendance_date), bool(r.late_entry), False) for r in month_rows]
+
+        result = evaluate_strikes(records, policy.counting_mode, policy.strike_threshold, holiday_dates)
+        penalties = sum(1 for d in result.decisions if d.penalize and d.date >= from_date)
+        if not penalties:
+            continue
+
+        entry = by_employee.setdefault(emp, {"total": 0, "months": {}})
+        entry["total"] += penalties
+        entry["months"][month_key] = penalties
+        by_month[month_key] = by_month.get(month_key, 0) + penalties
+
+    total_penalties = sum(e["total"] for e in by_employee.values())
+
+    return {
+        "policy":             policy,
+        "from_date":          str(from_date),
+        "to_date":            str(to_date),
+        "total_penalties":    total_penalties,
+        "current_penalties":  sum(current.values()),
+        "deduction_days":     total_penalties * PENALTY_DAYS.get(policy.penalty_action, 0),
+        "employees_affected": len(by_employee),
+        "by_month":           dict(sorted(by_month.items())),
+        "by_employee": sorted(
+            (
+                {
+                    "employee":      emp,
+                    "employee_name": employees.get(emp),
+                    "total":         entry["total"],
+                    "current":       current.get(emp, 0),
+                    "months":        entry["months"],
+                }
+                for emp, entry in by_employee.items()
+            ),
+            key=lambda e: (-e["total"], e["employee"]),
+        ),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────
+
+def _validate(policy, from_date, to_date):
+    if policy.counting_mode not in COUNTING_MODES:
+        frappe.throw(_("Invalid Counting Mode: {0}").format(policy.counting_mode), title=_("Validation Error"))
+
+    if policy.strike_threshold < 1:
+        frappe.throw(_("Strike Threshold must be at least 1"), title=_("Validation Error"))
+
+    if policy.penalty_action not in PENALTY_DAYS:
+        frappe.throw(_("Invalid Penalty Action: {0}").format(policy.penalty_action), title=_("Validation Error"))
+
+    if from_date > to_date:
+        frappe.throw(
+            _("From Date ({0}) cannot be after To Date ({1}).").format(from_date, to_date),
+            title=_("Invalid Date Range"),
+        )
+
+    if date_diff(to_date, from_date) > MAX_SIMULATION_DAYS:
+        frappe.throw(
+            _("Date range cannot exceed {0} days.").format(MAX_SIMULATION_DAYS),
+            title=_("Date Range Too Large"),
+        )
+
+
+def _get_employees(employee=None):
+    """Return {employee: employee_name} for the active employees in scope."""
+    filters = {"status": "Active"}
+    if employee:
+        filters["name"] = employee
+    return {
+        e.name: e.employee_name
+        for e in frappe.get_all("Employee", filters=filters, fields=["name", "employee_name"])
+    }
+
+
+def _load_attendance(employees, from_date, to_date):
+    """One ordered read of every countable record in the range.
+
+    Penalized records are included through their original status — the
+    simulation replays the attendance as it was before any penalty
+    (PRE_PENALTY_ATTENDANCE_CONDITIONS, shared with the processor).
+    """
+    return frappe.db.sql(f"""
+        SELECT a.employee, a.attendance_date, a.late_entry,
+               {EFFECTIVE_PENALIZED} AS custom_late_penalty_applied
+        FROM `tabAttendance` a
+        {PENALTY_LEDGER_JOIN}
+        WHERE a.employee IN %(employees)s
+          AND a.attendance_date BETWEEN %(from_date)s AND %(to_date)s
+          AND {PRE_PENALTY_ATTENDANCE_CONDITIONS}
+        ORDER BY a.employee, a.attendance_date
+    """, {"employees": employees, "from_date": from_date, "to_date": to_date}, as_dict=True)
+
+
+def _group_by_employee_month(rows):
+    """{(employee, "YYYY-MM"): [rows in date order]} — counters are per calendar month."""
+    grouped = {}
+    for row in rows:
+        att_date = getdate(row.attendance_date)
+        key = (row.employee, "{:04d}-{:02d}".format(att_date.year, att_date.month))
+        grouped.setdefault(key, []).append(row)
+    return grouped
+
+
+def _empty_result(policy, from_date, to_date):
+    return {
+        "policy":             policy,
+        "from_date":          str(from_date),
+        "to_date":            str(to_date),
+        "total_penalties":    0,
+        "current_penalties":  0,
+        "deduction_days":     0,
+        "employees_affected": 0,
+        "by_month":           {},
+        "by_employee":        [],
+    }
@@ -0,0 +1,211 @@
+import frappe
+from frappe import _
+from frappe.utils import add_to_date, cint, get_datetime, getdate, now_datetime
+
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    log_employee_failures,
+    policy_superseded,
+    reprocess_penalties_diff,
+)
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy, policy_changed
+
+
+JOB_DOCTYPE = "Attendance Reprocess Job"
+
+PROGRESS_EVENT = "attendance_reprocess_progress"
+
+# Employees per checkpoint. Each batch is planned and applied, then committed
+# together with the checkpoint, so a crash loses at most one batch of work.
+CHECKPOINT_BATCH_SIZE = 50
+
+JOB_TIMEOUT = 6 * 3600
+
+# A Running job whose document has not been touched for this long, and whose
+# RQ job is gone, is treated as crashed and re-enqueued.
+STALL_MINUTES = 30
+
+
+# ─────────────────────────────────────────────────────────────────
+# Background, resumable reprocess
+#
+# A reprocess is an Attendance Reprocess Job document plus a long-queue RQ
+# job that works through the employees in name order. After every batch the
+# work and the checkpoint (last_completed_employee + counters) are committed
+# together, progress is pushed with publish_realtime, and the cancel flag is
+# re-read. A resumed job skips every employee up to the checkpoint.
+#
+# Redoing the batch that was in flight when a worker died is harmless:
+# reprocessing is diff-based, so penalties that were already applied show
+# up as "unchanged" the second time.
+# ─────────────────────────────────────────────────────────────────
+
+def start_reprocess_job(from_date, employee=None):
+    """Create an Attendance Reprocess Job and enqueue it. Returns the job document."""
+    active = frappe.db.get_value(JOB_DOCTYPE, {"status": ["in", ["Queued", "Running"]]}, "name")
+    if active:
+        frappe.throw(
+            _("Reprocess job {0} is already in progress. Cancel it or wait for it to finish.").format(active),
+            title=_("Reprocess Already Running"),
+        )
+
+    job = frappe.get_doc({
+        "doctype":   JOB_DOCTYPE,
+        "from_date": getdate(from_date),
+        "employee":  employee,
+        "status":    "Queued",
+    })
+    job.insert(ignore_permissions=True)
+
+    enqueue_reprocess_job(job.name)
+    return job
+
+
+@frappe.whitelist()
+def cancel_reprocess_job(job_name):
+    """Ask a queued or running job to stop after its current batch."""
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    status = frappe.db.get_value(JOB_DOCTYPE, job_name, "status")
+    if status not in ("Queued", "Running"):
+        frappe.throw(_("Reprocess job {0} is {1} and cannot be cancelled.").format(job_name, status))
+
+    frappe.db.set_value(JOB_DOCTYPE, job_name, "cancel_requested", 1)
+
+
+@frappe.whitelist()
+def resume_reprocess_job(job_name):
+    """Re-enqueue a failed or cancelled job; it continues after its checkpoint."""
+    frappe.only_for(["System Manager", "HR Manager"])
+
+    status = frappe.db.get_value(JOB_DOCTYPE, job_name, "status")
+    if status not in ("Failed", "Cancelled"):
+        frappe.throw(_("Only failed or cancelled reprocess jobs can be resumed."))
+
+    frappe.db.set_value(JOB_DOCTYPE, job_name, {"status": "Queued", "cancel_requested": 0, "error": None})
+    enqueue_reprocess_job(job_name)
+
+
+def enqueue_reprocess_job(job_name):
+    frappe.enqueue(
+        "attendance_customization.attendance_customization.tasks.reprocess_job.run_reprocess_job",
+        queue="long",
+        timeout=JOB_TIMEOUT,
+        job_id=_rq_job_id(job_name),
+        deduplicate=True,
+        enqueue_after_commit=True,
+        job_name=job_name,
+    )
+
+
+def run_reprocess_job(job_name):
+    """RQ entry point: process the employees after the checkpoint, batch by batch."""
+    job = frappe.get_doc(JOB_DOCTYPE, job_name)
+    if job.status not in ("Queued", "Running"):
+        return
+
+    policy = get_policy()
+    if not policy.enable_late_penalty:
+        _finish(job, "Failed", error="Late penalty is disabled in Attendance Policy Settings.")
+        return
+
+    employees = get_job_employees(job)
+    pending   = [e for e in employees if not job.last_completed_employee or e > job.last_completed_employee]
+
+    job.db_set({
+        "status":          "Running",
+        "started_on":      job.started_on or now_datetime(),
+        "total_employees": len(employees),
+    }, commit=True)
+
+    try:
+        for start in range(0, len(pending), CHECKPOINT_BATCH_SIZE):
+            if cint(frappe.db.get_value(JOB_DOCTYPE, job.name, "cancel_requested")):
+                _finish(job, "Cancelled")
+                return
+
+            if policy_superseded(policy):
+                # Batches already done were counted under the old rules.
+                _finish(job, "Failed", error="Attendance Policy Settings changed during the run. "
+                                             "Start a new reprocess to apply the new policy to everyone.")
+                return
+            if policy_changed(policy):
+                policy = get_policy()  # e.g. a new Write Batch Size; counting is unaffected
+
+            batch = pending[start:start + CHECKPOINT_BATCH_SIZE]
+            stats, failures = reprocess_penalties_diff(batch, policy, job.from_date)
+            log_employee_failures(failures, title="Late Strike Processor (reprocess): failed for employee {0}")
+
+            job.db_set({
+                "last_completed_employee": batch[-1],
+                "completed_employees":     cint(job.completed_employees) + len(batch),
+                "added":                   cint(job.added) + stats.added,
+                "removed":                 cint(job.removed) + stats.removed,
+                "unchanged":               cint(job.unchanged) + stats.unchanged,
+                "failed":                  cint(job.failed) + len(failures),
+            })
+            frappe.db.commit()
+            _publish_progress(job)
+
+    except Exception:
+        frappe.db.rollback()
+        frappe.log_error(
+            message=frappe.get_traceback(),
+            title=f"Late Strike Processor: reprocess job {job.name} failed",
+        )
+        _finish(job, "Failed", error=frappe.get_traceback())
+        return
+
+    _finish(job, "Completed")
+
+
+def resume_stalled_reprocess_jobs():
+    """Hourly: re-enqueue Running jobs whose worker died mid-run."""
+    from frappe.utils.background_jobs import is_job_enqueued
+
+    cutoff = add_to_date(now_datetime(), minutes=-STALL_MINUTES)
+    for job in frappe.get_all(JOB_DOCTYPE, filters={"status": "Running"}, fields=["name", "modified"]):
+        if get_datetime(job.modified) > cutoff or is_job_enqueued(_rq_job_id(job.name)):
+            continue
+
+        frappe.logger().warning(f"Late Strike Processor: resuming stalled reprocess job {job.name}")
+        enqueue_reprocess_job(job.name)
+
+    frappe.db.commit()
+
+
+def get_job_employees(job):
+    """Employees in scope, in the fixed (name) order the checkpoint relies on."""
+    if job.employee:
+        return [job.employee]
+    # Sorted in Python so the comparison against the checkpoint never depends
+    # on the database collation.
+    return sorted(frappe.get_all("Employee", filters={"status": "Active"}, pluck="name"))
+
+
+# ─────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────
+
+def _finish(job, status, error=None):
+    job.db_set({"status": status, "finished_on": now_datetime(), "error": error}, commit=True)
+    _publish_progress(job)
+
+
+def _publish_progress(job):
+    frappe.publish_realtime(
+        PROGRESS_EVENT,
+        {
+            "job":       job.name,
+            "status":    job.status,
+            "completed": cint(job.completed_employees),
+            "total":     cint(job.total_employees),
+            "added":     cint(job.added),
+            "removed":   cint(job.removed),
+            "unchanged": cint(job.unchanged),
+        },
+        user=job.owner,
+    )
+
+
+def _rq_job_id(job_name):
+    return f"attendance_reprocess::{job_name}"
@@ -0,0 +1,75 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import unittest
+from datetime import date
+
+from attendance_customization.attendance_customization.tasks.late_strike_engine import (
+    CUMULATIVE,
+    CUMULATIVE_WITH_RESET,
+    STRICTLY_CONSECUTIVE,
+    evaluate_strikes,
+)
+
+
+def month(*flags):
+    """Build records for consecutive days of March 2026 from 'L' (late), '.' (on time), 'P' (penalized)."""
+    return [
+        (date(2026, 3, day), flag == "L", flag == "P")
+        for day, flag in enumerate(flags, start=1)
+    ]
+
+
+class TestLateStrikeEngine(unittest.TestCase):
+    def test_cumulative_penalizes_every_late_beyond_threshold(self):
+        result = evaluate_strikes(month("L", ".", "L", "L", ".", "L"), CUMULATIVE, 2)
+
+        self.assertEqual([d.strike_count for d in result.decisions], [1, 2, 3, 4])
+        self.assertEqual([d.penalize for d in result.decisions], [False, False, True, True])
+        self.assertEqual(result.final_count, 4)
+
+    def test_cumulative_counts_already_penalized_records(self):
+        result = evaluate_strikes(month("L", "P", "L"), CUMULATIVE, 2)
+
+        self.assertEqual([(d.index, d.strike_count, d.penalize) for d in result.decisions],
+                         [(0, 1, False), (2, 3, True)])
+
+    def test_consecutive_resets_on_time_day(self):
+        result = evaluate_strikes(month("L", "L", ".", "L", "L", "L"), STRICTLY_CONSECUTIVE, 2)
+
+        self.assertEqual([d.strike_count for d in result.decisions], [1, 2, 1, 2, 3])
+        self.assertEqual([d.penalize for d in result.decisions], [False, False, False, False, True])
+        self.assertEqual(result.final_count, 3)
+
+    def test_reset_mode_restarts_after_penalty(self):
+        result = evaluate_strikes(month("L", "L", "L", "L", "L", "L"), CUMULATIVE_WITH_RESET, 2)
+
+        self.assertEqual([d.strike_count for d in result.decisions], [1, 2, 3, 1, 2, 3])
+        self.assertEqual([d.penalize for d in result.decisions], [False, False, True, False, False, True])
+        self.assertEqual(result.final_count, 0)
+
+    def test_reset_mode_treats_penalized_record_as_reset(self):
+        result = evaluate_strikes(month("L", "L", "P", "L"), CUMULATIVE_WITH_RESET, 2)
+
+        self.assertEqual([d.strike_count for d in result.decisions], [1, 2, 1])
+
+    def test_holidays_are_neutral(self):
+        records = month("L", "L", ".", "L")
+        holidays = {date(2026, 3, 3)}
+
+        result = evaluate_strikes(records, STRICTLY_CONSECUTIVE, 2, holidays)
+
+        self.assertEqual([d.strike_count for d in result.decisions], [1, 2, 3])
+        self.assertTrue(result.decisions[-1].penalize)
+
+    def test_seed_continues_the_month(self):
+        result = evaluate_strikes(month("L"), CUMULATIVE, 2, seed=2)
+
+        self.assertEqual(result.decisions[0].strike_count, 3)
+        self.assertTrue(result.decisions[0].penalize)
+
+    def test_unknown_mode_decides_nothing(self):
+        result = evaluate_strikes(month("L", "L"), "Weekly", 0, seed=1)
+
+        self.assertEqual(result.decisions, [])
+        self.assertEqual(result.final_count, 1)
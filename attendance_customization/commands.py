@@ -0,0 +1,51 @@
+import json
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("benchmark-late-strikes")
+@click.option("--employees", default=200, show_default=True, help="Synthetic employees to generate")
+@click.option("--months", default=3, show_default=True, help="Months of attendance per employee")
+@click.option("--late-ratio", default=0.25, show_default=True, help="Probability that a working day is late")
+@click.option("--company", help="Company for the synthetic employees (default: global default company)")
+@click.option("--mode", "modes", multiple=True, help="Counting mode to run (repeatable; default: all)")
+@click.option("--seed", default=42, show_default=True, help="Random seed, for repeatable data sets")
+@click.option("--keep-data", is_flag=True, help="Leave the synthetic data in place after the run")
+@click.option("--output", type=click.Path(dir_okay=False), help="Also write the report as JSON to this file")
+@pass_context
+def benchmark_late_strikes(context, employees, months, late_ratio, company, modes, seed, keep_data, output):
+    """Benchmark the late strike processor on synthetic data (developer mode only)."""
+    from attendance_customization.attendance_customization.benchmarks.late_strike_benchmark import (
+        format_results,
+        run_benchmark,
+    )
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        if not frappe.conf.developer_mode:
+            click.secho("The benchmark writes synthetic data; enable developer_mode on the site first.", fg="red")
+            raise SystemExit(1)
+
+        report = run_benchmark(
+            employees=employees,
+            months=months,
+            late_ratio=late_ratio,
+            company=company,
+            seed=seed,
+            modes=list(modes) or None,
+            keep_data=keep_data,
+        )
+        click.echo(format_results(report))
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(report, f, indent=2, default=str)
+    finally:
+        frappe.destroy()
+
+
+commands = [benchmark_late_strikes]
@@ -1,5 +1,23 @@
 import frappe
-from frappe.utils import getdate, get_first_day, get_last_day, now_datetime
+from frappe.utils import getdate
+
+from attendance_customization.attendance_customization.tasks.half_day_cache import (
+    add_half_day_employee,
+    discard_half_day_employee,
+    get_half_day_approvals,
+)
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    invalidate_watermarks,
+)
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    get_month_late_count,
+    get_monthly_late_summary as _get_monthly_late_summary,
+    rebuild_month_summary,
+    record_attendance_submit,
+)
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    delete_ledger_penalties,
+)
 
 
 # ─────────────────────────────────────────────
@@ -8,13 +26,52 @@ from frappe.utils import getdate, get_first_day, get_last_day, now_datetime
 
 def on_submit(doc, method):
     """
-    Handle attendance submission - mark late strike as processed.
+    Handle attendance submission - mark late strike as processed, fold the
+    record into the employee's Employee Monthly Late Summary and add Half Day
+    records to the half-day cache read by employee_checkin.after_insert.
     """
+    record_attendance_submit(doc)
+
+    if doc.status == "Half Day":
+        add_half_day_employee(doc.employee, doc.attendance_date)
+
     if doc.status == "Present" and doc.late_entry == 1 and not doc.strike_processed:
         frappe.db.set_value("Attendance", doc.name, "strike_processed", 1)
         frappe.db.commit()
 
 
+def on_cancel(doc, method):
+    """
+    Rebuild the employee's Employee Monthly Late Summary for the month — a
+    cancelled record can sit anywhere in the month's late sequence — and drop
+    a cancelled Half Day from the half-day cache.
+    """
+    if doc.employee and doc.attendance_date:
+        rebuild_month_summary(doc.employee, doc.attendance_date)
+
+    if doc.status == "Half Day":
+        discard_half_day_employee(doc.employee, doc.attendance_date)
+
+
+def on_trash(doc, method):
+    """
+    Invalidate the employee's Late Strike Watermark when an attendance is deleted.
+
+    The incremental late strike processor detects edits through `modified`, which
+    a deleted row no longer has — the next run must rescan this employee.
+
+    Also drops the record's Attendance Penalty ledger row (Penalty Ledger
+    storage), which would otherwise block the delete through its link.
+    """
+    delete_ledger_penalties([doc.name])
+
+    if doc.employee:
+        invalidate_watermarks(doc.employee)
+
+    if doc.status == "Half Day":
+        discard_half_day_employee(doc.employee, doc.attendance_date)
+
+
 def validate(doc, method):
     """
     Fires on every attendance save/insert (draft only).
@@ -132,18 +189,10 @@ def _ensure_half_day_attendance(doc):
     if not doc.employee or not doc.attendance_date:
         return
 
-    leave = frappe.db.get_value(
-        "Leave Application",
-        {
-            "employee": doc.employee,
-            "half_day_date": doc.attendance_date,
-            "half_day": 1,
-            "status": "Approved",
-            "docstatus": 1,
-        },
-        ["name", "leave_type"],
-        as_dict=True,
-    )
+    # Approved half-day leave and Attendance Request for the date: one read
+    # of the cached half-day index (see half_day_cache).
+    approvals = get_half_day_approvals(doc.employee, doc.attendance_date)
+    leave = approvals.leave
 
     if not leave:
         # No Leave Application found. If this is an Attendance Request half day,
@@ -151,7 +200,7 @@ def _ensure_half_day_attendance(doc):
         # for newly-created attendances (but NOT for existing ones updated via
         # db_set — that path is handled by attendance_request.on_submit).
         if doc.status == "Half Day":
-            _fix_attendance_request_half_day(doc)
+            _fix_attendance_request_half_day(doc, approvals.attendance_request)
         return
 
     # Upgrade to Half Day regardless of what HRMS computed.
@@ -180,7 +229,7 @@ def _ensure_half_day_attendance(doc):
 # Attendance Request half-day correction
 # ─────────────────────────────────────────────
 
-def _fix_attendance_request_half_day(doc):
+def _fix_attendance_request_half_day(doc, att_request):
     """
     Set half_day_status for Half Day attendances created via Attendance Request.
 
@@ -198,18 +247,10 @@ def _fix_attendance_request_half_day(doc):
 
     For the db_set() bypass case (prior attendance updated by HRMS without
     triggering validate), attendance_request.on_submit() handles it instead.
-    """
-    att_request = frappe.db.get_value(
-        "Attendance Request",
-        {
-            "employee": doc.employee,
-            "half_day_date": doc.attendance_date,
-            "half_day": 1,
-            "docstatus": 1,
-        },
-        "name",
-    )
 
+    att_request is the submitted half-day Attendance Request for the date
+    (from the half-day index), or None.
+    """
     if not att_request:
         return
 
@@ -228,18 +269,14 @@ def update_late_strike_count(doc):
     """
     Update the late strike count for the current month on the doc object.
     Called from validate (real-time) and indirectly from the scheduled task.
+
+    The month's count of already submitted late 'Present' arrivals is one
+    primary key read from Employee Monthly Late Summary (rebuilt on the spot
+    if missing).
     """
     attendance_date = getdate(doc.attendance_date)
-    first_day = get_first_day(attendance_date)
-    last_day = get_last_day(attendance_date)
 
-    late_count = frappe.db.count("Attendance", filters={
-        "employee": doc.employee,
-        "attendance_date": ["between", [first_day, last_day]],
-        "late_entry": 1,
-        "status": "Present",
-        "docstatus": 1
-    })
+    late_count = get_month_late_count(doc.employee, attendance_date)
 
     if doc.docstatus == 0:
         late_count += 1
@@ -254,34 +291,8 @@ def update_late_strike_count(doc):
         doc.late_incident_remark += " - WARNING: Exceeded monthly late arrival limit!"
 
 
-def get_monthly_late_summary(employee, month=None, year=None):
+def get_monthly_late_summary(employee, month=None, year=None, include_entries=False):
     """
     Get late arrival summary for an employee for a specific month.
     """
-    if not month or not year:
-        today = getdate()
-        month = today.month
-        year = today.year
-
-    first_day = getdate("{}-{:02d}-01".format(year, month))
-    last_day = get_last_day(first_day)
-
-    late_entries = frappe.get_all(
-        "Attendance",
-        filters={
-            "employee": employee,
-            "attendance_date": ["between", [first_day, last_day]],
-            "late_entry": 1,
-            "status": "Present",
-            "docstatus": 1
-        },
-        fields=["name", "attendance_date", "late_incident_remark"],
-        order_by="attendance_date asc"
-    )
-
-    return {
-        "employee": employee,
-        "month": first_day.strftime("%B %Y"),
-        "late_count": len(late_entries),
-        "late_entries": late_entries
-    }
+    return _get_monthly_late_summary(employee, month, year, include_entries)
@@ -1,10 +1,28 @@
 import frappe
 
+from attendance_customization.attendance_customization.tasks.half_day_cache import (
+    invalidate_half_day_index,
+    sync_half_day_employee,
+)
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    refresh_attendance_summaries,
+)
+
 
 # ─────────────────────────────────────────────
 # Document event hooks (registered in hooks.py)
 # ─────────────────────────────────────────────
 
+def clear_half_day_index(doc, method):
+    """
+    before_submit / before_cancel: drop the cached half-day index for
+    half_day_date before HRMS creates or cancels the attendance, so its
+    validate (and later checkins) read the new state.
+    """
+    if doc.half_day and doc.half_day_date:
+        invalidate_half_day_index(doc.half_day_date)
+
+
 def on_submit(doc, method):
     """
     Fires AFTER HRMS's own AttendanceRequest.on_submit() creates/updates the
@@ -39,6 +57,11 @@ def on_submit(doc, method):
     _link_unlinked_checkins(doc.employee, doc.half_day_date)
     _sync_half_day_status(doc.employee, doc.half_day_date)
 
+    # HRMS may have flipped an existing attendance to Half Day with db_set,
+    # which the Attendance hooks never see.
+    sync_half_day_employee(doc.employee, doc.half_day_date)
+    refresh_attendance_summaries([(doc.employee, doc.half_day_date)])
+
 
 def on_cancel(doc, method):
     """
@@ -61,6 +84,8 @@ def on_cancel(doc, method):
         return
 
     _unlink_checkins_from_cancelled_attendance(doc.employee, doc.half_day_date)
+    sync_half_day_employee(doc.employee, doc.half_day_date)
+    refresh_attendance_summaries([(doc.employee, doc.half_day_date)])
 
 
 # ─────────────────────────────────────────────
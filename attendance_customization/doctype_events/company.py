@@ -0,0 +1,33 @@
+import frappe
+
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    invalidate_watermarks,
+)
+
+
+# ─────────────────────────────────────────────
+# Document event hooks (registered in hooks.py)
+# ─────────────────────────────────────────────
+
+def on_update(doc, method):
+    """
+    Fires on every Company save.
+
+    Employees without their own holiday_list fall back to the company's
+    default_holiday_list. When that default changes, drop the late strike
+    watermarks of exactly those employees so the next run rescans them
+    against the new calendar.
+    """
+    if not doc.has_value_changed("default_holiday_list"):
+        return
+
+    employees = frappe.get_all(
+        "Employee",
+        filters=[
+            ["company", "=", doc.name],
+            ["holiday_list", "is", "not set"],
+        ],
+        pluck="name",
+    )
+    if employees:
+        invalidate_watermarks(employees=employees)
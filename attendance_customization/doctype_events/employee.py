@@ -0,0 +1,24 @@
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    invalidate_watermarks,
+)
+
+
+# ─────────────────────────────────────────────
+# Document event hooks (registered in hooks.py)
+# ─────────────────────────────────────────────
+
+def on_update(doc, method):
+    """
+    Fires on every Employee save.
+
+    The employee → Holiday List resolution is never cached beyond a single
+    processor run, but months already processed were counted against the old
+    list. When the employee's own holiday_list or company (and with it the
+    company default list) changes, drop the late strike watermark so the next
+    run rescans the employee with the new calendar.
+    """
+    if doc.is_new():
+        return
+
+    if doc.has_value_changed("holiday_list") or doc.has_value_changed("company"):
+        invalidate_watermarks(doc.name)
@@ -1,6 +1,15 @@
 import frappe
 from frappe.utils import getdate
 
+from attendance_customization.attendance_customization.tasks.half_day_cache import (
+    get_half_day_approvals,
+    has_half_day_attendance,
+)
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    refresh_attendance_summaries,
+)
+from attendance_customization.attendance_customization.tasks.policy_cache import get_policy
+
 
 def after_insert(doc, method):
     """
@@ -43,18 +52,42 @@ def after_insert(doc, method):
         Checkins that arrive before leave approval have no Half Day attendance yet.
         leave_application.on_update_after_submit handles that retroactively.
 
+    FAST EXIT:
+        half_day_cache keeps the employees with a submitted Half Day attendance
+        per date in Redis; everyone else returns before any database query.
+
     EDGE CASES:
     - doc.time is None                      → return early.
     - No Half Day attendance for date       → return early (normal working day).
     - log_type IN  but in_time  already set → skip time update, still evaluate pair.
     - log_type OUT but out_time already set → skip time update, still evaluate pair.
     - log_type missing                      → link only; treat as valid if any time exists.
+
+    BATCH INGESTION:
+        checkin_ingestion.ingest_checkins sets frappe.flags.defer_checkin_reconcile
+        while it inserts a batch and then applies the same rules (get_checkin_update)
+        per (employee, date) with a few set-based queries, so this hook skips.
+
+    COALESCED MODE (Checkin Processing = "Coalesced"):
+        Only the (employee, date) is marked here; checkin_ingestion.drain_dirty_checkins
+        reconciles it shortly afterwards in the background, once per burst.
     """
-    if not doc.time:
+    if not doc.time or frappe.flags.defer_checkin_reconcile:
         return
 
     checkin_date = getdate(doc.time)
 
+    if not has_half_day_attendance(doc.employee, checkin_date):
+        return  # normal working day
+
+    if get_policy().checkin_processing == "Coalesced":
+        from attendance_customization.attendance_customization.tasks.checkin_ingestion import (
+            mark_checkin_dirty,
+        )
+
+        mark_checkin_dirty(doc.employee, checkin_date)
+        return
+
     attendance = frappe.db.get_value(
         "Attendance",
         {
@@ -70,20 +103,54 @@ def after_insert(doc, method):
     if not attendance:
         return
 
+    update = get_checkin_update(
+        attendance,
+        doc,
+        find_approvals=lambda: get_half_day_approvals(doc.employee, checkin_date),
+    )
+
+    # ── Step 4: persist ───────────────────────────────────────────────────────
+    if update:
+        frappe.db.set_value("Attendance", attendance.name, update)
+        if "leave_application" in update:
+            # A leave link decides whether the Half Day takes part in strike counting.
+            refresh_attendance_summaries([(doc.employee, checkin_date)])
+
+    frappe.db.set_value("Employee Checkin", doc.name, "attendance", attendance.name)
+
+    frappe.logger().info(
+        "Half Day attendance {}: updated {} from Employee Checkin {}".format(
+            attendance.name,
+            list(update.keys()) if update else ["linked only"],
+            doc.name,
+        )
+    )
+
+
+def get_checkin_update(attendance, checkin, find_approvals):
+    """
+    Attendance fields to change for one checkin (Steps 1-3 of after_insert).
+
+    `attendance` carries in_time, out_time, leave_application and
+    half_day_status as they are before this checkin; `checkin` needs time and
+    log_type. find_approvals is only called when the leave link has to be
+    restored; it returns a dict with `leave` (approved half-day Leave
+    Application: name, leave_type) and `attendance_request` (name), either None.
+    """
     update = {}
 
     # ── Step 1: update in_time / out_time ────────────────────────────────────
-    if doc.log_type == "IN" and not attendance.in_time:
-        update["in_time"] = doc.time
-    elif doc.log_type == "OUT" and not attendance.out_time:
-        update["out_time"] = doc.time
+    if checkin.log_type == "IN" and not attendance.in_time:
+        update["in_time"] = checkin.time
+    elif checkin.log_type == "OUT" and not attendance.out_time:
+        update["out_time"] = checkin.time
 
     # ── Step 2: compute resulting pair state after this update ────────────────
     # Use the times that will be on the attendance AFTER the update is saved.
     resulting_in = update.get("in_time") or attendance.in_time
     resulting_out = update.get("out_time") or attendance.out_time
 
-    if not doc.log_type:
+    if not checkin.log_type:
         # Untyped checkin: device doesn't send IN/OUT — can't validate pair type.
         # Treat as valid immediately (benefit of the doubt for legacy devices).
         has_pair = True
@@ -105,18 +172,8 @@ def after_insert(doc, method):
         # B) Attendance was created from an Attendance Request (never had a
         #    leave_application) → just set half_day_status based on pair.
         if has_pair:
-            leave = frappe.db.get_value(
-                "Leave Application",
-                {
-                    "employee": doc.employee,
-                    "half_day_date": checkin_date,
-                    "half_day": 1,
-                    "status": "Approved",
-                    "docstatus": 1,
-                },
-                ["name", "leave_type"],
-                as_dict=True,
-            )
+            approvals = find_approvals()
+            leave = approvals.leave
             if leave:
                 # Sub-case A: biometric delay — restore leave_application and HD/P.
                 update["leave_application"] = leave.name
@@ -126,29 +183,7 @@ def after_insert(doc, method):
                 # Sub-case B: no Leave Application — check for Attendance Request.
                 # Attendance Requests never set leave_application on attendance,
                 # so the absence of leave_application is intentional here.
-                att_request = frappe.db.get_value(
-                    "Attendance Request",
-                    {
-                        "employee": doc.employee,
-                        "half_day_date": checkin_date,
-                        "half_day": 1,
-                        "docstatus": 1,
-                    },
-                    "name",
-                )
-                if att_request:
+                if approvals.attendance_request:
                     update["half_day_status"] = "Present"
 
-    # ── Step 4: persist ───────────────────────────────────────────────────────
-    if update:
-        frappe.db.set_value("Attendance", attendance.name, update)
-
-    frappe.db.set_value("Employee Checkin", doc.name, "attendance", attendance.name)
-
-    frappe.logger().info(
-        "Half Day attendance {}: updated {} from Employee Checkin {}".format(
-            attendance.name,
-            list(update.keys()) if update else ["linked only"],
-            doc.name,
-        )
-    )
+    return update
@@ -0,0 +1,43 @@
+import frappe
+
+from attendance_customization.attendance_customization.tasks.holiday_calendar import (
+    get_employees_using_holiday_list,
+    invalidate_holiday_list,
+)
+from attendance_customization.attendance_customization.tasks.late_strike_processor import (
+    invalidate_watermarks,
+)
+
+
+# ─────────────────────────────────────────────
+# Document event hooks (registered in hooks.py)
+# ─────────────────────────────────────────────
+
+def on_update(doc, method):
+    """
+    Fires whenever a Holiday List (or any of its Holiday rows) is saved.
+
+    The late strike processor reads holidays from the compiled holiday
+    calendar cache, so the list's compiled years must be dropped. Adding or
+    removing a holiday also changes which late days count as strikes in months
+    that were already processed — the incremental watermarks of every employee
+    on this list are invalidated so the next run rescans them.
+    """
+    _invalidate(doc.name)
+
+
+def on_trash(doc, method):
+    """Same as on_update — a deleted list must not linger in the cache."""
+    _invalidate(doc.name)
+
+
+def _invalidate(holiday_list):
+    invalidate_holiday_list(holiday_list)
+
+    employees = get_employees_using_holiday_list(holiday_list)
+    if employees:
+        invalidate_watermarks(employees=employees)
+        frappe.logger().info(
+            "holiday_list [{}]: holiday calendar cache cleared, {} late strike "
+            "watermark(s) invalidated".format(holiday_list, len(employees))
+        )
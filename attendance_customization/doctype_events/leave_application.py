@@ -1,10 +1,28 @@
 import frappe
 
+from attendance_customization.attendance_customization.tasks.half_day_cache import (
+    invalidate_half_day_index,
+    sync_half_day_employee,
+)
+from attendance_customization.attendance_customization.tasks.monthly_late_summary import (
+    refresh_attendance_summaries,
+)
+
 
 # ─────────────────────────────────────────────
 # Document event hooks
 # ─────────────────────────────────────────────
 
+def clear_half_day_index(doc, method):
+    """
+    before_submit / before_update_after_submit / before_cancel: drop the cached
+    half-day index for half_day_date before HRMS creates or cancels the
+    attendance, so its validate (and later checkins) read the new state.
+    """
+    if _is_half_day(doc):
+        invalidate_half_day_index(doc.half_day_date)
+
+
 def on_submit(doc, method):
     """
     Fires when a Leave Application is submitted (docstatus 0→1).
@@ -19,6 +37,7 @@ def on_submit(doc, method):
     if doc.status == "Approved":
         _link_checkins(doc)
         _handle_dual_half_day(doc.employee, doc.half_day_date)
+        _sync_attendance_state(doc)
 
 
 def on_update_after_submit(doc, method):
@@ -43,6 +62,10 @@ def on_update_after_submit(doc, method):
         _unlink_checkins(doc)
         _handle_dual_half_day_cancel(doc)
 
+    # HRMS flips attendance status with db_set, so Attendance hooks may not
+    # have seen the change: re-sync the half-day cache and late summary.
+    _sync_attendance_state(doc)
+
 
 def on_cancel(doc, method):
     """
@@ -70,12 +93,19 @@ def on_cancel(doc, method):
         return
     _unlink_checkins(doc)
     _handle_dual_half_day_cancel(doc)
+    _sync_attendance_state(doc)
 
 
 # ─────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────
 
+def _sync_attendance_state(doc):
+    """Re-sync the half-day cache and Employee Monthly Late Summary after HRMS's db_set changes."""
+    sync_half_day_employee(doc.employee, doc.half_day_date)
+    refresh_attendance_summaries([(doc.employee, doc.half_day_date)])
+
+
 def _is_half_day(doc):
     return bool(doc.half_day and doc.half_day_date)
 
@@ -0,0 +1,45 @@
+import frappe
+from frappe.utils import flt
+
+from attendance_customization.attendance_customization.tasks.penalty_ledger import (
+    get_ledger_penalty_days,
+)
+
+
+# ─────────────────────────────────────────────
+# Document event hooks (registered in hooks.py)
+# ─────────────────────────────────────────────
+
+def validate(doc, method):
+    """
+    Deduct ledger late penalties from the salary slip's payment days.
+
+    Amended penalties change the Attendance status, which HRMS already reads
+    when Payroll Based On is "Attendance". Ledger penalties (Penalty Storage
+    = "Penalty Ledger") leave the Attendance untouched, so without this hook
+    they would never reach payroll. Only what the penalty adds to the
+    original status is deducted (get_penalty_deduction), since HRMS already
+    deducts for a Half Day original. HRMS recomputes payment_days from
+    attendance on every validate before this hook runs, so the deduction is
+    applied exactly once per save.
+
+    Only Attendance-based payroll is adjusted — with leave-based payroll an
+    amended Half Day/Absent does not deduct either.
+    """
+    if doc.docstatus != 0 or not (doc.employee and doc.start_date and doc.end_date):
+        return
+
+    if frappe.db.get_single_value("Payroll Settings", "payroll_based_on") != "Attendance":
+        return
+
+    penalty_days = get_ledger_penalty_days(doc.employee, doc.start_date, doc.end_date)
+    if not penalty_days:
+        return
+
+    doc.payment_days = max(flt(doc.payment_days) - penalty_days, 0)
+
+    # Re-run the amount calculation HRMS did in validate with the old payment days.
+    doc.calculate_net_pay()
+    doc.compute_year_to_date()
+    doc.compute_month_to_date()
+    doc.compute_component_wise_year_to_date()
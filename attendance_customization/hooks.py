@@ -11,6 +11,11 @@ required_apps = ["frappe", "erpnext", "hrms"]
 # Installation
 after_install = "attendance_customization.setup.install.after_install"
 
+# Cached Attendance Policy Settings: patches and set_single_value bypass the
+# settings' on_update, so drop the cached copy on migrate and bench clear-cache.
+after_migrate = "attendance_customization.attendance_customization.tasks.policy_cache.clear_policy_cache"
+clear_cache = "attendance_customization.attendance_customization.tasks.policy_cache.clear_policy_cache"
+
 # Single DocTypes (Settings pages)
 single_doctypes = ["Attendance Policy Settings"]
 
@@ -28,6 +33,11 @@ doc_events = {
         # Also updates late strike count in real-time on save.
         "validate":  "attendance_customization.doctype_events.attendance.validate",
         "on_submit": "attendance_customization.doctype_events.attendance.on_submit",
+        # on_submit / on_cancel keep Employee Monthly Late Summary current.
+        "on_cancel": "attendance_customization.doctype_events.attendance.on_cancel",
+        # on_trash: deleted rows never show up as "modified", so drop the
+        # employee's late strike watermark to force a rescan on the next run.
+        "on_trash":  "attendance_customization.doctype_events.attendance.on_trash",
     },
     "Employee Checkin": {
         # When a checkin arrives for a date that already has a submitted Half Day
@@ -40,9 +50,13 @@ doc_events = {
         # created (they were skipped by employee_checkin.after_insert).
         # On rejection/cancellation: unlink checkins so mark_attendance can
         # reprocess them and produce a correct Present/Absent record.
-        "on_submit":              "attendance_customization.doctype_events.leave_application.on_submit",
-        "on_update_after_submit": "attendance_customization.doctype_events.leave_application.on_update_after_submit",
-        "on_cancel":              "attendance_customization.doctype_events.leave_application.on_cancel",
+        # before_*: drop the cached half-day leave index for the date first.
+        "before_submit":              "attendance_customization.doctype_events.leave_application.clear_half_day_index",
+        "before_update_after_submit": "attendance_customization.doctype_events.leave_application.clear_half_day_index",
+        "before_cancel":              "attendance_customization.doctype_events.leave_application.clear_half_day_index",
+        "on_submit":                  "attendance_customization.doctype_events.leave_application.on_submit",
+        "on_update_after_submit":     "attendance_customization.doctype_events.leave_application.on_update_after_submit",
+        "on_cancel":                  "attendance_customization.doctype_events.leave_application.on_cancel",
     },
     "Attendance Request": {
         # on_submit: after HRMS creates/updates the Half Day attendance, link any
@@ -52,9 +66,31 @@ doc_events = {
         #
         # on_cancel: HRMS cancels the attendance but leaves Employee Checkin records
         # still pointing to it. Unlink them so re-submission can re-link correctly.
+        #
+        # before_*: drop the cached half-day leave index for the date first.
+        "before_submit": "attendance_customization.doctype_events.attendance_request.clear_half_day_index",
+        "before_cancel": "attendance_customization.doctype_events.attendance_request.clear_half_day_index",
         "on_submit": "attendance_customization.doctype_events.attendance_request.on_submit",
         "on_cancel": "attendance_customization.doctype_events.attendance_request.on_cancel",
     },
+    # Holiday calendar cache + incremental late strike watermarks: a changed
+    # holiday list, employee holiday list/company, or company default list
+    # invalidates compiled calendars and forces a rescan of affected employees.
+    "Holiday List": {
+        "on_update": "attendance_customization.doctype_events.holiday_list.on_update",
+        "on_trash":  "attendance_customization.doctype_events.holiday_list.on_trash",
+    },
+    "Employee": {
+        "on_update": "attendance_customization.doctype_events.employee.on_update",
+    },
+    "Company": {
+        "on_update": "attendance_customization.doctype_events.company.on_update",
+    },
+    "Salary Slip": {
+        # Penalty Ledger storage keeps penalties off the Attendance status HRMS
+        # reads, so deduct them from payment days here.
+        "validate": "attendance_customization.doctype_events.salary_slip.validate",
+    },
 }
 
 # Override DocType Classes
@@ -75,5 +111,31 @@ scheduler_events = {
         "0 6 * * *": [
             "attendance_customization.attendance_customization.tasks.half_day_absent_checker.check_half_day_no_show"
         ],
-    }
+        # Every minute: reconcile checkins marked in Coalesced checkin
+        # processing whose drain job was not enqueued (no-op otherwise).
+        "* * * * *": [
+            "attendance_customization.attendance_customization.tasks.checkin_ingestion.drain_dirty_checkins"
+        ],
+    },
+    "hourly": [
+        # Re-enqueue background reprocess jobs whose worker died mid-run; they
+        # continue from their checkpoint.
+        "attendance_customization.attendance_customization.tasks.reprocess_job.resume_stalled_reprocess_jobs"
+    ],
+    "daily_long": [
+        # Move old cancelled penalty-amendment attendance into Attendance
+        # Archive (disabled unless Archive Cancelled After (Days) is set).
+        "attendance_customization.attendance_customization.tasks.attendance_compaction.compact_cancelled_attendance"
+    ],
+    "monthly_long": [
+        # 1st of the month: previous month's late arrival report (employees
+        # with 3+ late arrivals) emailed to HR Managers as a file link.
+        "attendance_customization.attendance_customization.tasks.late_report.send_monthly_late_report"
+    ],
+}
+
+# Attendance Job Run Log entries older than this many days are removed by
+# Frappe's daily log clean-up.
+default_log_clearing_doctypes = {
+    "Attendance Job Run Log": 90,
 }
@@ -0,0 +1,21 @@
+"""
+Patch: add_hot_lookup_indexes
+
+Creates the composite indexes the app's hot lookups rely on (see
+setup/indexes.py) on existing sites, then EXPLAINs those lookups and writes
+an Error Log for any that still needs a full table scan.
+
+SAFE TO RUN:
+    - Idempotent — indexes that already exist are skipped.
+    - Adding an index on a large Attendance / Employee Checkin table can take
+      a while; run during a maintenance window on big sites.
+"""
+
+import frappe
+
+from attendance_customization.setup.indexes import ensure_and_verify_indexes
+
+
+def execute():
+    ensure_and_verify_indexes()
+    frappe.db.commit()
@@ -37,7 +37,7 @@ SAFE TO RUN:
 """
 
 import frappe
-from frappe.utils import getdate, now
+from frappe.utils import add_days, get_datetime, getdate, now
 
 
 def execute():
@@ -72,12 +72,13 @@ def execute():
         half_day_date = getdate(la.half_day_date)
 
         # Check if employee came for their working half (determines HD/L vs HD/A).
+        # Half-open time range instead of DATE(time) so the (employee, time) index is used.
         has_checkins = bool(frappe.db.sql("""
             SELECT name FROM `tabEmployee Checkin`
             WHERE employee = %s
-            AND DATE(time) = %s
+            AND time >= %s AND time < %s
             LIMIT 1
-        """, (employee, half_day_date)))
+        """, (employee, get_datetime(half_day_date), get_datetime(add_days(half_day_date, 1)))))
 
         # Look for a non-cancelled attendance on that date.
         attendance = frappe.db.get_value(
@@ -0,0 +1,111 @@
+import frappe
+
+
+# ─────────────────────────────────────────────────────────────────
+# Composite indexes for the app's hot lookups
+#
+# Created by after_install and by the add_hot_lookup_indexes patch
+# (both idempotent: an index that already exists by name is left alone).
+#
+# HOT_QUERIES are representative forms of the lookups the hooks, the late
+# strike processor and the half-day checker run all day. verify_hot_queries()
+# EXPLAINs each of them and reports the ones MariaDB could only answer with a
+# full table scan — no usable index at all. A scan the optimizer merely
+# prefers on a tiny table (possible_keys present) is not reported.
+# ─────────────────────────────────────────────────────────────────
+
+# (doctype, index name, columns)
+APP_INDEXES = (
+    ("Attendance", "ac_employee_date_docstatus_status",
+     ["employee", "attendance_date", "docstatus", "status"]),
+    ("Employee Checkin", "ac_employee_time", ["employee", "time"]),
+    ("Employee Checkin", "ac_attendance", ["attendance"]),
+    ("Leave Application", "ac_employee_half_day_status",
+     ["employee", "half_day_date", "half_day", "status"]),
+)
+
+# (label, table, query, values)
+HOT_QUERIES = (
+    (
+        "Attendance by employee and month",
+        "tabAttendance",
+        """SELECT name, status FROM `tabAttendance`
+           WHERE employee = %(employee)s
+             AND attendance_date BETWEEN %(from_date)s AND %(to_date)s
+             AND docstatus = 1""",
+        {"employee": "HR-EMP-00001", "from_date": "2026-01-01", "to_date": "2026-01-31"},
+    ),
+    (
+        "Attendance of one employee and date",
+        "tabAttendance",
+        """SELECT name FROM `tabAttendance`
+           WHERE employee = %(employee)s AND attendance_date = %(date)s
+             AND docstatus = 1 AND status = 'Half Day'""",
+        {"employee": "HR-EMP-00001", "date": "2026-01-15"},
+    ),
+    (
+        "Employee Checkin of employees in a day",
+        "tabEmployee Checkin",
+        """SELECT employee FROM `tabEmployee Checkin`
+           WHERE employee IN %(employees)s
+             AND time >= %(day_start)s AND time < %(day_end)s""",
+        {"employees": ("HR-EMP-00001", "HR-EMP-00002"),
+         "day_start": "2026-01-15 00:00:00", "day_end": "2026-01-16 00:00:00"},
+    ),
+    (
+        "Employee Checkin linked to an attendance",
+        "tabEmployee Checkin",
+        """SELECT name FROM `tabEmployee Checkin` WHERE attendance = %(attendance)s""",
+        {"attendance": "HR-ATT-2026-00001"},
+    ),
+    (
+        "Approved half-day leave of an employee and date",
+        "tabLeave Application",
+        """SELECT name FROM `tabLeave Application`
+           WHERE employee = %(employee)s AND half_day_date = %(date)s
+             AND half_day = 1 AND status = 'Approved' AND docstatus = 1""",
+        {"employee": "HR-EMP-00001", "date": "2026-01-15"},
+    ),
+)
+
+
+def ensure_indexes():
+    """Create every missing app index. Returns the names of the indexes created."""
+    created = []
+    for doctype, index_name, columns in APP_INDEXES:
+        if not frappe.db.table_exists(doctype):
+            continue  # HRMS not installed yet
+        if frappe.db.has_index(f"tab{doctype}", index_name):
+            continue
+        frappe.db.add_index(doctype, columns, index_name=index_name)
+        created.append(index_name)
+    return created
+
+
+def verify_hot_queries():
+    """EXPLAIN every hot query; return [(label, explain row)] for full scans without a usable index."""
+    problems = []
+    for label, table, query, values in HOT_QUERIES:
+        if not frappe.db.table_exists(table[3:]):
+            continue
+        for row in frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True):
+            if row.get("table") != table:
+                continue
+            if (row.get("type") or "").upper() == "ALL" and not row.get("possible_keys"):
+                problems.append((label, row))
+    return problems
+
+
+def ensure_and_verify_indexes():
+    """Create missing indexes, then log (never raise) any hot query left without one."""
+    created  = ensure_indexes()
+    problems = verify_hot_queries()
+
+    if created:
+        frappe.logger().info("attendance_customization: created indexes {}".format(", ".join(created)))
+    for label, row in problems:
+        frappe.log_error(
+            message=frappe.as_json(row),
+            title=f"Attendance Customization: full table scan for '{label}'",
+        )
+    return created, problems
@@ -1,5 +1,7 @@
 import frappe
 
+from attendance_customization.setup.indexes import ensure_and_verify_indexes
+
 
 def after_install():
     """Run after app installation."""
@@ -7,6 +9,9 @@ def after_install():
 
     add_attendance_request_reason_options()
 
+    # Composite indexes for the app's hot lookups
+    ensure_and_verify_indexes()
+
     # Clear cache
     frappe.clear_cache()
 
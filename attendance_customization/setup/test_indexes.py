@@ -0,0 +1,16 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from attendance_customization.setup.indexes import APP_INDEXES, ensure_indexes, verify_hot_queries
+
+
+class TestHotLookupIndexes(FrappeTestCase):
+    def test_indexes_exist(self):
+        ensure_indexes()
+        for doctype, index_name, _ in APP_INDEXES:
+            if frappe.db.table_exists(doctype):
+                self.assertTrue(frappe.db.has_index(f"tab{doctype}", index_name), index_name)
+
+    def test_hot_queries_never_full_scan(self):
+        ensure_indexes()
+        self.assertEqual(verify_hot_queries(), [])